@@ -1,4 +1,5 @@
 """Configuration settings for the application."""
+import json
 import os
 from dotenv import load_dotenv
 
@@ -11,3 +12,128 @@ CLICKSEND_EMAIL_ADDRESS_ID = os.getenv("CLICKSEND_EMAIL_ADDRESS_ID", "")  # Opti
 CLICKSEND_PHONE = os.getenv("CLICKSEND_PHONE", "")
 CLICKSEND_API_URL = os.getenv("CLICKSEND_API_URL", "https://rest.clicksend.com/v3")
 
+# Several ClickSend accounts or sub-accounts to spread sends over: a JSON list of
+# {"name", "username", "api_key", "weight", "email", "email_address_id"} objects.
+# When unset, the single account configured above is used.
+CLICKSEND_ACCOUNTS = json.loads(os.getenv("CLICKSEND_ACCOUNTS", "") or "[]")
+ACCOUNT_STRATEGY = os.getenv("ACCOUNT_STRATEGY", "least_in_flight").lower()  # "least_in_flight" or "weighted"
+ACCOUNT_AUTH_COOLDOWN = float(os.getenv("ACCOUNT_AUTH_COOLDOWN", "300"))  # Seconds an account is skipped after a 401
+
+# Upstream transport: "http" talks to CLICKSEND_API_URL, "mock" answers in-process without sockets
+CLICKSEND_TRANSPORT = os.getenv("CLICKSEND_TRANSPORT", "http").lower()
+MOCK_LATENCY_MS = float(os.getenv("MOCK_LATENCY_MS", "0"))  # Simulated upstream latency in mock mode
+
+# Shared upstream HTTP client (created once in the app lifespan)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30.0"))  # Seconds an idle connection is kept
+HTTP_HTTP2 = os.getenv("HTTP_HTTP2", "false").lower() in ("1", "true", "yes")  # Requires the `h2` package
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "10.0"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "30.0"))
+HTTP_WRITE_TIMEOUT = float(os.getenv("HTTP_WRITE_TIMEOUT", "30.0"))
+HTTP_POOL_TIMEOUT = float(os.getenv("HTTP_POOL_TIMEOUT", "10.0"))  # Max wait for a free pooled connection
+
+# Sender email_address_id lookup cache
+EMAIL_ID_CACHE_TTL = float(os.getenv("EMAIL_ID_CACHE_TTL", "300"))  # Seconds a found ID is reused
+EMAIL_ID_CACHE_NEGATIVE_TTL = float(os.getenv("EMAIL_ID_CACHE_NEGATIVE_TTL", "30"))  # Seconds a failed lookup is reused
+EMAIL_ADDRESSES_CACHE_TTL = float(os.getenv("EMAIL_ADDRESSES_CACHE_TTL", "30"))  # Seconds GET /api/email/addresses is reused
+
+# Recipient normalization
+DEFAULT_COUNTRY = os.getenv("DEFAULT_COUNTRY", "AU")  # ISO country for phone numbers written without +<country code>
+RECIPIENT_CACHE_SIZE = int(os.getenv("RECIPIENT_CACHE_SIZE", "100000"))  # Memoized normalization results (LRU)
+
+# SMS length: long messages are split into 153 (GSM-7) or 67 (UCS-2) character parts
+SMS_MAX_SEGMENTS = int(os.getenv("SMS_MAX_SEGMENTS", "8"))  # ClickSend allows up to 1224 GSM characters (8 parts)
+
+# Bulk SMS
+SMS_BATCH_SIZE = int(os.getenv("SMS_BATCH_SIZE", "1000"))  # ClickSend accepts up to 1000 messages per request
+SMS_BATCH_CONCURRENCY = int(os.getenv("SMS_BATCH_CONCURRENCY", "4"))  # Chunks posted in parallel
+
+# Bulk email
+EMAIL_BATCH_CONCURRENCY = int(os.getenv("EMAIL_BATCH_CONCURRENCY", "10"))  # Emails in flight per batch
+
+# Background send queue
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", "data/jobs.db")  # SQLite file holding queued sends
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))  # Concurrent queue workers
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))  # Attempts for sends ClickSend did not process (429, 503, connect errors)
+JOB_RETRY_DELAY = float(os.getenv("JOB_RETRY_DELAY", "5.0"))  # Seconds before the first retry, doubled each attempt
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))  # Max seconds an idle worker sleeps
+JOB_SHUTDOWN_TIMEOUT = float(os.getenv("JOB_SHUTDOWN_TIMEOUT", "30.0"))  # Seconds shutdown waits for in-flight jobs before abandoning them
+JOB_LEASE_TIMEOUT = float(os.getenv("JOB_LEASE_TIMEOUT", "60.0"))  # Seconds a running job stays owned without a heartbeat before other processes requeue it
+
+# Client-side rate limiting (requests per second to ClickSend)
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+RATE_LIMIT_SMS = float(os.getenv("RATE_LIMIT_SMS", "10"))  # /sms/send requests
+RATE_LIMIT_EMAIL = float(os.getenv("RATE_LIMIT_EMAIL", "10"))  # /email/send requests
+RATE_LIMIT_ACCOUNT = float(os.getenv("RATE_LIMIT_ACCOUNT", "5"))  # Address lookup and verify requests
+RATE_LIMIT_MIN = float(os.getenv("RATE_LIMIT_MIN", "0.5"))  # Floor the adaptive rate never drops below
+
+# Retries and circuit breaker for ClickSend calls
+RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "3"))  # Total attempts per call, including the first
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "0.5"))  # Backoff base in seconds (full jitter, doubled per attempt)
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "5.0"))
+RETRY_DEADLINE = float(os.getenv("RETRY_DEADLINE", "20.0"))  # Total seconds budget for all attempts of one call
+RETRY_MIN_ATTEMPT_TIME = float(os.getenv("RETRY_MIN_ATTEMPT_TIME", "1.0"))  # Budget an attempt needs; with less left after queueing it is not sent
+RETRY_UNSAFE_POST = os.getenv("RETRY_UNSAFE_POST", "false").lower() in ("1", "true", "yes")  # Also retry sends that may have reached ClickSend
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))  # Consecutive failures before opening
+CIRCUIT_RESET_TIMEOUT = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30.0"))  # Seconds open before a half-open probe
+
+# Idempotency-Key handling on send endpoints
+IDEMPOTENCY_TTL = float(os.getenv("IDEMPOTENCY_TTL", "86400"))  # Seconds a key's response is replayed
+IDEMPOTENCY_MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "10000"))  # In-memory LRU size
+IDEMPOTENCY_DB_PATH = os.getenv("IDEMPOTENCY_DB_PATH", "")  # Optional SQLite file shared by worker processes
+
+# Streaming CSV/NDJSON uploads
+UPLOAD_SMS_CHUNK_SIZE = int(os.getenv("UPLOAD_SMS_CHUNK_SIZE", "1000"))  # Valid rows per SMS dispatch
+UPLOAD_EMAIL_CHUNK_SIZE = int(os.getenv("UPLOAD_EMAIL_CHUNK_SIZE", "100"))  # Valid rows per email dispatch
+UPLOAD_MAX_INFLIGHT_CHUNKS = int(os.getenv("UPLOAD_MAX_INFLIGHT_CHUNKS", "4"))  # Chunks sending while the file is read
+
+# Delivery receipts and inbound SMS webhooks
+RECEIPT_DB_PATH = os.getenv("RECEIPT_DB_PATH", "data/receipts.db")  # SQLite file holding received events
+RECEIPT_BATCH_SIZE = int(os.getenv("RECEIPT_BATCH_SIZE", "500"))  # Buffered events written per transaction
+RECEIPT_FLUSH_INTERVAL = float(os.getenv("RECEIPT_FLUSH_INTERVAL", "1.0"))  # Max seconds an event waits in the buffer
+RECEIPT_BUFFER_MAX = int(os.getenv("RECEIPT_BUFFER_MAX", "50000"))  # Buffered events before webhooks wait for a flush
+
+# Send history
+HISTORY_ENABLED = os.getenv("HISTORY_ENABLED", "true").lower() in ("1", "true", "yes")
+HISTORY_DB_PATH = os.getenv("HISTORY_DB_PATH", "data/history.db")  # SQLite file holding one row per send
+HISTORY_BATCH_SIZE = int(os.getenv("HISTORY_BATCH_SIZE", "1000"))  # Buffered rows written per transaction
+HISTORY_FLUSH_INTERVAL = float(os.getenv("HISTORY_FLUSH_INTERVAL", "1.0"))  # Max seconds a row waits in the buffer
+HISTORY_BUFFER_MAX = int(os.getenv("HISTORY_BUFFER_MAX", "100000"))  # Buffered rows before new ones are dropped
+
+# Scheduled sends (send_at)
+SCHEDULE_DB_PATH = os.getenv("SCHEDULE_DB_PATH", "data/schedule.db")  # SQLite file holding future sends
+SCHEDULE_RELEASE_BATCH = int(os.getenv("SCHEDULE_RELEASE_BATCH", "1000"))  # Due sends released per bulk dispatch
+SCHEDULE_MAX_INFLIGHT_BATCHES = int(os.getenv("SCHEDULE_MAX_INFLIGHT_BATCHES", "4"))  # Released batches sending at once
+SCHEDULE_SHUTDOWN_TIMEOUT = float(os.getenv("SCHEDULE_SHUTDOWN_TIMEOUT", "30.0"))  # Seconds shutdown waits for batches being released
+SCHEDULE_LEASE_TIMEOUT = float(os.getenv("SCHEDULE_LEASE_TIMEOUT", "60.0"))  # Seconds a releasing send stays owned without a heartbeat before other processes requeue it
+
+# Email attachments (multipart /api/email/send)
+EMAIL_ATTACHMENT_MAX_BYTES = int(os.getenv("EMAIL_ATTACHMENT_MAX_BYTES", str(20 * 1024 * 1024)))  # Total raw size per email
+EMAIL_ATTACHMENT_MAX_FILES = int(os.getenv("EMAIL_ATTACHMENT_MAX_FILES", "10"))
+ATTACHMENT_CHUNK_SIZE = int(os.getenv("ATTACHMENT_CHUNK_SIZE", str(192 * 1024)))  # Raw bytes encoded per step (rounded to 3)
+
+# Multi-process mode: SQLite file holding the rate limit buckets, sender-ID cache and
+# idempotency keys shared by every worker (set by serve.py; empty keeps state per process)
+SHARED_STATE_PATH = os.getenv("SHARED_STATE_PATH", "")
+
+# Response compression and browser caching
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))  # Smaller responses are sent uncompressed
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))  # Used when the `brotli` package is installed
+STATIC_CACHE_MAX_AGE = int(os.getenv("STATIC_CACHE_MAX_AGE", "604800"))  # Seconds browsers keep /static assets
+
+# Request timing: Server-Timing header on selected routes and sampled slow-request logs
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "true").lower() in ("1", "true", "yes")
+SERVER_TIMING_PATHS = tuple(
+    path.strip() for path in os.getenv(
+        "SERVER_TIMING_PATHS", "/api/email/send,/api/sms/send,/api/email/address-verify/"
+    ).split(",") if path.strip()
+)  # Path prefixes that are timed
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "1000"))  # Timed requests slower than this are logged
+SLOW_REQUEST_SAMPLE_RATE = float(os.getenv("SLOW_REQUEST_SAMPLE_RATE", "0.1"))  # Fraction of slow requests logged
+
+# SMS price quotes
+PRICING_CURRENCY = os.getenv("PRICING_CURRENCY", "AUD")  # Currency ClickSend quotes rates in
+PRICING_CACHE_TTL = float(os.getenv("PRICING_CACHE_TTL", "86400"))  # Seconds before a country's rate is refreshed in the background
+PRICING_NEGATIVE_TTL = float(os.getenv("PRICING_NEGATIVE_TTL", "60"))  # Seconds a country whose rate could not be fetched is quoted as unpriced before retrying
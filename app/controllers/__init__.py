@@ -1,5 +1,10 @@
 """Controllers for business logic."""
 from app.controllers.clicksend_controller import ClickSendController
+from app.controllers.history_controller import HistoryController
+from app.controllers.job_controller import JobController
+from app.controllers.pricing_controller import PricingController
+from app.controllers.receipt_controller import ReceiptController
+from app.controllers.schedule_controller import ScheduleController
+from app.controllers.upload_controller import UploadController
 
-__all__ = ["ClickSendController"]
-
+__all__ = ["ClickSendController", "HistoryController", "JobController", "PricingController", "ReceiptController", "ScheduleController", "UploadController"]
@@ -1,165 +1,673 @@
 """ClickSend service controller for sending emails and SMS."""
+import asyncio
+import re
+import time
 import httpx
-import base64
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Awaitable, Callable, List, Optional, Tuple
 from app.config import (
     CLICKSEND_API_KEY, CLICKSEND_API_USERNAME, CLICKSEND_EMAIL, 
-    CLICKSEND_EMAIL_ADDRESS_ID, CLICKSEND_API_URL
+    CLICKSEND_EMAIL_ADDRESS_ID, CLICKSEND_API_URL,
+    CLICKSEND_ACCOUNTS, ACCOUNT_STRATEGY, ACCOUNT_AUTH_COOLDOWN,
+    EMAIL_ID_CACHE_TTL, EMAIL_ID_CACHE_NEGATIVE_TTL, EMAIL_ADDRESSES_CACHE_TTL,
+    SMS_BATCH_SIZE, SMS_BATCH_CONCURRENCY, EMAIL_BATCH_CONCURRENCY,
+    RATE_LIMIT_ENABLED, RATE_LIMIT_SMS, RATE_LIMIT_EMAIL, RATE_LIMIT_ACCOUNT, RATE_LIMIT_MIN,
+    RETRY_MAX_ATTEMPTS, RETRY_BASE_DELAY, RETRY_MAX_DELAY, RETRY_DEADLINE, RETRY_UNSAFE_POST,
+    RETRY_MIN_ATTEMPT_TIME,
+    CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT,
+    HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_WRITE_TIMEOUT, HTTP_POOL_TIMEOUT,
+    ATTACHMENT_CHUNK_SIZE, SHARED_STATE_PATH, PRICING_CURRENCY
 )
+from app.controllers.history_controller import HistoryController
+from app.utils.account_pool import AccountPool, ClickSendAccount
+from app.utils.attachments import Attachment, StreamedJSONBody
+from app.utils.cache import TTLCache
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.http_client import get_pool_stats
+from app.utils.metrics import (
+    REGISTRY, UPSTREAM_LATENCY, UPSTREAM_REQUESTS, UPSTREAM_IN_FLIGHT,
+    CACHE_REQUESTS, POOL_CONNECTIONS, RATE_LIMIT_RATE, RATE_LIMIT_WAITING, CIRCUIT_OPEN,
+    ACCOUNT_IN_FLIGHT, ACCOUNT_AVAILABLE, PhaseTimer
+)
+from app.utils.rate_limiter import RateLimiter, parse_retry_after
+from app.utils.request_timing import record_phase, timed
+from app.utils.retry import RetryPolicy, is_unsent
+from app.utils.shared_state import SharedRateLimiter, SharedState, SharedTTLCache
+
+_VERIFY_PATH = re.compile(r"/address-verify/[^/]+/(send|verify)(/.*)?$")
+_PRICING_PATH = re.compile(r"/pricing/[^/?]+(\?.*)?$")
+
+
+def _endpoint_label(path: str) -> str:
+    """Metric label for an API path, with IDs, tokens and countries replaced by placeholders."""
+    return _PRICING_PATH.sub("/pricing/{country}", _VERIFY_PATH.sub(r"/address-verify/{id}/\1", path))
+
+
+# With a shared state file, rate limit buckets and cached lookups are keyed by
+# account name and shared by every worker process
+_shared_state = SharedState(SHARED_STATE_PATH) if SHARED_STATE_PATH else None
+
+
+def _build_accounts() -> List[ClickSendAccount]:
+    """Create the configured accounts, falling back to the single-account settings."""
+    configs = CLICKSEND_ACCOUNTS or [{
+        "name": "default",
+        "username": CLICKSEND_API_USERNAME,
+        "api_key": CLICKSEND_API_KEY,
+        "email": CLICKSEND_EMAIL,
+        "email_address_id": CLICKSEND_EMAIL_ADDRESS_ID
+    }]
+    
+    rates = {"sms": RATE_LIMIT_SMS, "email": RATE_LIMIT_EMAIL, "account": RATE_LIMIT_ACCOUNT}
+    
+    accounts = []
+    for index, config in enumerate(configs):
+        try:
+            email_address_id = int(config.get("email_address_id") or 0) or None
+        except (TypeError, ValueError):
+            email_address_id = None
+        name = str(config.get("name") or f"account{index + 1}")
+        if _shared_state:
+            limiters = {
+                bucket: SharedRateLimiter(_shared_state, f"{name}:{bucket}", rate, min_rate=RATE_LIMIT_MIN)
+                for bucket, rate in rates.items()
+            }
+            email_id_cache = SharedTTLCache(
+                _shared_state, f"{name}:email_id", ttl=EMAIL_ID_CACHE_TTL, negative_ttl=EMAIL_ID_CACHE_NEGATIVE_TTL
+            )
+        else:
+            limiters = {bucket: RateLimiter(rate, min_rate=RATE_LIMIT_MIN) for bucket, rate in rates.items()}
+            email_id_cache = TTLCache(ttl=EMAIL_ID_CACHE_TTL, negative_ttl=EMAIL_ID_CACHE_NEGATIVE_TTL)
+        accounts.append(ClickSendAccount(
+            name=name,
+            username=config.get("username") or "",
+            api_key=config.get("api_key") or "",
+            limiters=limiters,
+            email_id_cache=email_id_cache,
+            weight=float(config.get("weight") or 1),
+            sender_email=config.get("email") or CLICKSEND_EMAIL,
+            email_address_id=email_address_id
+        ))
+    return accounts
+
+
+class _UncachedResult(Exception):
+    """Raised by a cache loader so an unsuccessful result is returned but not cached."""
+
+    def __init__(self, result: Dict[str, Any]):
+        super().__init__(result.get("error"))
+        self.result = result
+
+
+class _AccountUnusable(Exception):
+    """Raised by a request builder when an account cannot serve the request."""
+
+    def __init__(self, result: Dict[str, Any]):
+        super().__init__(result.get("error"))
+        self.result = result
 
 
 class ClickSendController:
     """Controller for ClickSend API operations."""
 
+    # Credentials with their own pooled client, rate limit buckets and sender-ID cache
+    _accounts = AccountPool(_build_accounts(), ACCOUNT_STRATEGY)
+    
+    # Address listings per account name, refreshed after EMAIL_ADDRESSES_CACHE_TTL
+    _addresses_cache = (
+        SharedTTLCache(_shared_state, "email_addresses", ttl=EMAIL_ADDRESSES_CACHE_TTL) if _shared_state
+        else TTLCache(ttl=EMAIL_ADDRESSES_CACHE_TTL)
+    )
+
+    # Transient failure handling shared by every upstream call
+    _retry_policy = RetryPolicy(
+        max_attempts=RETRY_MAX_ATTEMPTS,
+        base_delay=RETRY_BASE_DELAY,
+        max_delay=RETRY_MAX_DELAY,
+        deadline=RETRY_DEADLINE,
+        retry_unsafe=RETRY_UNSAFE_POST
+    )
+    _breaker = CircuitBreaker(
+        failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout=CIRCUIT_RESET_TIMEOUT
+    )
+
+    @classmethod
+    async def close_clients(cls) -> None:
+        """Close every account's HTTP client (clients are reopened on next use)."""
+        await cls._accounts.close()
+
+    @classmethod
+    def get_account(cls, name: Optional[str] = None) -> Optional[ClickSendAccount]:
+        """Return an account by name, or the primary account when no name is given."""
+        return cls._accounts.get(name) if name else cls._accounts.primary
+
+    @classmethod
+    def get_client(cls, account: Optional[ClickSendAccount] = None) -> httpx.AsyncClient:
+        """
+        Get an account's pooled HTTP client (the primary account's by default).
+        
+        Clients are created on first use and live until `close_clients`,
+        so callers never open per-request clients.
+        """
+        return (account or cls._accounts.primary).get_client()
+
     @staticmethod
-    async def get_verified_email_id(email: str) -> Optional[int]:
+    async def _request(
+        method: str,
+        path: str,
+        payload: Optional[Dict[str, Any]] = None,
+        bucket: str = "account",
+        account: Optional[ClickSendAccount] = None,
+        build: Optional[Callable[[ClickSendAccount], Awaitable[Any]]] = None
+    ) -> Dict[str, Any]:
         """
-        Get the email_address_id for a verified email address.
+        Make an authenticated, rate-limited request to the ClickSend API.
+        
+        Each attempt goes to the account chosen by the account pool; a 401
+        or 429 fails over to another account straight away when one is
+        available. Other transient failures are retried per the retry
+        policy within a total deadline, and requests fail fast while the
+        circuit breaker is open.
         
         Args:
-            email: Email address to look up
+            method: HTTP method
+            path: API path relative to CLICKSEND_API_URL
+            payload: Optional JSON body (a dict, or a StreamedJSONBody)
+            bucket: Rate limit bucket ("sms", "email" or "account")
+            account: Send with this account only (account-specific calls)
+            build: Coroutine building the body for the chosen account, used
+                instead of `payload`; raises _AccountUnusable to skip the account
             
         Returns:
-            Email address ID if found, None otherwise
+            Dictionary with success flag, status code, data and error
         """
-        url = f"{CLICKSEND_API_URL}/email/addresses"
-        username = CLICKSEND_API_USERNAME or CLICKSEND_EMAIL or CLICKSEND_API_KEY
-        password = CLICKSEND_API_KEY
+        url = f"{CLICKSEND_API_URL}{path}"
+        pool = ClickSendController._accounts
+        breaker = ClickSendController._breaker
+        policy = ClickSendController._retry_policy
+        started = time.monotonic()
+        deadline = started + policy.deadline
+        attempt = 0
+        tried: List[ClickSendAccount] = []
+        last_result: Optional[Dict[str, Any]] = None
+        current = account or pool.choose(bucket)
         
-        async with httpx.AsyncClient() as client:
+        endpoint = _endpoint_label(path)
+        in_flight = UPSTREAM_IN_FLIGHT.labels(endpoint)
+        in_flight.inc()
+        try:
+            while True:
+                body = payload
+                # Built before taking the breaker slot: building may make its own ClickSend
+                # calls (sender lookup), which must not be refused by our own half-open probe
+                if build is not None:
+                    try:
+                        body = await build(current)
+                    except _AccountUnusable as e:
+                        tried.append(current)
+                        last_result = e.result
+                        current = None if account else pool.choose(bucket, tried)
+                        if current is None:
+                            return last_result
+                        continue
+                
+                if not breaker.allow_request():
+                    UPSTREAM_REQUESTS.labels(endpoint, "circuit_open").inc()
+                    return {
+                        "success": False,
+                        "status_code": 503,
+                        "data": {
+                            "message": "ClickSend is unavailable; requests are paused while the circuit breaker is open.",
+                            "retry_after": round(breaker.retry_after(), 1)
+                        },
+                        "error": "Circuit breaker open"
+                    }
+                
+                limiter = current.limiters[bucket] if RATE_LIMIT_ENABLED else None
+                current.in_flight += 1
+                try:
+                    queued_at = time.monotonic()
+                    # The rate limit wait comes out of the deadline; an attempt left with
+                    # less than RETRY_MIN_ATTEMPT_TIME would only send with a useless timeout
+                    budget = deadline - queued_at - RETRY_MIN_ATTEMPT_TIME
+                    sendable = budget > 0
+                    if limiter and sendable:
+                        if limiter.blocked_for() > budget:
+                            sendable = False
+                        else:
+                            try:
+                                await asyncio.wait_for(limiter.acquire(), budget)
+                            except asyncio.TimeoutError:
+                                sendable = False
+                    queue_time = time.monotonic() - queued_at
+                    UPSTREAM_LATENCY.labels(endpoint, "queue").observe(queue_time)
+                    record_phase("queue", queue_time)
+                    
+                    if not sendable:
+                        breaker.release()
+                        UPSTREAM_REQUESTS.labels(endpoint, "deadline").inc()
+                        return last_result or ClickSendController._queue_timeout(limiter)
+                    
+                    attempt += 1
+                    result, error = await ClickSendController._send(
+                        current, method, url, body, limiter,
+                        ClickSendController._attempt_timeout(deadline - time.monotonic()),
+                        endpoint
+                    )
+                except BaseException:
+                    # Cancelled before an outcome: free the probe slot rather than hold it until reset_timeout
+                    breaker.release()
+                    raise
+                finally:
+                    current.in_flight -= 1
+                
+                last_result = result
+                status_code = result["status_code"]
+                if error is not None or (status_code is not None and status_code >= 500):
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                
+                # Throttled or rejected credentials: move to another account without waiting
+                if status_code in (401, 429):
+                    if status_code == 401:
+                        pool.disable(current, ACCOUNT_AUTH_COOLDOWN)
+                    else:
+                        current.throttled += 1
+                    alternative = None if account else pool.choose(bucket, tried + [current])
+                    if alternative is not None and time.monotonic() < deadline:
+                        tried.append(current)
+                        current = alternative
+                        continue
+                
+                delay = policy.next_delay(attempt, method, status_code, error, deadline)
+                if delay is None:
+                    return result
+                with timed("retry_wait"):
+                    await asyncio.sleep(delay)
+                if account is None:
+                    current = pool.choose(bucket, tried) or current
+        finally:
+            in_flight.dec()
+            UPSTREAM_LATENCY.labels(endpoint, "total").observe(time.monotonic() - started)
+
+    @staticmethod
+    def _queue_timeout(limiter: Optional[RateLimiter]) -> Dict[str, Any]:
+        """Result returned when the rate limit wait would leave too little of the deadline to send."""
+        # Rough time for the queue ahead of us to drain
+        retry_after = max(limiter.blocked_for(), (limiter.waiting + 1) / limiter.rate) if limiter else 0.0
+        return {
+            "success": False,
+            "status_code": 429,
+            "data": {
+                "message": "Rate limit queue is too long to send within the request deadline; nothing was sent.",
+                "retry_after": round(retry_after, 1)
+            },
+            "error": "Rate limit wait exceeds deadline"
+        }
+
+    @staticmethod
+    def _attempt_timeout(remaining: float) -> httpx.Timeout:
+        """Per-phase timeouts for one attempt, capped by the remaining deadline budget."""
+        remaining = max(remaining, 0.1)
+        return httpx.Timeout(
+            connect=min(HTTP_CONNECT_TIMEOUT, remaining),
+            read=min(HTTP_READ_TIMEOUT, remaining),
+            write=min(HTTP_WRITE_TIMEOUT, remaining),
+            pool=min(HTTP_POOL_TIMEOUT, remaining)
+        )
+
+    @staticmethod
+    async def _send(
+        account: ClickSendAccount,
+        method: str,
+        url: str,
+        payload: Any,
+        limiter: Optional[RateLimiter],
+        timeout: httpx.Timeout,
+        endpoint: str
+    ) -> Tuple[Dict[str, Any], Optional[Exception]]:
+        """
+        Make a single request attempt with an account, recording connect/response timings.
+        
+        Returns:
+            The result dictionary and the transport exception, if one occurred
+        """
+        username = account.auth[0]
+        client = account.get_client()
+        if isinstance(payload, StreamedJSONBody):
+            # Re-opened on every attempt, so retries resend the whole body
+            body = {
+                "content": payload.open(),
+                "headers": {"Content-Type": "application/json", "Content-Length": str(payload.length)}
+            }
+        else:
+            body = {"json": payload}
+        account.requests += 1
+        timer = PhaseTimer()
+        sent_at = time.monotonic()
+        try:
             try:
-                response = await client.get(
+                response = await client.request(
+                    method,
                     url,
-                    auth=(username, password),
-                    timeout=30.0
+                    **body,
+                    auth=account.auth,
+                    timeout=timeout,
+                    extensions={"trace": timer.trace}
                 )
-                response.raise_for_status()
-                data = response.json()
-                
-                # ClickSend API structure might vary - try different paths
-                email_list = []
-                if "data" in data:
-                    # Check if data is a dict with nested data array
-                    if isinstance(data["data"], dict) and "data" in data["data"]:
-                        email_list = data["data"]["data"]
-                    # Check if data is directly an array
-                    elif isinstance(data["data"], list):
-                        email_list = data["data"]
-                
-                # Find the email address ID matching our email
-                for email_addr in email_list:
-                    email_value = email_addr.get("email") or email_addr.get("email_address")
-                    if email_value and email_value.lower() == email.lower():
-                        email_id = email_addr.get("email_address_id") or email_addr.get("id")
-                        # Return the ID even if verified status is 0 (might still work)
-                        if email_id:
-                            return email_id
+            finally:
+                connect_time = timer.connect_time()
+                if connect_time is not None:
+                    UPSTREAM_LATENCY.labels(endpoint, "connect").observe(connect_time)
+                    record_phase("connect", connect_time)
+                response_time = timer.response_time()
+                if response_time is not None:
+                    UPSTREAM_LATENCY.labels(endpoint, "response").observe(response_time)
+                # Whole attempt (connect, upload and response), so it is set even without trace events
+                record_phase("clicksend", time.monotonic() - sent_at)
+            UPSTREAM_REQUESTS.labels(endpoint, str(response.status_code)).inc()
+            response.raise_for_status()
+            if limiter:
+                limiter.on_success()
+            return {
+                "success": True,
+                "status_code": response.status_code,
+                "data": response.json()
+            }, None
+        except httpx.HTTPStatusError as e:
+            error_data = None
+            try:
+                error_data = e.response.json()
+            except:
+                error_data = {"message": e.response.text}
+            
+            # Slow down (and pause for Retry-After) when ClickSend throttles us
+            if limiter and e.response.status_code == 429:
+                limiter.on_throttle(parse_retry_after(e.response.headers.get("Retry-After")))
+            
+            # Log authentication details for debugging (without exposing sensitive data)
+            if e.response.status_code == 401 and isinstance(error_data, dict):
+                error_data["debug"] = f"Authentication failed for account '{account.name}'. Check its username and API key."
+                error_data["auth_used"] = f"Username: {username[:3]}... (length: {len(username)})"
                 
-                return None
-            except Exception as e:
-                # Return None on error - will be handled by caller
-                return None
+            return {
+                "success": False,
+                "status_code": e.response.status_code,
+                "data": error_data,
+                "error": str(e)
+            }, None
+        except Exception as e:
+            UPSTREAM_REQUESTS.labels(endpoint, "error").inc()
+            return {
+                "success": False,
+                "status_code": None,
+                "data": None,
+                "error": str(e) or type(e).__name__,
+                # Lets callers outside the retry loop (background jobs) tell unsent failures apart
+                "unsent": is_unsent(None, e)
+            }, e
+
+    @classmethod
+    def get_circuit_stats(cls) -> Dict[str, Any]:
+        """Return circuit breaker state and counters."""
+        return cls._breaker.stats()
+
+    @classmethod
+    def get_rate_limit_stats(cls) -> Dict[str, Any]:
+        """Return current rate, throttling and queue depth per account and rate limit bucket."""
+        return {
+            "enabled": RATE_LIMIT_ENABLED,
+            "accounts": {
+                account.name: {name: limiter.stats() for name, limiter in account.limiters.items()}
+                for account in cls._accounts.accounts
+            }
+        }
+
+    @classmethod
+    def get_account_stats(cls) -> Dict[str, Any]:
+        """Return the dispatch strategy and load, throttling and auth failures per account."""
+        return cls._accounts.stats()
+
+    @classmethod
+    def get_pool_stats(cls) -> Dict[str, Any]:
+        """Return connection pool usage per account."""
+        return {account.name: get_pool_stats(account.get_client()) for account in cls._accounts.accounts}
 
     @staticmethod
-    async def send_email(to: str, subject: str, body: str) -> Dict[str, Any]:
+    async def get_verified_email_id(email: str, account: Optional[ClickSendAccount] = None) -> Optional[int]:
         """
-        Send an email via ClickSend API.
+        Get the email_address_id for a verified email address.
         
         Args:
-            to: Recipient email address
-            subject: Email subject
-            body: Email body content
+            email: Email address to look up
+            account: Account to look in (the primary account by default)
             
         Returns:
-            Dictionary with response data
+            Email address ID if found, None if the listing does not contain it
+            
+        Raises:
+            _UncachedResult: If the address listing failed, so the failure is not cached as "not found"
         """
-        url = f"{CLICKSEND_API_URL}/email/send"
+        result = await ClickSendController.list_email_addresses(account)
         
-        # Get the email_address_id - first try from config, then from API
-        email_address_id = None
-        if CLICKSEND_EMAIL_ADDRESS_ID:
-            try:
-                email_address_id = int(CLICKSEND_EMAIL_ADDRESS_ID)
-            except:
-                pass
+        if not result["success"]:
+            raise _UncachedResult(result)
         
-        # If not in config, fetch from API
-        if not email_address_id:
-            email_address_id = await ClickSendController.get_verified_email_id(CLICKSEND_EMAIL)
+        data = result["data"]
         
-        # ClickSend email API expects a flat structure with email_address_id for verified emails
-        if not email_address_id:
-            return {
-                "success": False,
-                "status_code": 400,
-                "data": {
-                    "message": f"Email {CLICKSEND_EMAIL} not found. Please verify it in ClickSend dashboard first."
-                },
-                "error": "Email address ID not found"
-            }
+        # ClickSend API structure might vary - try different paths
+        email_list = []
+        if isinstance(data, dict) and "data" in data:
+            # Check if data is a dict with nested data array
+            if isinstance(data["data"], dict) and "data" in data["data"]:
+                email_list = data["data"]["data"]
+            # Check if data is directly an array
+            elif isinstance(data["data"], list):
+                email_list = data["data"]
         
-        payload = {
-            "from": {
-                "email_address_id": email_address_id,
-                "name": "ClickSend Tester"
-            },
-            "to": [{"email": to}],
-            "subject": subject,
-            "body": body
-        }
+        # Find the email address ID matching our email
+        for email_addr in email_list:
+            email_value = email_addr.get("email") or email_addr.get("email_address")
+            if email_value and email_value.lower() == email.lower():
+                email_id = email_addr.get("email_address_id") or email_addr.get("id")
+                # Return the ID even if verified status is 0 (might still work)
+                if email_id:
+                    return email_id
         
-        # ClickSend uses Basic Auth: username:api_key
-        # Common patterns:
-        # 1. API username from dashboard:api_key
-        # 2. email:api_key (if no username provided)
-        # 3. api_key:api_key (fallback)
-        username = CLICKSEND_API_USERNAME or CLICKSEND_EMAIL or CLICKSEND_API_KEY
-        password = CLICKSEND_API_KEY
+        return None
+
+    @staticmethod
+    async def resolve_email_id(email: str, account: Optional[ClickSendAccount] = None) -> Optional[int]:
+        """
+        Get the email_address_id for a sender, using the account's lookup cache.
+        
+        Concurrent callers for the same sender share a single upstream lookup.
+        Only a successful listing is cached, including one that lacks the sender.
+        
+        Args:
+            email: Sender email address
+            account: Account the sender is registered on (the primary account by default)
+            
+        Returns:
+            Email address ID if found, None otherwise
+            
+        Raises:
+            _UncachedResult: If the lookup failed upstream (carries the failed result)
+        """
+        account = account or ClickSendController._accounts.primary
+        # Timed as a whole; on a cache miss it includes its own ClickSend call
+        with timed("email_id"):
+            return await account.email_id_cache.get_or_load(
+                email.lower(),
+                lambda: ClickSendController.get_verified_email_id(email, account)
+            )
+
+    @classmethod
+    async def invalidate_email_id_cache(cls, email: Optional[str] = None, account: Optional[ClickSendAccount] = None) -> None:
+        """Forget cached sender IDs (all of them when no email is given) and address listings on one or every account."""
+        for target in [account] if account else cls._accounts.accounts:
+            await target.email_id_cache.invalidate_async(email.lower() if email else None)
+            await cls._addresses_cache.invalidate_async(target.name)
+
+    @staticmethod
+    async def get_sender_email_id(account: Optional[ClickSendAccount] = None) -> Optional[int]:
+        """
+        Get the email_address_id of an account's sender.
         
-        headers = {
-            "Content-Type": "application/json"
+        Args:
+            account: Sending account (the primary account by default)
+            
+        Returns:
+            The account's configured email_address_id if set, otherwise the cached API lookup
+        """
+        account = account or ClickSendController._accounts.primary
+        if account.email_address_id:
+            return account.email_address_id
+        if not account.sender_email:
+            return None
+        return await ClickSendController.resolve_email_id(account.sender_email, account)
+
+    @staticmethod
+    def _sender_not_found(account: Optional[ClickSendAccount] = None) -> Dict[str, Any]:
+        """Result returned when the sender email_address_id cannot be resolved."""
+        account = account or ClickSendController._accounts.primary
+        return {
+            "success": False,
+            "status_code": 400,
+            "data": {
+                "message": f"Email {account.sender_email} not found. Please verify it in ClickSend dashboard first."
+            },
+            "error": "Email address ID not found"
         }
+
+    @staticmethod
+    async def _post_email(
+        to: str,
+        subject: str,
+        body: str,
+        attachments: Optional[List[Attachment]] = None
+    ) -> Dict[str, Any]:
+        """
+        Post a single email from the sender of whichever account serves it.
         
-        async with httpx.AsyncClient() as client:
+        With attachments the JSON body is streamed, base64-encoding each
+        file as it is sent rather than building the document in memory.
+        """
+        async def build(account: ClickSendAccount) -> Any:
             try:
-                response = await client.post(
-                    url, 
-                    json=payload, 
-                    headers=headers, 
-                    auth=(username, password),
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                return {
-                    "success": True,
-                    "status_code": response.status_code,
-                    "data": response.json()
-                }
-            except httpx.HTTPStatusError as e:
-                error_data = None
-                try:
-                    error_data = e.response.json()
-                except:
-                    error_data = {"message": e.response.text}
-                
-                # Log authentication details for debugging (without exposing sensitive data)
-                if e.response.status_code == 401:
-                    error_data["debug"] = "Authentication failed. Check if CLICKSEND_API_USERNAME is set correctly."
-                    error_data["auth_used"] = f"Username: {username[:3]}... (length: {len(username)})"
-                    
-                return {
-                    "success": False,
-                    "status_code": e.response.status_code,
-                    "data": error_data,
-                    "error": str(e)
-                }
-            except Exception as e:
+                email_address_id = await ClickSendController.get_sender_email_id(account)
+            except _UncachedResult as e:
+                # Lookup failed upstream: report ClickSend's error, not a missing sender
+                raise _AccountUnusable(e.result)
+            if not email_address_id:
+                raise _AccountUnusable(ClickSendController._sender_not_found(account))
+            # ClickSend email API expects a flat structure with email_address_id for verified emails
+            payload = {
+                "from": {
+                    "email_address_id": email_address_id,
+                    "name": "ClickSend Tester"
+                },
+                "to": [{"email": to}],
+                "subject": subject,
+                "body": body
+            }
+            if attachments:
+                return StreamedJSONBody(payload, attachments, ATTACHMENT_CHUNK_SIZE)
+            return payload
+        
+        started = time.perf_counter()
+        result = await ClickSendController._request("POST", "/email/send", bucket="email", build=build)
+        latency_ms = (time.perf_counter() - started) * 1000
+        
+        request = {"subject": subject, "body": body}
+        if attachments:
+            request["attachments"] = [
+                {"filename": attachment.filename, "type": attachment.content_type, "size": attachment.size}
+                for attachment in attachments
+            ]
+        if result["success"]:
+            data = result["data"].get("data") or {}
+            entry = HistoryController.entry(
+                "email", to, request, True,
+                status=data.get("status") or "SUCCESS",
+                message_id=data.get("message_id") or data.get("email_id"),
+                status_code=result["status_code"],
+                cost=data.get("price"),
+                latency_ms=latency_ms
+            )
+        else:
+            entry = HistoryController.entry(
+                "email", to, request, False,
+                status_code=result["status_code"],
+                latency_ms=latency_ms,
+                error=str(result.get("data") or result.get("error") or "Unknown error")
+            )
+        HistoryController.record([entry])
+        return result
+
+    @staticmethod
+    async def send_email(
+        to: str,
+        subject: str,
+        body: str,
+        attachments: Optional[List[Attachment]] = None
+    ) -> Dict[str, Any]:
+        """
+        Send an email via ClickSend API.
+        
+        Args:
+            to: Recipient email address
+            subject: Email subject
+            body: Email body content
+            attachments: Optional files, streamed to ClickSend as base64
+            
+        Returns:
+            Dictionary with response data
+        """
+        return await ClickSendController._post_email(to, subject, body, attachments)
+
+    @staticmethod
+    async def send_email_batch(recipients: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Send an email to many recipients concurrently.
+        
+        Each account's sender ID is resolved once (and cached) for the
+        whole batch, and at most EMAIL_BATCH_CONCURRENCY emails are in
+        flight at a time.
+        
+        Args:
+            recipients: List of {"to", "subject", "body"} dicts
+            
+        Returns:
+            One result dict per recipient, in input order
+        """
+        semaphore = asyncio.Semaphore(EMAIL_BATCH_CONCURRENCY)
+        
+        async def send_one(item: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                result = await ClickSendController._post_email(item["to"], item["subject"], item["body"])
+            
+            if not result["success"]:
                 return {
+                    "to": item["to"],
                     "success": False,
-                    "status_code": None,
-                    "data": None,
-                    "error": str(e)
+                    "status": None,
+                    "message_id": None,
+                    "error": str(result.get("data") or result.get("error") or "Unknown error")
                 }
+            
+            data = result["data"].get("data") or {}
+            message_id = data.get("message_id") or data.get("email_id")
+            return {
+                "to": item["to"],
+                "success": True,
+                "status": data.get("status") or "SUCCESS",
+                "message_id": str(message_id) if message_id is not None else None,
+                "error": None
+            }
+        
+        return await asyncio.gather(*(send_one(item) for item in recipients))
 
     @staticmethod
     async def send_sms(to: str, message: str) -> Dict[str, Any]:
@@ -173,8 +681,6 @@ class ClickSendController:
         Returns:
             Dictionary with response data
         """
-        url = f"{CLICKSEND_API_URL}/sms/send"
-        
         payload = {
             "messages": [
                 {
@@ -185,56 +691,269 @@ class ClickSendController:
             ]
         }
         
-        # ClickSend uses Basic Auth: username:api_key
-        # Common patterns:
-        # 1. API username from dashboard:api_key
-        # 2. email:api_key (if no username provided)
-        # 3. api_key:api_key (fallback)
-        username = CLICKSEND_API_USERNAME or CLICKSEND_EMAIL or CLICKSEND_API_KEY
-        password = CLICKSEND_API_KEY
+        started = time.perf_counter()
+        result = await ClickSendController._request("POST", "/sms/send", payload, bucket="sms")
+        ClickSendController._record_sms(
+            [{"to": to, "message": message}], 0, result, (time.perf_counter() - started) * 1000
+        )
+        return result
+
+    @staticmethod
+    async def send_sms_batch(messages: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """
+        Send many SMS messages using ClickSend's multi-message payload.
         
-        headers = {
-            "Content-Type": "application/json"
-        }
+        Messages are packed into chunks of SMS_BATCH_SIZE and up to
+        SMS_BATCH_CONCURRENCY chunks are posted at once.
         
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    url, 
-                    json=payload, 
-                    headers=headers, 
-                    auth=(username, password),
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                return {
-                    "success": True,
-                    "status_code": response.status_code,
-                    "data": response.json()
-                }
-            except httpx.HTTPStatusError as e:
-                error_data = None
+        Args:
+            messages: List of {"to": ..., "message": ...} dicts
+            
+        Returns:
+            One result dict per input message, in input order
+        """
+        results: List[Dict[str, Any]] = [None] * len(messages)
+        semaphore = asyncio.Semaphore(SMS_BATCH_CONCURRENCY)
+        
+        async def send_chunk(start: int) -> None:
+            chunk = messages[start:start + SMS_BATCH_SIZE]
+            # custom_string is echoed back by ClickSend, letting us map results to inputs
+            payload = {
+                "messages": [
+                    {
+                        "source": "php",
+                        "body": item["message"],
+                        "to": item["to"],
+                        "custom_string": str(start + offset)
+                    }
+                    for offset, item in enumerate(chunk)
+                ]
+            }
+            
+            async with semaphore:
+                started = time.perf_counter()
+                result = await ClickSendController._request("POST", "/sms/send", payload, bucket="sms")
+                latency_ms = (time.perf_counter() - started) * 1000
+            ClickSendController._record_sms(chunk, start, result, latency_ms)
+            
+            if not result["success"]:
+                error = str(result.get("data") or result.get("error") or "Unknown error")
+                for offset, item in enumerate(chunk):
+                    results[start + offset] = {
+                        "to": item["to"],
+                        "success": False,
+                        "status": None,
+                        "message_id": None,
+                        "error": error
+                    }
+                return
+            
+            data = result["data"].get("data") or {}
+            upstream = data.get("messages") or []
+            for position, message in enumerate(upstream):
                 try:
-                    error_data = e.response.json()
-                except:
-                    error_data = {"message": e.response.text}
-                
-                # Log authentication details for debugging (without exposing sensitive data)
-                if e.response.status_code == 401:
-                    error_data["debug"] = "Authentication failed. Check if CLICKSEND_API_USERNAME is set correctly."
-                    error_data["auth_used"] = f"Username: {username[:3]}... (length: {len(username)})"
-                    
-                return {
-                    "success": False,
-                    "status_code": e.response.status_code,
-                    "data": error_data,
-                    "error": str(e)
-                }
-            except Exception as e:
-                return {
-                    "success": False,
-                    "status_code": None,
-                    "data": None,
-                    "error": str(e)
+                    index = int(message.get("custom_string"))
+                except (TypeError, ValueError):
+                    index = start + position
+                if not start <= index < start + len(chunk):
+                    continue
+                status = message.get("status")
+                results[index] = {
+                    "to": messages[index]["to"],
+                    "success": status == "SUCCESS",
+                    "status": status,
+                    "message_id": message.get("message_id"),
+                    "error": None if status == "SUCCESS" else status
                 }
+            
+            # Anything ClickSend did not report back is treated as failed
+            for offset, item in enumerate(chunk):
+                if results[start + offset] is None:
+                    results[start + offset] = {
+                        "to": item["to"],
+                        "success": False,
+                        "status": None,
+                        "message_id": None,
+                        "error": "Missing from ClickSend response"
+                    }
+        
+        await asyncio.gather(*(
+            send_chunk(start) for start in range(0, len(messages), SMS_BATCH_SIZE)
+        ))
+        return results
+
+    @staticmethod
+    def _record_sms(chunk: List[Dict[str, str]], start: int, result: Dict[str, Any], latency_ms: float) -> None:
+        """
+        Add one history row per message of an /sms/send call.
+        
+        Args:
+            chunk: The {"to", "message"} dicts posted
+            start: Index of the first message, as used in custom_string
+            result: Result of the ClickSend call
+            latency_ms: Wall time of the call
+        """
+        upstream: Dict[int, Dict[str, Any]] = {}
+        if result["success"]:
+            messages = (result["data"].get("data") or {}).get("messages") or []
+            for position, message in enumerate(messages):
+                try:
+                    offset = int(message.get("custom_string")) - start
+                except (TypeError, ValueError):
+                    offset = position
+                upstream[offset] = message
+        error = None if result["success"] else str(result.get("data") or result.get("error") or "Unknown error")
+        
+        entries = []
+        for offset, item in enumerate(chunk):
+            message = upstream.get(offset) or {}
+            status = message.get("status")
+            entries.append(HistoryController.entry(
+                "sms", item["to"], {"message": item["message"]},
+                status == "SUCCESS",
+                status=status,
+                message_id=message.get("message_id"),
+                status_code=result["status_code"],
+                cost=message.get("message_price"),
+                latency_ms=latency_ms,
+                error=error or (None if status == "SUCCESS" else status or "Missing from ClickSend response")
+            ))
+        HistoryController.record(entries)
+
+    @staticmethod
+    async def get_sms_pricing(country: str, account: Optional[ClickSendAccount] = None) -> Dict[str, Any]:
+        """
+        Get ClickSend's SMS pricing for one country.
+        
+        Args:
+            country: ISO 3166 alpha-2 country code
+            account: Account whose pricing applies (the primary account by default)
+            
+        Returns:
+            Dictionary with response data (rates in PRICING_CURRENCY)
+        """
+        account = account or ClickSendController._accounts.primary
+        return await ClickSendController._request(
+            "GET", f"/pricing/{country}?currency={PRICING_CURRENCY}", account=account
+        )
+
+    @staticmethod
+    async def list_email_addresses(account: Optional[ClickSendAccount] = None) -> Dict[str, Any]:
+        """
+        List the email addresses registered on a ClickSend account.
+        
+        Successful listings are cached for EMAIL_ADDRESSES_CACHE_TTL seconds
+        (and dropped when an address is added or verified); concurrent
+        callers share one upstream request.
+        
+        Args:
+            account: Account to list (the primary account by default)
+            
+        Returns:
+            Dictionary with response data
+        """
+        account = account or ClickSendController._accounts.primary
+        
+        async def load() -> Dict[str, Any]:
+            result = await ClickSendController._request("GET", "/email/addresses", account=account)
+            if not result["success"]:
+                raise _UncachedResult(result)
+            return result
+        
+        try:
+            return await ClickSendController._addresses_cache.get_or_load(account.name, load)
+        except _UncachedResult as e:
+            return e.result
+
+    @staticmethod
+    async def add_email_address(email: str, account: Optional[ClickSendAccount] = None) -> Dict[str, Any]:
+        """
+        Add an email address to ClickSend for verification.
+        
+        Args:
+            email: Email address to add
+            account: Account to add it to (the primary account by default)
+            
+        Returns:
+            Dictionary with response data
+        """
+        account = account or ClickSendController._accounts.primary
+        payload = {
+            "email_address": email
+        }
+        
+        result = await ClickSendController._request("POST", "/email/addresses", payload, account=account)
+        if result["success"]:
+            await ClickSendController.invalidate_email_id_cache(email, account)
+        return result
+
+    @staticmethod
+    async def send_verification_token(email_address_id: int, account: Optional[ClickSendAccount] = None) -> Dict[str, Any]:
+        """
+        Send a verification token to an email address.
+        
+        Args:
+            email_address_id: ClickSend email address ID
+            account: Account the address belongs to (the primary account by default)
+            
+        Returns:
+            Dictionary with response data
+        """
+        account = account or ClickSendController._accounts.primary
+        result = await ClickSendController._request(
+            "PUT", f"/email/address-verify/{email_address_id}/send", account=account
+        )
+        if result["success"]:
+            await ClickSendController.invalidate_email_id_cache(account=account)
+        return result
+
+    @staticmethod
+    async def verify_email_address(
+        email_address_id: int,
+        activation_token: str,
+        account: Optional[ClickSendAccount] = None
+    ) -> Dict[str, Any]:
+        """
+        Verify an email address using its activation token.
+        
+        Args:
+            email_address_id: ClickSend email address ID
+            activation_token: Token received via email
+            account: Account the address belongs to (the primary account by default)
+            
+        Returns:
+            Dictionary with response data
+        """
+        account = account or ClickSendController._accounts.primary
+        result = await ClickSendController._request(
+            "PUT", f"/email/address-verify/{email_address_id}/verify/{activation_token}", account=account
+        )
+        if result["success"]:
+            await ClickSendController.invalidate_email_id_cache(account=account)
+        return result
+
+    @classmethod
+    def collect_metrics(cls) -> None:
+        """Copy cache, pool, account, rate limit and circuit state into gauges at scrape time."""
+        accounts = cls._accounts.accounts
+        CACHE_REQUESTS.labels("email_id", "hit").set(sum(a.email_id_cache.hits for a in accounts))
+        CACHE_REQUESTS.labels("email_id", "miss").set(sum(a.email_id_cache.misses for a in accounts))
+        
+        for account in accounts:
+            ACCOUNT_IN_FLIGHT.labels(account.name).set(account.in_flight)
+            ACCOUNT_AVAILABLE.labels(account.name).set(0 if account.is_disabled() else 1)
+            
+            if account.client is not None:
+                pool_stats = get_pool_stats(account.client)
+                POOL_CONNECTIONS.labels(account.name, "active").set(pool_stats["active"])
+                POOL_CONNECTIONS.labels(account.name, "idle").set(pool_stats["idle"])
+                POOL_CONNECTIONS.labels(account.name, "queued").set(pool_stats["queued_requests"])
+            
+            for name, limiter in account.limiters.items():
+                RATE_LIMIT_RATE.labels(account.name, name).set(limiter.rate)
+                RATE_LIMIT_WAITING.labels(account.name, name).set(limiter.waiting)
+        
+        CIRCUIT_OPEN.labels().set(0 if cls._breaker.state == "closed" else 1)
+
 
+REGISTRY.add_collector(ClickSendController.collect_metrics)
@@ -0,0 +1,146 @@
+"""Controller recording and querying the history of outbound sends."""
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+from app.config import (
+    HISTORY_ENABLED, HISTORY_DB_PATH, HISTORY_BATCH_SIZE, HISTORY_FLUSH_INTERVAL, HISTORY_BUFFER_MAX
+)
+from app.utils.batch_writer import BatchWriter
+from app.utils.history_store import HistoryStore
+from app.utils.metrics import HISTORY_DROPPED
+
+
+class HistoryController:
+    """
+    Controller for the local send history.
+    
+    Sends are recorded into an in-memory buffer without awaiting anything,
+    so the send path never waits on disk; a BatchWriter flushes the buffer
+    to SQLite in HISTORY_BATCH_SIZE transactions. Recording is a no-op
+    until `start` is called (e.g. when the controllers are used from a script).
+    """
+
+    _store: Optional[HistoryStore] = None
+    _writer: Optional[BatchWriter] = None
+
+    @classmethod
+    async def start(cls, path: str = HISTORY_DB_PATH) -> None:
+        """Open the store and start the flusher task, unless history is disabled."""
+        if not HISTORY_ENABLED:
+            return
+        
+        cls._store = await asyncio.to_thread(HistoryStore, path)
+        cls._writer = BatchWriter(
+            cls._store.insert_many,
+            batch_size=HISTORY_BATCH_SIZE,
+            interval=HISTORY_FLUSH_INTERVAL,
+            max_buffer=HISTORY_BUFFER_MAX,
+            name="history"
+        )
+        cls._writer.start()
+
+    @classmethod
+    async def stop(cls) -> None:
+        """Write any buffered rows and close the store."""
+        if cls._writer is not None:
+            await cls._writer.stop()
+            cls._writer = None
+        
+        if cls._store is not None:
+            await asyncio.to_thread(cls._store.close)
+            cls._store = None
+
+    @classmethod
+    def record(cls, sends: List[Dict[str, Any]]) -> None:
+        """
+        Buffer history rows built with `entry`.
+        
+        Never blocks: when the buffer is full the rows are dropped and
+        counted in app_history_dropped_total.
+        """
+        if cls._writer is None or not sends:
+            return
+        if not cls._writer.put_nowait(sends):
+            HISTORY_DROPPED.inc(len(sends))
+
+    @staticmethod
+    def entry(
+        kind: str,
+        recipient: str,
+        request: Dict[str, Any],
+        success: bool,
+        status: Optional[str] = None,
+        message_id: Optional[str] = None,
+        status_code: Optional[int] = None,
+        cost: Any = None,
+        latency_ms: Optional[float] = None,
+        error: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Build one history row.
+        
+        Args:
+            kind: "sms" or "email"
+            recipient: Phone number or email address
+            request: Request fields as sent (message, subject, body)
+            success: Whether ClickSend accepted the message
+            status: ClickSend message status
+            message_id: ClickSend message ID
+            status_code: HTTP status of the ClickSend call
+            cost: Price reported by ClickSend
+            latency_ms: Wall time of the ClickSend call, including retries
+            error: Error message for failed sends
+        """
+        try:
+            cost = float(cost) if cost is not None else None
+        except (TypeError, ValueError):
+            cost = None
+        return {
+            "kind": kind,
+            "recipient": recipient,
+            "request": request,
+            "success": int(success),
+            "status": status,
+            "message_id": str(message_id) if message_id is not None else None,
+            "status_code": status_code,
+            "cost": cost,
+            "latency_ms": round(latency_ms, 3) if latency_ms is not None else None,
+            "error": error,
+            "created_at": time.time()
+        }
+
+    @classmethod
+    async def query(
+        cls,
+        limit: int,
+        cursor: Optional[str] = None,
+        **filters: Any
+    ) -> Dict[str, Any]:
+        """
+        Return a page of sends, newest first.
+        
+        Args:
+            limit: Page size
+            cursor: `next_cursor` from the previous page
+            **filters: kind, recipient, status, message_id, since, until
+            
+        Returns:
+            Dict with the sends and the cursor for the next page (None on the last page)
+            
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        if cls._store is None:
+            raise RuntimeError("Send history is not enabled")
+        
+        before = cls._decode_cursor(cursor) if cursor else None
+        sends = await asyncio.to_thread(cls._store.page, limit + 1, before, **filters)
+        has_more = len(sends) > limit
+        sends = sends[:limit]
+        next_cursor = f"{sends[-1]['created_at']!r}:{sends[-1]['id']}" if has_more else None
+        return {"sends": sends, "next_cursor": next_cursor}
+
+    @staticmethod
+    def _decode_cursor(cursor: str):
+        created_at, _, row_id = cursor.partition(":")
+        return float(created_at), int(row_id)
@@ -0,0 +1,186 @@
+"""Background job controller for asynchronous sends."""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from app.config import (
+    JOB_QUEUE_PATH, JOB_WORKERS, JOB_MAX_ATTEMPTS, JOB_RETRY_DELAY, JOB_POLL_INTERVAL,
+    JOB_SHUTDOWN_TIMEOUT, JOB_LEASE_TIMEOUT
+)
+from app.controllers.clicksend_controller import ClickSendController
+from app.utils.job_queue import JobQueue
+from app.utils.retry import is_unsent
+
+logger = logging.getLogger(__name__)
+
+# Job kind -> coroutine performing the send with the job payload
+JOB_HANDLERS: Dict[str, Callable[..., Awaitable[Dict[str, Any]]]] = {
+    "email": ClickSendController.send_email,
+    "sms": ClickSendController.send_sms
+}
+
+
+class JobController:
+    """Controller owning the durable send queue and its worker pool."""
+
+    _queue: Optional[JobQueue] = None
+    _workers: List[asyncio.Task] = []
+    _heartbeat: Optional[asyncio.Task] = None
+    _wakeup: Optional[asyncio.Event] = None
+    _stopping = False
+    # Jobs whose send was cancelled mid-flight, so ClickSend may already have them
+    _interrupted: List[str] = []
+
+    @classmethod
+    async def start(cls, path: str = JOB_QUEUE_PATH, workers: int = JOB_WORKERS) -> None:
+        """
+        Open the queue and start the worker pool.
+        
+        Jobs whose lease expired (their process crashed) are requeued first,
+        and then periodically by the heartbeat, so accepted sends survive
+        restarts without taking over jobs other live processes are running.
+        """
+        cls._queue = await asyncio.to_thread(JobQueue, path, JOB_LEASE_TIMEOUT)
+        recovered = await asyncio.to_thread(cls._queue.recover)
+        if recovered:
+            logger.info("Requeued %d interrupted jobs", recovered)
+        
+        cls._wakeup = asyncio.Event()
+        cls._stopping = False
+        cls._interrupted = []
+        cls._workers = [asyncio.create_task(cls._worker()) for _ in range(workers)]
+        cls._heartbeat = asyncio.create_task(cls._keep_leases())
+
+    @classmethod
+    async def stop(cls) -> None:
+        """
+        Stop the workers and close the queue.
+        
+        Workers stop claiming and in-flight jobs get JOB_SHUTDOWN_TIMEOUT
+        seconds to finish. Jobs cancelled after that may already have
+        reached ClickSend, so they are failed rather than requeued; only
+        claimed jobs that never started are put back on the queue.
+        """
+        cls._stopping = True
+        if cls._wakeup is not None:
+            cls._wakeup.set()
+        if cls._workers:
+            _, pending = await asyncio.wait(cls._workers, timeout=JOB_SHUTDOWN_TIMEOUT)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*cls._workers, return_exceptions=True)
+        if cls._heartbeat is not None:
+            cls._heartbeat.cancel()
+            await asyncio.gather(cls._heartbeat, return_exceptions=True)
+        cls._workers = []
+        cls._heartbeat = None
+        
+        if cls._queue is not None:
+            for job_id in cls._interrupted:
+                await asyncio.to_thread(
+                    cls._queue.fail, job_id, "Interrupted by shutdown before ClickSend answered; not resent"
+                )
+            cls._interrupted = []
+            await asyncio.to_thread(cls._queue.release)
+            await asyncio.to_thread(cls._queue.close)
+            cls._queue = None
+
+    @classmethod
+    async def enqueue(cls, kind: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Persist a send job for the workers.
+        
+        Args:
+            kind: Job kind (a key of JOB_HANDLERS)
+            payload: Keyword arguments for the job handler
+            
+        Returns:
+            The stored job
+        """
+        if cls._queue is None:
+            raise RuntimeError("Job queue is not running")
+        
+        job = await asyncio.to_thread(cls._queue.enqueue, kind, payload)
+        cls._wakeup.set()
+        return job
+
+    @classmethod
+    async def get_job(cls, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a job by ID, or None if it does not exist."""
+        if cls._queue is None:
+            raise RuntimeError("Job queue is not running")
+        return await asyncio.to_thread(cls._queue.get, job_id)
+
+    @classmethod
+    async def _worker(cls) -> None:
+        """Claim and run jobs until stopped, sleeping while the queue is empty."""
+        while not cls._stopping:
+            try:
+                job = await asyncio.to_thread(cls._queue.claim)
+            except Exception:
+                logger.exception("Failed to claim job")
+                job = None
+            
+            if job is None:
+                try:
+                    await asyncio.wait_for(cls._wakeup.wait(), timeout=JOB_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                if not cls._stopping:
+                    cls._wakeup.clear()
+                continue
+            
+            try:
+                await cls._run(job)
+            except Exception:
+                logger.exception("Failed to record the outcome of job %s", job["id"])
+                # Best effort, so the job does not stay running under a lease this process keeps renewing
+                try:
+                    await asyncio.to_thread(cls._queue.fail, job["id"], "Outcome could not be recorded")
+                except Exception:
+                    logger.exception("Failed to mark job %s failed", job["id"])
+
+    @classmethod
+    async def _keep_leases(cls) -> None:
+        """Renew this process's job leases and requeue jobs whose owner stopped renewing them."""
+        while True:
+            await asyncio.sleep(JOB_LEASE_TIMEOUT / 3)
+            try:
+                await asyncio.to_thread(cls._queue.renew)
+                recovered = await asyncio.to_thread(cls._queue.recover)
+            except Exception:
+                logger.exception("Failed to renew job leases")
+                continue
+            if recovered:
+                logger.info("Requeued %d jobs with expired leases", recovered)
+                cls._wakeup.set()
+
+    @classmethod
+    async def _run(cls, job: Dict[str, Any]) -> None:
+        """Run one claimed job and record its outcome."""
+        handler = JOB_HANDLERS.get(job["kind"])
+        if handler is None:
+            await asyncio.to_thread(cls._queue.fail, job["id"], f"Unknown job kind: {job['kind']}")
+            return
+        
+        try:
+            result = await handler(**job["payload"])
+        except asyncio.CancelledError:
+            cls._interrupted.append(job["id"])
+            raise
+        except Exception as e:
+            result = {"success": False, "status_code": None, "data": None, "error": str(e)}
+        
+        if result["success"]:
+            await asyncio.to_thread(cls._queue.complete, job["id"], result)
+            return
+        
+        error = str(result.get("data") or result.get("error") or "Unknown error")
+        # Only requeue sends ClickSend cannot have processed (connect/pool errors, 429, 503);
+        # a timeout or 500 after the request went out may have sent the message already
+        unsent = result.get("unsent") or is_unsent(result.get("status_code"), None)
+        if unsent and job["attempts"] < JOB_MAX_ATTEMPTS:
+            delay = JOB_RETRY_DELAY * 2 ** (job["attempts"] - 1)
+            await asyncio.to_thread(cls._queue.retry, job["id"], error, delay)
+            return
+        
+        await asyncio.to_thread(cls._queue.fail, job["id"], error, result)
@@ -0,0 +1,128 @@
+"""Controller quoting the cost of SMS campaigns from cached ClickSend rates."""
+from collections import Counter
+from typing import Any, Dict, List, Optional
+from app.config import PRICING_CACHE_TTL, PRICING_CURRENCY, PRICING_NEGATIVE_TTL
+from app.controllers.clicksend_controller import ClickSendController
+from app.utils.pricing import RateTable, country_trie
+from app.utils.recipients import normalize_phone
+from app.utils.sms_encoding import estimate
+
+
+async def _load_rate(country: str) -> Optional[Dict[str, Any]]:
+    """Fetch one country's per-part SMS rate, or None if ClickSend has no price for it."""
+    result = await ClickSendController.get_sms_pricing(country)
+    if not result["success"]:
+        return None
+    
+    data = (result.get("data") or {}).get("data") or {}
+    sms = data.get("sms") or {}
+    # Rates are tiered by monthly volume; tier 0 is the list price
+    rate = sms.get("price_rate_0") if isinstance(sms, dict) else None
+    try:
+        rate = float(rate)
+    except (TypeError, ValueError):
+        return None
+    return {"rate": rate, "currency": data.get("currency_name_short") or PRICING_CURRENCY}
+
+
+class PricingController:
+    """
+    Controller for SMS price quotes.
+    
+    Recipients are normalized to E.164 and de-duplicated like a batch send,
+    mapped to a country with a dialling-prefix trie and counted per country.
+    Only the distinct countries are priced, from a RateTable that fetches
+    each country once and afterwards refreshes it in the background, so a
+    quote for 100k numbers makes no upstream calls once rates are warm.
+    """
+
+    _countries = country_trie()
+    _rates = RateTable(_load_rate, ttl=PRICING_CACHE_TTL, negative_ttl=PRICING_NEGATIVE_TTL)
+
+    @classmethod
+    async def quote(cls, message: str, recipients: List[str], country: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Quote the cost of sending `message` to every recipient.
+        
+        Args:
+            message: SMS body (its part count multiplies each recipient's rate)
+            recipients: Phone numbers, E.164 or national format
+            country: Default country for national numbers (DEFAULT_COUNTRY if omitted)
+        
+        Returns:
+            Totals plus a line per country, and per unknown calling code (country
+            None); lines that could not be priced carry an `error`
+        """
+        segments = estimate(message)["segments"]
+        # Count by leading digits first; the trie is then walked once per distinct prefix
+        end = cls._countries.depth + 1
+        seen = set()
+        per_prefix: Counter = Counter()
+        invalid = duplicates = 0
+        for raw in recipients:
+            number = normalize_phone(raw, country)
+            if number is None:
+                invalid += 1
+                continue
+            if number in seen:
+                duplicates += 1
+                continue
+            seen.add(number)
+            per_prefix[number[1:end]] += 1
+        
+        per_country: Counter = Counter()
+        unknown: Counter = Counter()
+        for prefix, count in per_prefix.items():
+            code = cls._countries.longest_match(prefix)
+            if code is None:
+                # Calling codes are at most three digits
+                unknown[prefix[:3]] += count
+            else:
+                per_country[code] += count
+        
+        rates = await cls._rates.get_many(per_country)
+        lines = []
+        total_cost = 0.0
+        unpriced = sum(unknown.values())
+        for code, count in sorted(per_country.items(), key=lambda item: -item[1]):
+            rate = rates.get(code)
+            cost = round(rate["rate"] * segments * count, 4) if rate else None
+            if cost is None:
+                unpriced += count
+            else:
+                total_cost += cost
+            lines.append({
+                "country": code,
+                "recipients": count,
+                "segments": segments * count,
+                "rate": rate["rate"] if rate else None,
+                "cost": cost,
+                "error": None if rate else f"No ClickSend SMS rate available for {code}"
+            })
+        for prefix, count in sorted(unknown.items(), key=lambda item: -item[1]):
+            lines.append({
+                "country": None,
+                "prefix": "+" + prefix,
+                "recipients": count,
+                "segments": segments * count,
+                "rate": None,
+                "cost": None,
+                "error": f"Unknown country calling code for numbers starting +{prefix}"
+            })
+        
+        return {
+            "currency": PRICING_CURRENCY,
+            "message_segments": segments,
+            "recipients": len(seen),
+            "invalid": invalid,
+            "duplicates": duplicates,
+            "unpriced": unpriced,
+            "total_segments": segments * len(seen),
+            "total_cost": round(total_cost, 4),
+            "countries": lines
+        }
+
+    @classmethod
+    def get_rate_stats(cls) -> Dict[str, Any]:
+        """Return the cached countries and rate table hit/miss/refresh counters."""
+        return cls._rates.stats()
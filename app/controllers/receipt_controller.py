@@ -0,0 +1,156 @@
+"""Controller for ClickSend delivery receipt and inbound SMS webhooks."""
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+from app.config import RECEIPT_DB_PATH, RECEIPT_BATCH_SIZE, RECEIPT_FLUSH_INTERVAL, RECEIPT_BUFFER_MAX
+from app.utils.batch_writer import BatchWriter
+from app.utils.receipt_store import ReceiptStore
+
+# Event field -> ClickSend webhook keys it may arrive under, in order of preference
+_FIELDS = {
+    "message_id": ("message_id", "messageid", "original_message_id"),
+    "recipient": ("to", "recipient"),
+    "sender": ("from", "sender"),
+    "status": ("status", "status_text"),
+    "status_code": ("status_code", "error_code", "errorcode"),
+    "error_text": ("error_text", "errortext")
+}
+
+
+class ReceiptController:
+    """
+    Controller buffering webhook events and persisting them in batches.
+    
+    Webhooks only append to an in-memory buffer and return, so ClickSend
+    gets an immediate acknowledgement; a single flusher task writes the
+    buffer to SQLite once RECEIPT_BATCH_SIZE events are waiting or
+    RECEIPT_FLUSH_INTERVAL has passed.
+    """
+
+    _store: Optional[ReceiptStore] = None
+    _writer: Optional[BatchWriter] = None
+
+    @classmethod
+    async def start(cls, path: str = RECEIPT_DB_PATH) -> None:
+        """Open the store and start the flusher task."""
+        cls._store = await asyncio.to_thread(ReceiptStore, path)
+        cls._writer = BatchWriter(
+            cls._store.insert_many,
+            batch_size=RECEIPT_BATCH_SIZE,
+            interval=RECEIPT_FLUSH_INTERVAL,
+            max_buffer=RECEIPT_BUFFER_MAX,
+            name="receipt"
+        )
+        cls._writer.start()
+
+    @classmethod
+    async def stop(cls) -> None:
+        """Stop the flusher, write any buffered events and close the store."""
+        if cls._writer is not None:
+            await cls._writer.stop()
+            cls._writer = None
+        
+        if cls._store is not None:
+            await asyncio.to_thread(cls._store.close)
+            cls._store = None
+
+    @classmethod
+    async def ingest(cls, kind: str, events: List[Dict[str, Any]]) -> int:
+        """
+        Buffer webhook events for the flusher.
+        
+        Only waits when the buffer is already at RECEIPT_BUFFER_MAX, so a
+        receipt storm is throttled instead of growing memory without bound.
+        
+        Args:
+            kind: "delivery" or "inbound"
+            events: Raw webhook payloads
+            
+        Returns:
+            Number of events accepted
+        """
+        if cls._store is None:
+            raise RuntimeError("Receipt store is not running")
+        
+        received_at = time.time()
+        await cls._writer.put([cls.normalise(kind, event, received_at) for event in events])
+        return len(events)
+
+    @classmethod
+    async def get_message(cls, message_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the delivery state of a message.
+        
+        Events still waiting in the buffer are included, so a lookup right
+        after a webhook sees it before the next flush.
+        
+        Returns:
+            Dict with the latest status and event history, or None if no
+            events exist for the message
+        """
+        if cls._store is None:
+            raise RuntimeError("Receipt store is not running")
+        
+        # Holding the write lock keeps a batch from being both stored and still buffered
+        async with cls._writer.lock:
+            events = await asyncio.to_thread(cls._store.for_message, message_id)
+            events += [event for event in cls._writer.buffer if event["message_id"] == message_id]
+        if not events:
+            return None
+        
+        deliveries = [event for event in events if event["kind"] == "delivery"]
+        latest = deliveries[-1] if deliveries else None
+        return {
+            "message_id": message_id,
+            "status": latest["status"] if latest else None,
+            "status_code": latest["status_code"] if latest else None,
+            "updated_at": events[-1]["received_at"],
+            "events": events
+        }
+
+    @classmethod
+    async def list_events(
+        cls,
+        limit: int,
+        cursor: Optional[int] = None,
+        kind: Optional[str] = None,
+        status: Optional[str] = None,
+        recipient: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Return a page of stored events, newest first.
+        
+        Args:
+            limit: Page size
+            cursor: `next_cursor` from the previous page
+            kind, status, recipient: Optional filters
+            
+        Returns:
+            Dict with the events and the cursor for the next page (None on the last page)
+        """
+        if cls._store is None:
+            raise RuntimeError("Receipt store is not running")
+        
+        events = await asyncio.to_thread(cls._store.page, limit + 1, cursor, kind, status, recipient)
+        has_more = len(events) > limit
+        events = events[:limit]
+        return {"events": events, "next_cursor": events[-1]["id"] if has_more else None}
+
+    @staticmethod
+    def normalise(kind: str, event: Dict[str, Any], received_at: float) -> Dict[str, Any]:
+        """
+        Map a raw ClickSend webhook payload onto the indexed columns.
+        
+        The full payload is kept alongside, since field names differ
+        between receipt formats and ClickSend account settings.
+        """
+        record = {"kind": kind, "received_at": received_at, "payload": event}
+        for field, keys in _FIELDS.items():
+            value = next((event[key] for key in keys if event.get(key) not in (None, "")), None)
+            record[field] = str(value) if value is not None else None
+        
+        try:
+            record["event_at"] = float(event.get("timestamp"))
+        except (TypeError, ValueError):
+            record["event_at"] = None
+        return record
@@ -0,0 +1,258 @@
+"""Controller releasing scheduled sends when they fall due."""
+import asyncio
+import heapq
+import logging
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+from app.config import (
+    SCHEDULE_DB_PATH, SCHEDULE_RELEASE_BATCH, SCHEDULE_MAX_INFLIGHT_BATCHES,
+    SCHEDULE_SHUTDOWN_TIMEOUT, SCHEDULE_LEASE_TIMEOUT
+)
+from app.controllers.clicksend_controller import ClickSendController
+from app.utils.schedule_store import ScheduleStore
+
+logger = logging.getLogger(__name__)
+
+# Longest single sleep, so the timer follows wall-clock adjustments
+_MAX_SLEEP = 60.0
+
+
+class ScheduleController:
+    """
+    Controller owning scheduled sends and the timer that releases them.
+    
+    Sends are stored in SQLite; only (send_at, id) pairs are kept in an
+    in-memory heap, rebuilt from the store at startup. The timer task
+    sleeps until the earliest due time (or until an earlier send is
+    scheduled) instead of polling, then releases due sends in batches
+    through the bulk send path, so rate limits apply as for any batch.
+    """
+
+    _store: Optional[ScheduleStore] = None
+    _heap: List[Tuple[float, int]] = []
+    _timer: Optional[asyncio.Task] = None
+    _heartbeat: Optional[asyncio.Task] = None
+    _wakeup: Optional[asyncio.Event] = None
+    _releases: Set[asyncio.Task] = set()
+    _release_slots: Optional[asyncio.Semaphore] = None
+
+    @classmethod
+    async def start(cls, path: str = SCHEDULE_DB_PATH) -> None:
+        """
+        Open the store, rebuild the heap and start the timer.
+        
+        Sends interrupted mid-release by a process that stopped renewing
+        its lease are made pending again (now and from the heartbeat), so
+        they are released rather than lost, while sends other live
+        processes are releasing are left alone.
+        """
+        cls._store = await asyncio.to_thread(ScheduleStore, path, SCHEDULE_LEASE_TIMEOUT)
+        recovered = await asyncio.to_thread(cls._store.recover)
+        if recovered:
+            logger.info("Requeued %d interrupted scheduled sends", len(recovered))
+        
+        # Rows come back ordered by send_at, which already satisfies the heap invariant
+        cls._heap = await asyncio.to_thread(cls._store.pending)
+        cls._wakeup = asyncio.Event()
+        cls._releases = set()
+        cls._release_slots = asyncio.Semaphore(SCHEDULE_MAX_INFLIGHT_BATCHES)
+        cls._timer = asyncio.create_task(cls._run())
+        cls._heartbeat = asyncio.create_task(cls._keep_leases())
+
+    @classmethod
+    async def stop(cls) -> None:
+        """
+        Stop the timer and wait for batches being released.
+        
+        Batches get SCHEDULE_SHUTDOWN_TIMEOUT seconds to finish. A batch
+        cancelled after that records the results it has, fails sends that
+        were handed to ClickSend without an answer (they may have been
+        sent) and returns the rest to pending.
+        """
+        if cls._timer is not None:
+            cls._timer.cancel()
+            await asyncio.gather(cls._timer, return_exceptions=True)
+        releases = list(cls._releases)
+        if releases:
+            _, pending = await asyncio.wait(releases, timeout=SCHEDULE_SHUTDOWN_TIMEOUT)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*releases, return_exceptions=True)
+        if cls._heartbeat is not None:
+            cls._heartbeat.cancel()
+            await asyncio.gather(cls._heartbeat, return_exceptions=True)
+        cls._timer = None
+        cls._heartbeat = None
+        cls._releases = set()
+        cls._heap = []
+        
+        if cls._store is not None:
+            await asyncio.to_thread(cls._store.release)
+            await asyncio.to_thread(cls._store.close)
+            cls._store = None
+
+    @classmethod
+    async def schedule(cls, kind: str, payload: Dict[str, Any], send_at: float) -> Dict[str, Any]:
+        """
+        Store a send to be released at `send_at`.
+        
+        Args:
+            kind: "sms" or "email"
+            payload: Keyword arguments of the send (to, message / subject, body)
+            send_at: Unix time to send at
+            
+        Returns:
+            The stored scheduled send
+        """
+        if cls._store is None:
+            raise RuntimeError("Scheduler is not running")
+        
+        scheduled = await asyncio.to_thread(cls._store.add, kind, payload, send_at)
+        is_earliest = not cls._heap or send_at < cls._heap[0][0]
+        heapq.heappush(cls._heap, (send_at, scheduled["id"]))
+        if is_earliest:
+            cls._wakeup.set()
+        return scheduled
+
+    @classmethod
+    async def get(cls, send_id: int) -> Optional[Dict[str, Any]]:
+        """Return a scheduled send by ID, or None if it does not exist."""
+        if cls._store is None:
+            raise RuntimeError("Scheduler is not running")
+        return await asyncio.to_thread(cls._store.get, send_id)
+
+    @classmethod
+    async def cancel(cls, send_id: int) -> bool:
+        """
+        Cancel a pending send.
+        
+        Its heap entry is left in place and skipped when it falls due.
+        
+        Returns:
+            False if the send was already released or cancelled
+        """
+        if cls._store is None:
+            raise RuntimeError("Scheduler is not running")
+        return await asyncio.to_thread(cls._store.cancel, send_id)
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        """Return the number of queued timers and the next due time."""
+        return {
+            "queued": len(cls._heap),
+            "next_send_at": cls._heap[0][0] if cls._heap else None,
+            "releasing_batches": len(cls._releases)
+        }
+
+    @classmethod
+    async def _run(cls) -> None:
+        """Sleep until the next send is due, then release every due send."""
+        while True:
+            now = time.time()
+            if not cls._heap or cls._heap[0][0] > now:
+                delay = min(cls._heap[0][0] - now, _MAX_SLEEP) if cls._heap else None
+                try:
+                    await asyncio.wait_for(cls._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                cls._wakeup.clear()
+                continue
+            
+            due = []
+            while cls._heap and cls._heap[0][0] <= now and len(due) < SCHEDULE_RELEASE_BATCH:
+                due.append(heapq.heappop(cls._heap)[1])
+            
+            await cls._release_slots.acquire()
+            task = asyncio.create_task(cls._release(due))
+            cls._releases.add(task)
+            task.add_done_callback(cls._releases.discard)
+
+    @classmethod
+    async def _keep_leases(cls) -> None:
+        """Renew this process's release leases and reschedule sends whose owner stopped renewing them."""
+        while True:
+            await asyncio.sleep(SCHEDULE_LEASE_TIMEOUT / 3)
+            try:
+                await asyncio.to_thread(cls._store.renew)
+                recovered = await asyncio.to_thread(cls._store.recover)
+            except Exception:
+                logger.exception("Failed to renew scheduled send leases")
+                continue
+            if recovered:
+                logger.info("Requeued %d scheduled sends with expired leases", len(recovered))
+                for entry in recovered:
+                    heapq.heappush(cls._heap, entry)
+                cls._wakeup.set()
+
+    @classmethod
+    async def _release(cls, ids: List[int]) -> None:
+        """Claim a batch of due sends and dispatch them through the bulk send path."""
+        sends: List[Dict[str, Any]] = []
+        dispatched: List[Dict[str, Any]] = []
+        outcomes: List[Tuple[int, bool, Optional[Dict[str, Any]], Optional[str]]] = []
+        try:
+            sends = await asyncio.to_thread(cls._store.claim, ids)
+            sms = [send for send in sends if send["kind"] == "sms"]
+            emails = [send for send in sends if send["kind"] == "email"]
+            
+            if sms:
+                dispatched += sms
+                results = await ClickSendController.send_sms_batch([send["payload"] for send in sms])
+                outcomes += cls._outcomes(sms, results)
+            if emails:
+                dispatched += emails
+                results = await ClickSendController.send_email_batch([send["payload"] for send in emails])
+                outcomes += cls._outcomes(emails, results)
+            
+            if outcomes:
+                await asyncio.to_thread(cls._store.finish_many, outcomes)
+        except BaseException as e:
+            if not isinstance(e, asyncio.CancelledError):
+                logger.exception("Failed to release %d scheduled sends", len(ids))
+            # Settle the claimed rows, or the heartbeat would keep them "sending" for good
+            await cls._settle(sends, dispatched, outcomes, repr(e))
+            if isinstance(e, asyncio.CancelledError):
+                raise
+        finally:
+            cls._release_slots.release()
+
+    @classmethod
+    async def _settle(
+        cls,
+        sends: List[Dict[str, Any]],
+        dispatched: List[Dict[str, Any]],
+        outcomes: List[Tuple[int, bool, Optional[Dict[str, Any]], Optional[str]]],
+        error: str
+    ) -> None:
+        """
+        Record a failed release without risking duplicate sends.
+        
+        Sends with a batch result get it recorded, sends handed to ClickSend
+        without a result are failed (they may have gone out), and sends never
+        dispatched return to pending.
+        """
+        answered = {outcome[0] for outcome in outcomes}
+        rows = outcomes + [
+            (send["id"], False, None, f"Release interrupted after dispatch ({error}); not resent")
+            for send in dispatched if send["id"] not in answered
+        ]
+        dispatched_ids = {send["id"] for send in dispatched}
+        unsent = [send for send in sends if send["id"] not in dispatched_ids]
+        try:
+            if rows:
+                await asyncio.to_thread(cls._store.finish_many, rows)
+            if unsent:
+                await asyncio.to_thread(cls._store.release, [send["id"] for send in unsent])
+                for send in unsent:
+                    heapq.heappush(cls._heap, (send["send_at"], send["id"]))
+                cls._wakeup.set()
+        except Exception:
+            logger.exception("Failed to record %d interrupted scheduled sends", len(sends))
+
+    @staticmethod
+    def _outcomes(sends: List[Dict[str, Any]], results: List[Dict[str, Any]]) -> List[Tuple[int, bool, Dict[str, Any], Optional[str]]]:
+        """Pair claimed sends with their per-recipient batch results."""
+        return [
+            (send["id"], result["success"], result, result.get("error"))
+            for send, result in zip(sends, results)
+        ]
@@ -0,0 +1,152 @@
+"""Streaming bulk-upload controller for CSV/NDJSON recipient files."""
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Set, Tuple
+from pydantic import ValidationError
+from app.config import UPLOAD_SMS_CHUNK_SIZE, UPLOAD_EMAIL_CHUNK_SIZE, UPLOAD_MAX_INFLIGHT_CHUNKS
+from app.controllers.clicksend_controller import ClickSendController
+from app.models.schemas import EmailRequest, SMSRequest
+from app.utils.recipients import recipient_key
+
+
+class UploadController:
+    """Validate, dedupe and dispatch streamed recipient records in chunks."""
+
+    @staticmethod
+    def stream_sms(records: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Send an SMS for every record of an uploaded file.
+        
+        Args:
+            records: Parsed records with "to" and "message" fields
+            
+        Yields:
+            Result, progress and summary events
+        """
+        return UploadController._stream(
+            records, SMSRequest, ("to", "message"),
+            ClickSendController.send_sms_batch, UPLOAD_SMS_CHUNK_SIZE
+        )
+
+    @staticmethod
+    def stream_email(records: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Send an email for every record of an uploaded file.
+        
+        Args:
+            records: Parsed records with "to", "subject" and "body" fields
+            
+        Yields:
+            Result, progress and summary events
+        """
+        return UploadController._stream(
+            records, EmailRequest, ("to", "subject", "body"),
+            ClickSendController.send_email_batch, UPLOAD_EMAIL_CHUNK_SIZE
+        )
+
+    @staticmethod
+    async def _stream(
+        records: AsyncIterator[Dict[str, Any]],
+        model: type,
+        fields: tuple,
+        send_batch: Callable[[List[Dict[str, Any]]], Awaitable[List[Dict[str, Any]]]],
+        chunk_size: int
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Shared pipeline: parse -> validate -> dedupe -> dispatch in chunks.
+        
+        Reading pauses while UPLOAD_MAX_INFLIGHT_CHUNKS chunks are being sent,
+        so memory stays bounded by the chunk window rather than the file size.
+        Duplicates are detected with a set of the validated records' field
+        tuples, whose recipient the request model has already normalized.
+        """
+        counters = {"processed": 0, "sent": 0, "failed": 0, "invalid": 0, "duplicates": 0}
+        seen: Set[Tuple[Any, ...]] = set()
+        chunk: List[Dict[str, Any]] = []
+        rows: List[int] = []
+        inflight: Set[asyncio.Task] = set()
+        
+        def dispatch() -> None:
+            task = asyncio.create_task(UploadController._send_chunk(send_batch, chunk[:], rows[:]))
+            inflight.add(task)
+            chunk.clear()
+            rows.clear()
+        
+        async def drain(wait_all: bool) -> AsyncIterator[Dict[str, Any]]:
+            while inflight:
+                done, _ = await asyncio.wait(
+                    inflight, return_when=asyncio.ALL_COMPLETED if wait_all else asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    inflight.discard(task)
+                    for event in task.result():
+                        counters["sent" if event["success"] else "failed"] += 1
+                        yield event
+                    yield {"type": "progress", **counters}
+                if not wait_all and len(inflight) < UPLOAD_MAX_INFLIGHT_CHUNKS:
+                    return
+        
+        try:
+            async for record in records:
+                counters["processed"] += 1
+                row = record.pop("_row")
+                
+                if "_error" in record:
+                    counters["invalid"] += 1
+                    yield {"type": "result", "row": row, "success": False, "error": record["_error"]}
+                    continue
+                
+                try:
+                    item = model.model_validate(record)
+                except ValidationError as e:
+                    counters["invalid"] += 1
+                    yield {
+                        "type": "result",
+                        "row": row,
+                        "to": record.get("to"),
+                        "success": False,
+                        "error": "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+                    }
+                    continue
+                
+                values = {name: str(getattr(item, name)) for name in fields}
+                key = recipient_key(values.values())
+                if key in seen:
+                    counters["duplicates"] += 1
+                    yield {"type": "result", "row": row, "to": values["to"], "success": False, "status": "DUPLICATE"}
+                    continue
+                seen.add(key)
+                
+                chunk.append(values)
+                rows.append(row)
+                if len(chunk) >= chunk_size:
+                    dispatch()
+                    if len(inflight) >= UPLOAD_MAX_INFLIGHT_CHUNKS:
+                        async for event in drain(wait_all=False):
+                            yield event
+            
+            if chunk:
+                dispatch()
+            async for event in drain(wait_all=True):
+                yield event
+        finally:
+            # Client disconnected or parsing failed: stop outstanding chunk sends
+            for task in inflight:
+                task.cancel()
+        
+        yield {"type": "summary", **counters}
+
+    @staticmethod
+    async def _send_chunk(
+        send_batch: Callable[[List[Dict[str, Any]]], Awaitable[List[Dict[str, Any]]]],
+        chunk: List[Dict[str, Any]],
+        rows: List[int]
+    ) -> List[Dict[str, Any]]:
+        """Send one chunk and tag each per-recipient result with its source row."""
+        try:
+            results = await send_batch(chunk)
+        except Exception as e:
+            results = [
+                {"to": item["to"], "success": False, "status": None, "message_id": None, "error": str(e)}
+                for item in chunk
+            ]
+        return [{"type": "result", "row": row, **result} for row, result in zip(rows, results)]
@@ -0,0 +1,44 @@
+"""SQLite configuration for local persistent stores."""
+import os
+import sqlite3
+from typing import Dict
+
+
+def open_sqlite(path: str) -> sqlite3.Connection:
+    """
+    Open a SQLite database tuned for concurrent local use.
+    
+    WAL mode lets readers proceed while a writer commits, and the busy
+    timeout makes competing writers wait instead of failing immediately.
+    
+    Args:
+        path: Database file path (parent directories are created)
+        
+    Returns:
+        sqlite3.Connection usable from worker threads
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    return conn
+
+
+def add_missing_columns(conn: sqlite3.Connection, table: str, columns: Dict[str, str]) -> None:
+    """
+    Add columns introduced after a table was first created.
+    
+    Args:
+        conn: Open connection
+        table: Existing table name
+        columns: Column name -> definition (type, constraints, default)
+    """
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    for name, definition in columns.items():
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
@@ -1,5 +1,20 @@
 """Pydantic models for request/response validation."""
-from app.models.schemas import EmailRequest, SMSRequest, NotificationResponse
-
-__all__ = ["EmailRequest", "SMSRequest", "NotificationResponse"]
+from app.models.schemas import (
+    EmailRequest, SMSRequest, NotificationResponse,
+    SMSBatchMessage, SMSBatchRequest, EmailBatchRecipient, EmailBatchRequest,
+    SMSEstimateRequest, SMSEstimate, SMSEstimateResponse,
+    SMSQuoteRequest, SMSQuoteCountry, SMSQuoteResponse,
+    RecipientResult, BatchResponse, JobResponse,
+    ReceiptEvent, MessageStatusResponse, ReceiptPage,
+    HistoryEntry, HistoryPage, ScheduledSendResponse
+)
 
+__all__ = [
+    "EmailRequest", "SMSRequest", "NotificationResponse",
+    "SMSBatchMessage", "SMSBatchRequest", "EmailBatchRecipient", "EmailBatchRequest",
+    "SMSEstimateRequest", "SMSEstimate", "SMSEstimateResponse",
+    "SMSQuoteRequest", "SMSQuoteCountry", "SMSQuoteResponse",
+    "RecipientResult", "BatchResponse", "JobResponse",
+    "ReceiptEvent", "MessageStatusResponse", "ReceiptPage",
+    "HistoryEntry", "HistoryPage", "ScheduledSendResponse"
+]
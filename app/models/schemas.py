@@ -1,6 +1,25 @@
 """Pydantic models for validation."""
-from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from datetime import datetime, timezone
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
+from typing import Any, Dict, List, Optional
+from app.config import SMS_MAX_SEGMENTS
+from app.utils.recipients import COUNTRY_CALLING_CODES, normalize_email, normalize_phone
+from app.utils.sms_encoding import estimate
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _phone(value: Any) -> Any:
+    if not isinstance(value, str):
+        return value
+    number = normalize_phone(value)
+    if number is None:
+        raise ValueError("Phone number must be E.164 (+[country code][number]) or a national number of DEFAULT_COUNTRY")
+    return number
 
 
 class EmailRequest(BaseModel):
@@ -8,12 +27,57 @@ class EmailRequest(BaseModel):
     to: EmailStr = Field(..., description="Recipient email address")
     subject: str = Field(..., description="Email subject", min_length=1)
     body: str = Field(..., description="Email body content", min_length=1)
+    dry_run: bool = Field(False, description="Validate only; do not contact ClickSend")
+    send_at: Optional[datetime] = Field(None, description="Send at this time instead of now (naive times are UTC)")
+
+    @field_validator("to")
+    @classmethod
+    def lowercase_to(cls, value: str) -> str:
+        """Lowercase the address so case variants are one recipient."""
+        return normalize_email(value)
+
+    @field_validator("send_at")
+    @classmethod
+    def default_utc(cls, value: Optional[datetime]) -> Optional[datetime]:
+        """Treat times without a timezone as UTC."""
+        return _as_utc(value)
+
 
+class SMSBatchMessage(BaseModel):
+    """A single recipient/message pair of a batch SMS send."""
+    model_config = ConfigDict(extra="forbid")
 
-class SMSRequest(BaseModel):
+    to: str = Field(..., description="Recipient phone number (E.164, or national format for DEFAULT_COUNTRY)")
+    message: str = Field(..., description="SMS message content (long messages are sent as multiple parts)", min_length=1)
+
+    @field_validator("to", mode="before")
+    @classmethod
+    def normalize_to(cls, value: Any) -> Any:
+        """Convert the number to E.164."""
+        return _phone(value)
+
+    @field_validator("message")
+    @classmethod
+    def check_segments(cls, value: str) -> str:
+        """Reject messages that would need more than SMS_MAX_SEGMENTS parts."""
+        segments = estimate(value)["segments"]
+        if segments > SMS_MAX_SEGMENTS:
+            raise ValueError(f"Message needs {segments} SMS parts; the maximum is {SMS_MAX_SEGMENTS}")
+        return value
+
+
+class SMSRequest(SMSBatchMessage):
     """Request model for sending SMS."""
-    to: str = Field(..., description="Recipient phone number (E.164 format)", pattern=r"^\+\d{10,15}$")
-    message: str = Field(..., description="SMS message content", min_length=1, max_length=160)
+    model_config = ConfigDict(extra="ignore")
+
+    dry_run: bool = Field(False, description="Validate only; do not contact ClickSend")
+    send_at: Optional[datetime] = Field(None, description="Send at this time instead of now (naive times are UTC)")
+
+    @field_validator("send_at")
+    @classmethod
+    def default_utc(cls, value: Optional[datetime]) -> Optional[datetime]:
+        """Treat times without a timezone as UTC."""
+        return _as_utc(value)
 
 
 class NotificationResponse(BaseModel):
@@ -22,3 +86,185 @@ class NotificationResponse(BaseModel):
     message: str
     data: Optional[dict] = None
 
+
+class SMSBatchRequest(BaseModel):
+    """Request model for sending many SMS messages at once."""
+    messages: List[SMSBatchMessage] = Field(..., description="Recipient/message pairs (dry_run and send_at are not supported per message)", min_length=1)
+
+
+class EmailBatchRecipient(BaseModel):
+    """A single recipient of a batch email, with optional overrides."""
+    to: EmailStr = Field(..., description="Recipient email address")
+    subject: Optional[str] = Field(None, description="Subject override for this recipient", min_length=1)
+    body: Optional[str] = Field(None, description="Body override for this recipient", min_length=1)
+    variables: Optional[Dict[str, str]] = Field(None, description="Values for {{ name }} placeholders in subject and body")
+
+    @field_validator("to")
+    @classmethod
+    def lowercase_to(cls, value: str) -> str:
+        """Lowercase the address so case variants are one recipient."""
+        return normalize_email(value)
+
+
+class EmailBatchRequest(BaseModel):
+    """Request model for sending an email to many recipients."""
+    subject: str = Field(..., description="Default email subject", min_length=1)
+    body: str = Field(..., description="Default email body content", min_length=1)
+    recipients: List[EmailBatchRecipient] = Field(..., description="Recipients", min_length=1)
+
+
+class SMSEstimateRequest(BaseModel):
+    """Request model for estimating SMS encoding and parts."""
+    messages: List[str] = Field(..., description="Message bodies to estimate", min_length=1)
+
+
+class SMSEstimate(BaseModel):
+    """Encoding and part count for one message."""
+    encoding: str = Field(..., description="GSM-7 or UCS-2")
+    characters: int
+    units: int = Field(..., description="GSM-7 septets or UCS-2 code units")
+    segments: int
+
+
+class SMSEstimateResponse(BaseModel):
+    """Response model for SMS estimates."""
+    total_segments: int
+    results: List[SMSEstimate]
+
+
+class SMSQuoteRequest(BaseModel):
+    """Request model for quoting the cost of an SMS campaign."""
+    message: str = Field(..., description="SMS message content", min_length=1)
+    recipients: List[str] = Field(..., description="Phone numbers (E.164 or national format)", min_length=1)
+    country: Optional[str] = Field(None, description="Country of national-format numbers (defaults to DEFAULT_COUNTRY)", min_length=2, max_length=2)
+
+    @field_validator("country")
+    @classmethod
+    def known_country(cls, value: Optional[str]) -> Optional[str]:
+        """Reject countries without a calling code, which would mark every national number invalid."""
+        if value is None:
+            return value
+        value = value.upper()
+        if value not in COUNTRY_CALLING_CODES:
+            raise ValueError(f"Unknown country {value}; use an ISO 3166 alpha-2 code with a calling code")
+        return value
+
+
+class SMSQuoteCountry(BaseModel):
+    """Cost of the recipients in one country."""
+    country: Optional[str] = Field(None, description="ISO country code (null when the prefix is not recognised)")
+    prefix: Optional[str] = Field(None, description="Leading digits of numbers with an unrecognised calling code")
+    recipients: int
+    segments: int
+    rate: Optional[float] = Field(None, description="Price per SMS part (null when ClickSend has no rate)")
+    cost: Optional[float] = None
+    error: Optional[str] = Field(None, description="Why these recipients could not be priced")
+
+
+class SMSQuoteResponse(BaseModel):
+    """Response model for an SMS price quote."""
+    currency: str
+    message_segments: int = Field(..., description="Parts per message")
+    recipients: int = Field(..., description="Distinct valid recipients")
+    invalid: int
+    duplicates: int
+    unpriced: int = Field(..., description="Recipients in countries without a known rate (not in total_cost)")
+    total_segments: int
+    total_cost: float
+    countries: List[SMSQuoteCountry]
+
+
+class RecipientResult(BaseModel):
+    """Per-recipient outcome of a batch send."""
+    to: str
+    success: bool
+    status: Optional[str] = None
+    message_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BatchResponse(BaseModel):
+    """Response model for batch sending."""
+    success: bool
+    message: str
+    total: int
+    sent: int
+    failed: int
+    duplicates: int = Field(0, description="Repeats of an earlier recipient and message, not sent")
+    results: List[RecipientResult]
+
+
+class JobResponse(BaseModel):
+    """Response model for a queued background send."""
+    job_id: str
+    kind: str
+    status: str = Field(..., description="queued, running, succeeded or failed")
+    attempts: int
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: float
+    updated_at: float
+
+
+class ReceiptEvent(BaseModel):
+    """A delivery receipt or inbound message received from ClickSend."""
+    id: Optional[int] = Field(None, description="Store sequence number; None while still buffered")
+    kind: str = Field(..., description="delivery or inbound")
+    message_id: Optional[str] = None
+    recipient: Optional[str] = None
+    sender: Optional[str] = None
+    status: Optional[str] = None
+    status_code: Optional[str] = None
+    error_text: Optional[str] = None
+    event_at: Optional[float] = Field(None, description="ClickSend timestamp of the event")
+    received_at: float
+    payload: Dict[str, Any] = Field(..., description="Webhook payload as received")
+
+
+class MessageStatusResponse(BaseModel):
+    """Delivery state of one sent message."""
+    message_id: str
+    status: Optional[str] = Field(None, description="Latest delivery receipt status")
+    status_code: Optional[str] = None
+    updated_at: float
+    events: List[ReceiptEvent]
+
+
+class ReceiptPage(BaseModel):
+    """A page of receipt events, newest first."""
+    events: List[ReceiptEvent]
+    next_cursor: Optional[int] = Field(None, description="Pass as `cursor` for the next page")
+
+
+class HistoryEntry(BaseModel):
+    """One recorded send."""
+    id: int
+    kind: str = Field(..., description="sms or email")
+    recipient: str
+    message_id: Optional[str] = None
+    status: Optional[str] = None
+    success: bool
+    status_code: Optional[int] = Field(None, description="HTTP status of the ClickSend call")
+    cost: Optional[float] = None
+    latency_ms: Optional[float] = None
+    error: Optional[str] = None
+    request: Dict[str, Any]
+    created_at: float
+
+
+class HistoryPage(BaseModel):
+    """A page of send history, newest first."""
+    sends: List[HistoryEntry]
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` for the next page")
+
+
+class ScheduledSendResponse(BaseModel):
+    """Response model for a send scheduled with send_at."""
+    schedule_id: int
+    kind: str
+    status: str = Field(..., description="pending, sending, sent, failed or cancelled")
+    send_at: float = Field(..., description="Unix time the send is released")
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: float
+    updated_at: float
@@ -1,9 +1,10 @@
 """Route definitions."""
 from fastapi import APIRouter
-from app.routes import api_routes
+from app.routes import api_routes, receipt_routes
 
 router = APIRouter()
 router.include_router(api_routes.router, prefix="/api", tags=["api"])
+router.include_router(receipt_routes.router, prefix="/api", tags=["api"])
 
 __all__ = ["router"]
 
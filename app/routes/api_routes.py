@@ -1,29 +1,218 @@
 """API routes for ClickSend testing."""
-from fastapi import APIRouter, HTTPException
-from app.models.schemas import EmailRequest, SMSRequest, NotificationResponse
+import hashlib
+import json
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from starlette.datastructures import UploadFile
+from app.models.schemas import (
+    EmailRequest, SMSRequest, NotificationResponse,
+    SMSBatchRequest, EmailBatchRequest, RecipientResult, BatchResponse, JobResponse,
+    SMSEstimateRequest, SMSEstimate, SMSEstimateResponse, SMSQuoteRequest, SMSQuoteResponse,
+    HistoryPage, ScheduledSendResponse
+)
 from app.controllers.clicksend_controller import ClickSendController
-from app.config import CLICKSEND_EMAIL
-import httpx
+from app.controllers.history_controller import HistoryController
+from app.controllers.job_controller import JobController
+from app.controllers.pricing_controller import PricingController
+from app.controllers.schedule_controller import ScheduleController
+from app.controllers.upload_controller import UploadController
+from app.config import (
+    CLICKSEND_EMAIL, IDEMPOTENCY_TTL, IDEMPOTENCY_MAX_KEYS, IDEMPOTENCY_DB_PATH, SHARED_STATE_PATH,
+    EMAIL_ADDRESSES_CACHE_TTL, EMAIL_ATTACHMENT_MAX_BYTES, EMAIL_ATTACHMENT_MAX_FILES,
+    ATTACHMENT_CHUNK_SIZE
+)
+from app.utils.attachments import Attachment
+from app.utils.http_cache import conditional_response, make_etag
+from app.utils.idempotency import IdempotencyConflict, IdempotencyStore
+from app.utils.recipients import split_duplicates
+from app.utils.record_stream import iter_records, record_format
+from app.utils.sms_encoding import estimate_many
+from app.utils.templating import render_placeholders
 
 router = APIRouter()
 
+# Request fields that control how a send is made rather than what is sent
+_SEND_OPTIONS = {"dry_run", "send_at"}
 
-@router.post("/email/send", response_model=NotificationResponse, tags=["email"])
-async def send_email(request: EmailRequest) -> NotificationResponse:
+# Responses of send requests made with an Idempotency-Key header
+idempotency_store = IdempotencyStore(
+    ttl=IDEMPOTENCY_TTL,
+    maxsize=IDEMPOTENCY_MAX_KEYS,
+    path=IDEMPOTENCY_DB_PATH or SHARED_STATE_PATH or None
+)
+
+
+@router.post(
+    "/email/send",
+    response_model=NotificationResponse,
+    responses={202: {"model": JobResponse}},
+    tags=["email"],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": EmailRequest.model_json_schema()},
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "required": ["to", "subject", "body"],
+                        "properties": {
+                            "to": {"type": "string", "format": "email"},
+                            "subject": {"type": "string"},
+                            "body": {"type": "string"},
+                            "dry_run": {"type": "boolean"},
+                            "attachments": {"type": "array", "items": {"type": "string", "format": "binary"}}
+                        }
+                    }
+                }
+            }
+        }
+    }
+)
+async def send_email(
+    http_request: Request,
+    background: bool = False,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+) -> NotificationResponse:
     """
     Send an email notification via ClickSend.
     
+    Accepts a JSON EmailRequest, or multipart/form-data with the same
+    fields plus files under `attachments`; attachments are sent
+    immediately (no background or send_at).
+    
     Args:
-        request: Email request with to, subject, and body
+        http_request: JSON or multipart request with to, subject, and body
+        background: Queue the send and return 202 with a job instead of waiting
+        idempotency_key: Optional key; repeats replay the first response without resending
         
     Returns:
-        NotificationResponse with success status and message
+        NotificationResponse with success status and message; 202 with a
+        scheduled send when `send_at` is in the future
     """
+    if http_request.headers.get("content-type", "").startswith("multipart/form-data"):
+        return await _send_email_with_attachments(http_request, background, idempotency_key)
+    
+    request = _parse_json(EmailRequest, await http_request.body())
+    if request.dry_run:
+        return NotificationResponse(
+            success=True,
+            message="Dry run: email validated, not sent",
+            data={"to": request.to, "subject": request.subject, "body_length": len(request.body)}
+        )
+    
+    return await _with_idempotency(
+        idempotency_key, f"email/send?background={background}", request,
+        lambda: _send_email(request, background)
+    )
+
+
+async def _send_email_with_attachments(
+    http_request: Request,
+    background: bool,
+    idempotency_key: Optional[str]
+) -> NotificationResponse:
+    """
+    Send a multipart email request with file attachments.
+    
+    Starlette spools uploads to temporary files (in memory only up to
+    1 MB each), and the controller streams them to ClickSend as base64,
+    so large attachments are never held in memory whole.
+    """
+    if background:
+        raise HTTPException(status_code=400, detail="Emails with attachments cannot be sent in the background")
+    
+    async with http_request.form(max_files=EMAIL_ATTACHMENT_MAX_FILES, max_fields=20) as form:
+        fields = {name: value for name, value in form.multi_items() if isinstance(value, str)}
+        uploads = [value for _, value in form.multi_items() if isinstance(value, UploadFile)]
+        try:
+            request = EmailRequest.model_validate(fields)
+        except ValidationError as e:
+            raise RequestValidationError(_body_errors(e))
+        if request.send_at is not None:
+            raise HTTPException(status_code=400, detail="Emails with attachments cannot be scheduled")
+        
+        attachments = [
+            Attachment(
+                upload.filename or "attachment",
+                upload.content_type or "application/octet-stream",
+                upload.size,
+                upload
+            )
+            for upload in uploads
+        ]
+        total_size = sum(attachment.size for attachment in attachments)
+        if total_size > EMAIL_ATTACHMENT_MAX_BYTES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Attachments total {total_size} bytes; the limit is {EMAIL_ATTACHMENT_MAX_BYTES}"
+            )
+        
+        if request.dry_run:
+            return NotificationResponse(
+                success=True,
+                message="Dry run: email validated, not sent",
+                data={
+                    "to": request.to,
+                    "subject": request.subject,
+                    "body_length": len(request.body),
+                    "attachments": [{"filename": a.filename, "size": a.size} for a in attachments]
+                }
+            )
+        
+        # Fold the file contents into the idempotency fingerprint
+        digest = await _digest_attachments(attachments) if idempotency_key else ""
+        return await _with_idempotency(
+            idempotency_key, f"email/send+attachments:{digest}", request,
+            lambda: _send_email(request, False, attachments)
+        )
+
+
+async def _digest_attachments(attachments: list) -> str:
+    """SHA-256 over attachment names and contents, read in chunks."""
+    digest = hashlib.sha256()
+    for attachment in attachments:
+        digest.update(f"{attachment.filename}:{attachment.size}:".encode())
+        await attachment.file.seek(0)
+        while chunk := await attachment.file.read(ATTACHMENT_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _parse_json(model: type, body: bytes) -> BaseModel:
+    """Validate a raw JSON body, reporting errors like FastAPI's own body parsing."""
+    try:
+        return model.model_validate_json(body)
+    except ValidationError as e:
+        raise RequestValidationError(_body_errors(e))
+
+
+def _body_errors(error: ValidationError) -> list:
+    """Validation errors located under `body`, as FastAPI reports them."""
+    return [
+        {**item, "loc": ("body", *item["loc"])}
+        for item in error.errors(include_url=False)
+    ]
+
+
+async def _send_email(request: EmailRequest, background: bool, attachments: Optional[list] = None) -> NotificationResponse:
+    """Send (or queue, or schedule) a single email."""
+    if _is_future(request.send_at):
+        return await _schedule_send("email", request)
+    if background:
+        return await _enqueue_job("email", request.model_dump(exclude=_SEND_OPTIONS))
+    
     try:
         result = await ClickSendController.send_email(
             to=request.to,
             subject=request.subject,
-            body=request.body
+            body=request.body,
+            attachments=attachments
         )
         
         if result["success"]:
@@ -46,17 +235,92 @@ async def send_email(request: EmailRequest) -> NotificationResponse:
         raise HTTPException(status_code=500, detail=f"Failed to send email: {str(e)}")
 
 
-@router.post("/sms/send", response_model=NotificationResponse, tags=["sms"])
-async def send_sms(request: SMSRequest) -> NotificationResponse:
+@router.post("/email/send-batch", response_model=BatchResponse, tags=["email"])
+async def send_email_batch(
+    request: EmailBatchRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+) -> BatchResponse:
+    """
+    Send an email to many recipients via ClickSend.
+    
+    Each recipient may override the subject/body and supply values for
+    `{{ name }}` placeholders.
+    
+    Args:
+        request: Default subject/body and the list of recipients
+        idempotency_key: Optional key; repeats replay the first response without resending
+        
+    Returns:
+        BatchResponse with a status entry per recipient
+    """
+    return await _with_idempotency(
+        idempotency_key, "email/send-batch", request,
+        lambda: _send_email_batch(request)
+    )
+
+
+async def _send_email_batch(request: EmailBatchRequest) -> BatchResponse:
+    """Send a batch email to every recipient."""
+    recipients = [
+        {
+            "to": recipient.to,
+            "subject": render_placeholders(recipient.subject or request.subject, recipient.variables),
+            "body": render_placeholders(recipient.body or request.body, recipient.variables)
+        }
+        for recipient in request.recipients
+    ]
+    
+    try:
+        results = await _send_unique(recipients, ("to", "subject", "body"), ClickSendController.send_email_batch)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to send email batch: {str(e)}")
+    
+    return _batch_response(results, "email")
+
+
+@router.post(
+    "/sms/send",
+    response_model=NotificationResponse,
+    responses={202: {"model": JobResponse}},
+    tags=["sms"]
+)
+async def send_sms(
+    request: SMSRequest,
+    background: bool = False,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+) -> NotificationResponse:
     """
     Send an SMS notification via ClickSend.
     
     Args:
         request: SMS request with to and message
+        background: Queue the send and return 202 with a job instead of waiting
+        idempotency_key: Optional key; repeats replay the first response without resending
         
     Returns:
-        NotificationResponse with success status and message
+        NotificationResponse with success status and message; 202 with a
+        scheduled send when `send_at` is in the future
     """
+    if request.dry_run:
+        return NotificationResponse(
+            success=True,
+            message="Dry run: SMS validated, not sent",
+            data={"to": request.to, **estimate_many([request.message])[0]}
+        )
+    
+    return await _with_idempotency(
+        idempotency_key, f"sms/send?background={background}", request,
+        lambda: _send_sms(request, background)
+    )
+
+
+async def _send_sms(request: SMSRequest, background: bool) -> NotificationResponse:
+    """Send (or queue, or schedule) a single SMS."""
+    if _is_future(request.send_at):
+        return await _schedule_send("sms", request)
+    if background:
+        return await _enqueue_job("sms", request.model_dump(exclude=_SEND_OPTIONS))
+    
     try:
         result = await ClickSendController.send_sms(
             to=request.to,
@@ -83,17 +347,417 @@ async def send_sms(request: SMSRequest) -> NotificationResponse:
         raise HTTPException(status_code=500, detail=f"Failed to send SMS: {str(e)}")
 
 
+@router.post("/sms/send-batch", response_model=BatchResponse, tags=["sms"])
+async def send_sms_batch(
+    request: SMSBatchRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+) -> BatchResponse:
+    """
+    Send many SMS notifications via ClickSend in as few requests as possible.
+    
+    Args:
+        request: Batch of to/message pairs
+        idempotency_key: Optional key; repeats replay the first response without resending
+        
+    Returns:
+        BatchResponse with a status entry per recipient
+    """
+    return await _with_idempotency(
+        idempotency_key, "sms/send-batch", request,
+        lambda: _send_sms_batch(request)
+    )
+
+
+async def _send_sms_batch(request: SMSBatchRequest) -> BatchResponse:
+    """Send every SMS in a batch."""
+    try:
+        results = await _send_unique(
+            [{"to": item.to, "message": item.message} for item in request.messages],
+            ("to", "message"),
+            ClickSendController.send_sms_batch
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to send SMS batch: {str(e)}")
+    
+    return _batch_response(results, "SMS")
+
+
+@router.post("/sms/estimate", response_model=SMSEstimateResponse, tags=["sms"])
+async def estimate_sms(request: SMSEstimateRequest) -> SMSEstimateResponse:
+    """
+    Estimate encoding and number of parts for SMS messages without sending.
+    
+    A message is sent as GSM-7 (160 characters, or 153 per part when split)
+    unless it contains a character outside the GSM alphabet, in which case
+    the whole message is UCS-2 (70, or 67 per part).
+    
+    Args:
+        request: Message bodies to estimate
+        
+    Returns:
+        SMSEstimateResponse with per-message encoding and segments
+    """
+    results = estimate_many(request.messages)
+    return SMSEstimateResponse(
+        total_segments=sum(result["segments"] for result in results),
+        results=[SMSEstimate(**result) for result in results]
+    )
+
+
+@router.post("/sms/quote", response_model=SMSQuoteResponse, tags=["sms"])
+async def quote_sms(request: SMSQuoteRequest) -> SMSQuoteResponse:
+    """
+    Quote what sending a message to a list of recipients would cost, without sending.
+    
+    Numbers are normalized and de-duplicated as for a batch send, grouped by
+    country and priced with ClickSend's per-country rates times the
+    message's part count. Rates are cached (PRICING_CACHE_TTL) and refreshed
+    in the background, so only the first quote for a country waits on
+    ClickSend.
+    
+    Args:
+        request: Message, recipients and optional default country
+        
+    Returns:
+        SMSQuoteResponse with totals and a cost line per country
+    """
+    return SMSQuoteResponse(**await PricingController.quote(request.message, request.recipients, request.country))
+
+
+@router.get("/sms/pricing", tags=["sms", "debug"])
+async def get_sms_pricing_stats():
+    """
+    Debug endpoint showing which countries' SMS rates are cached and how
+    often quotes hit, missed or refreshed the rate table.
+    """
+    return PricingController.get_rate_stats()
+
+
+@router.post("/sms/upload", tags=["sms"])
+async def upload_sms(request: Request) -> StreamingResponse:
+    """
+    Send an SMS to every row of a streamed CSV or NDJSON upload.
+    
+    Post the file as the raw request body with `Content-Type: text/csv`
+    (header row with `to,message`) or `application/x-ndjson` (one
+    `{"to": ..., "message": ...}` object per line). Rows are validated,
+    deduplicated and sent in chunks while the file is still uploading.
+    
+    Returns:
+        NDJSON stream of per-row results, progress updates and a final summary
+    """
+    return _stream_upload(request, UploadController.stream_sms)
+
+
+@router.post("/email/upload", tags=["email"])
+async def upload_email(request: Request) -> StreamingResponse:
+    """
+    Send an email to every row of a streamed CSV or NDJSON upload.
+    
+    Post the file as the raw request body with `Content-Type: text/csv`
+    (header row with `to,subject,body`) or `application/x-ndjson`.
+    
+    Returns:
+        NDJSON stream of per-row results, progress updates and a final summary
+    """
+    return _stream_upload(request, UploadController.stream_email)
+
+
+def _stream_upload(
+    request: Request,
+    pipeline: Callable[[AsyncIterator[Dict[str, Any]]], AsyncIterator[Dict[str, Any]]]
+) -> StreamingResponse:
+    """Run an upload pipeline over the request body and stream events back as NDJSON."""
+    fmt = record_format(request.headers.get("content-type"))
+    if not fmt:
+        raise HTTPException(
+            status_code=415,
+            detail="Upload must be text/csv or application/x-ndjson"
+        )
+    
+    async def body() -> AsyncIterator[bytes]:
+        async for event in pipeline(iter_records(request.stream(), fmt)):
+            yield (json.dumps(event) + "\n").encode()
+    
+    return _DuplexStreamingResponse(body(), media_type="application/x-ndjson")
+
+
+class _DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body generator reads the request body.
+    
+    The stock StreamingResponse consumes `receive()` in parallel to watch for
+    disconnects, which would steal upload chunks from `request.stream()`.
+    Here the upload stream itself raises on disconnect instead.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse, tags=["jobs"])
+async def get_job(job_id: str) -> JobResponse:
+    """
+    Get the status of a background send.
+    
+    Args:
+        job_id: ID returned when the send was queued
+        
+    Returns:
+        JobResponse with status, attempts and the send result once finished
+    """
+    job = await JobController.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_response(job)
+
+
+@router.get("/scheduled/{schedule_id}", response_model=ScheduledSendResponse, tags=["scheduled"])
+async def get_scheduled_send(schedule_id: int) -> ScheduledSendResponse:
+    """
+    Get the status of a send scheduled with `send_at`.
+    
+    Args:
+        schedule_id: ID returned when the send was scheduled
+        
+    Returns:
+        ScheduledSendResponse with status and, once released, the send result
+    """
+    scheduled = await ScheduleController.get(schedule_id)
+    if not scheduled:
+        raise HTTPException(status_code=404, detail="Scheduled send not found")
+    return _scheduled_response(scheduled)
+
+
+@router.delete("/scheduled/{schedule_id}", response_model=ScheduledSendResponse, tags=["scheduled"])
+async def cancel_scheduled_send(schedule_id: int) -> ScheduledSendResponse:
+    """
+    Cancel a scheduled send that has not been released yet.
+    
+    Returns:
+        The cancelled send; 409 if it was already released or cancelled
+    """
+    if not await ScheduleController.cancel(schedule_id):
+        scheduled = await ScheduleController.get(schedule_id)
+        if not scheduled:
+            raise HTTPException(status_code=404, detail="Scheduled send not found")
+        raise HTTPException(status_code=409, detail=f"Scheduled send is already {scheduled['status']}")
+    return _scheduled_response(await ScheduleController.get(schedule_id))
+
+
+@router.get("/scheduled", tags=["scheduled", "debug"])
+async def get_schedule_stats():
+    """
+    Debug endpoint showing the scheduler's queued timers and next due time.
+    """
+    return ScheduleController.stats()
+
+
+@router.get("/history", response_model=HistoryPage, tags=["history"])
+async def get_history(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    kind: Optional[str] = Query(None, pattern="^(sms|email)$"),
+    recipient: Optional[str] = None,
+    status: Optional[str] = None,
+    message_id: Optional[str] = None,
+    since: Optional[float] = Query(None, description="Unix time, inclusive"),
+    until: Optional[float] = Query(None, description="Unix time, exclusive")
+) -> HistoryPage:
+    """
+    Page through recorded sends, newest first.
+    
+    Filters are exact matches on indexed columns; pages use a keyset
+    cursor, so every page costs the same regardless of table size.
+    
+    Returns:
+        HistoryPage with the sends and the cursor for the next page
+    """
+    try:
+        page = await HistoryController.query(
+            limit, cursor,
+            kind=kind, recipient=recipient, status=status, message_id=message_id,
+            since=since, until=until
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return HistoryPage(**page)
+
+
+async def _with_idempotency(
+    key: Optional[str],
+    scope: str,
+    request: BaseModel,
+    handler: Callable[[], Awaitable[object]]
+):
+    """
+    Run a send handler at most once per Idempotency-Key.
+    
+    Without a key the handler just runs. With a key, the first successful
+    response is stored and replayed (with `Idempotent-Replayed: true`) for
+    later requests, and concurrent duplicates wait for the first one.
+    """
+    if not key:
+        return await handler()
+    
+    fingerprint = hashlib.sha256(f"{scope}:{request.model_dump_json()}".encode()).hexdigest()
+    
+    async def produce() -> dict:
+        response = await handler()
+        if isinstance(response, JSONResponse):
+            return {
+                "status_code": response.status_code,
+                "body": json.loads(response.body),
+                "location": response.headers.get("location")
+            }
+        return {"status_code": 200, "body": response.model_dump(mode="json"), "location": None}
+    
+    try:
+        is_replayed, stored = await idempotency_store.run(key, fingerprint, produce)
+    except IdempotencyConflict as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    
+    headers = {"Idempotent-Replayed": "true" if is_replayed else "false"}
+    if stored["location"]:
+        headers["Location"] = stored["location"]
+    return JSONResponse(status_code=stored["status_code"], content=stored["body"], headers=headers)
+
+
+async def _enqueue_job(kind: str, payload: dict) -> JSONResponse:
+    """Queue a send and build the 202 Accepted response."""
+    try:
+        job = await JobController.enqueue(kind, payload)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Failed to queue {kind}: {str(e)}")
+    
+    return JSONResponse(
+        status_code=202,
+        content=_job_response(job).model_dump(),
+        headers={"Location": f"/api/jobs/{job['id']}"}
+    )
+
+
+def _is_future(send_at: Optional[datetime]) -> bool:
+    """Whether a send_at lies in the future (past times are sent immediately)."""
+    return send_at is not None and send_at.timestamp() > time.time()
+
+
+async def _schedule_send(kind: str, request: BaseModel) -> JSONResponse:
+    """Store a send for the scheduler and build the 202 Accepted response."""
+    try:
+        scheduled = await ScheduleController.schedule(
+            kind, request.model_dump(exclude=_SEND_OPTIONS), request.send_at.timestamp()
+        )
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Failed to schedule {kind}: {str(e)}")
+    
+    return JSONResponse(
+        status_code=202,
+        content=_scheduled_response(scheduled).model_dump(),
+        headers={"Location": f"/api/scheduled/{scheduled['id']}"}
+    )
+
+
+def _scheduled_response(scheduled: dict) -> ScheduledSendResponse:
+    """Convert a stored scheduled send into a ScheduledSendResponse."""
+    return ScheduledSendResponse(
+        schedule_id=scheduled["id"],
+        kind=scheduled["kind"],
+        status=scheduled["status"],
+        send_at=scheduled["send_at"],
+        result=scheduled["result"],
+        error=scheduled["error"],
+        created_at=scheduled["created_at"],
+        updated_at=scheduled["updated_at"]
+    )
+
+
+def _job_response(job: dict) -> JobResponse:
+    """Convert a stored job into a JobResponse."""
+    return JobResponse(
+        job_id=job["id"],
+        kind=job["kind"],
+        status=job["status"],
+        attempts=job["attempts"],
+        result=job["result"],
+        error=job["error"],
+        created_at=job["created_at"],
+        updated_at=job["updated_at"]
+    )
+
+
+async def _send_unique(
+    items: list,
+    fields: tuple,
+    send_batch: Callable[[list], Awaitable[list]]
+) -> list:
+    """
+    Send the first occurrence of each recipient/content combination.
+    
+    Recipients are already normalized by the request models, so
+    "0412 345 678" and "+61412345678" (or differently cased emails) count
+    as the same recipient. Repeats get a DUPLICATE result in their place.
+    """
+    unique, duplicates = split_duplicates(items, fields)
+    results = [None] * len(items)
+    if unique:
+        for index, result in zip(unique, await send_batch([items[i] for i in unique])):
+            results[index] = result
+    for index in duplicates:
+        results[index] = {
+            "to": items[index]["to"], "success": False, "status": "DUPLICATE", "message_id": None, "error": None
+        }
+    return results
+
+
+def _batch_response(results: list, kind: str) -> BatchResponse:
+    """Summarize per-recipient results into a BatchResponse."""
+    sent = sum(1 for result in results if result["success"])
+    duplicates = sum(1 for result in results if result.get("status") == "DUPLICATE")
+    failed = len(results) - sent - duplicates
+    return BatchResponse(
+        success=failed == 0,
+        message=f"{sent} of {len(results)} {kind} messages sent",
+        total=len(results),
+        sent=sent,
+        failed=failed,
+        duplicates=duplicates,
+        results=[RecipientResult(**result) for result in results]
+    )
+
+
+def _raise_upstream_error(result: dict, action: str) -> None:
+    """Translate a failed controller result into an HTTPException."""
+    if result.get("status_code"):
+        raise HTTPException(
+            status_code=result["status_code"],
+            detail=result.get("data")
+        )
+    raise HTTPException(status_code=500, detail=f"Failed to {action}: {result.get('error')}")
+
+
+def _get_account(name: Optional[str]):
+    """Resolve the `account` query parameter, defaulting to the primary account."""
+    account = ClickSendController.get_account(name)
+    if account is None:
+        raise HTTPException(status_code=404, detail=f"Unknown ClickSend account: {name}")
+    return account
+
+
 @router.post("/email/addresses", tags=["email", "verify"])
-async def add_email_address(email: str = None):
+async def add_email_address(email: str = None, account: Optional[str] = None):
     """
     Add an email address to ClickSend for verification.
     If email is not provided as query param, uses CLICKSEND_EMAIL from config.
+    Pass ?account=name to add it to an account other than the primary one.
     
     Example: POST /api/email/addresses?email=your@email.com
     Or: POST /api/email/addresses (uses CLICKSEND_EMAIL from .env)
     """
-    from app.config import CLICKSEND_API_USERNAME, CLICKSEND_API_KEY, CLICKSEND_API_URL, CLICKSEND_EMAIL
-    
     # Allow email as query param or use from config
     if not email:
         email = CLICKSEND_EMAIL
@@ -101,138 +765,89 @@ async def add_email_address(email: str = None):
     if not email:
         raise HTTPException(status_code=400, detail="Email address is required. Provide ?email=your@email.com or set CLICKSEND_EMAIL in .env")
     
-    url = f"{CLICKSEND_API_URL}/email/addresses"
-    username = CLICKSEND_API_USERNAME or CLICKSEND_EMAIL or CLICKSEND_API_KEY
-    password = CLICKSEND_API_KEY
-    
-    payload = {
-        "email_address": email
-    }
-    
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                url,
-                json=payload,
-                auth=(username, password),
-                timeout=30.0
-            )
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            error_data = None
-            try:
-                error_data = e.response.json()
-            except:
-                error_data = {"message": e.response.text}
-            raise HTTPException(
-                status_code=e.response.status_code,
-                detail=error_data
-            )
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to add email address: {str(e)}")
+    result = await ClickSendController.add_email_address(email, _get_account(account))
+    if not result["success"]:
+        _raise_upstream_error(result, "add email address")
+    return result["data"]
 
 
 @router.put("/email/address-verify/{email_address_id}/send", tags=["email", "verify"])
-async def send_verification_token(email_address_id: int):
+async def send_verification_token(email_address_id: int, account: Optional[str] = None):
     """
     Send a verification token to the email address.
     Check your email inbox for the verification token.
     """
-    from app.config import CLICKSEND_API_USERNAME, CLICKSEND_API_KEY, CLICKSEND_API_URL, CLICKSEND_EMAIL
-    
-    url = f"{CLICKSEND_API_URL}/email/address-verify/{email_address_id}/send"
-    username = CLICKSEND_API_USERNAME or CLICKSEND_EMAIL or CLICKSEND_API_KEY
-    password = CLICKSEND_API_KEY
-    
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.put(
-                url,
-                auth=(username, password),
-                timeout=30.0
-            )
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            error_data = None
-            try:
-                error_data = e.response.json()
-            except:
-                error_data = {"message": e.response.text}
-            raise HTTPException(
-                status_code=e.response.status_code,
-                detail=error_data
-            )
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to send verification token: {str(e)}")
+    result = await ClickSendController.send_verification_token(email_address_id, _get_account(account))
+    if not result["success"]:
+        _raise_upstream_error(result, "send verification token")
+    return result["data"]
 
 
 @router.put("/email/address-verify/{email_address_id}/verify/{activation_token}", tags=["email", "verify"])
-async def verify_email_address(email_address_id: int, activation_token: str):
+async def verify_email_address(email_address_id: int, activation_token: str, account: Optional[str] = None):
     """
     Verify the email address using the activation token received via email.
     """
-    from app.config import CLICKSEND_API_USERNAME, CLICKSEND_API_KEY, CLICKSEND_API_URL, CLICKSEND_EMAIL
-    
-    url = f"{CLICKSEND_API_URL}/email/address-verify/{email_address_id}/verify/{activation_token}"
-    username = CLICKSEND_API_USERNAME or CLICKSEND_EMAIL or CLICKSEND_API_KEY
-    password = CLICKSEND_API_KEY
-    
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.put(
-                url,
-                auth=(username, password),
-                timeout=30.0
-            )
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            error_data = None
-            try:
-                error_data = e.response.json()
-            except:
-                error_data = {"message": e.response.text}
-            raise HTTPException(
-                status_code=e.response.status_code,
-                detail=error_data
-            )
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to verify email address: {str(e)}")
+    result = await ClickSendController.verify_email_address(
+        email_address_id, activation_token, _get_account(account)
+    )
+    if not result["success"]:
+        _raise_upstream_error(result, "verify email address")
+    return result["data"]
 
 
 @router.get("/email/addresses", tags=["email", "debug"])
-async def get_email_addresses():
+async def get_email_addresses(request: Request, account: Optional[str] = None):
     """
     Debug endpoint to list all verified email addresses and their IDs.
     Useful for finding the email_address_id to add to .env file.
-    """
-    from app.config import CLICKSEND_API_USERNAME, CLICKSEND_API_KEY, CLICKSEND_API_URL
+    Pass ?account=name to list another configured account.
     
-    url = f"{CLICKSEND_API_URL}/email/addresses"
-    username = CLICKSEND_API_USERNAME or CLICKSEND_EMAIL or CLICKSEND_API_KEY
-    password = CLICKSEND_API_KEY
-    
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                url,
-                auth=(username, password),
-                timeout=30.0
-            )
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            error_data = None
-            try:
-                error_data = e.response.json()
-            except:
-                error_data = {"message": e.response.text}
-            raise HTTPException(
-                status_code=e.response.status_code,
-                detail=error_data
-            )
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to fetch email addresses: {str(e)}")
+    The listing is cached for EMAIL_ADDRESSES_CACHE_TTL seconds and carries
+    an ETag; pollers sending If-None-Match get an empty 304 while it is
+    unchanged.
+    """
+    result = await ClickSendController.list_email_addresses(_get_account(account))
+    if not result["success"]:
+        _raise_upstream_error(result, "fetch email addresses")
+    body = json.dumps(result["data"], separators=(",", ":")).encode()
+    return conditional_response(
+        request, body, make_etag(body), "application/json",
+        cache_control=f"private, max-age={int(EMAIL_ADDRESSES_CACHE_TTL)}"
+    )
+
 
+@router.get("/http/pool", tags=["debug"])
+async def get_http_pool_stats():
+    """
+    Debug endpoint showing usage of each account's ClickSend connection pool.
+    Useful for sizing HTTP_MAX_CONNECTIONS and HTTP_MAX_KEEPALIVE_CONNECTIONS.
+    """
+    return ClickSendController.get_pool_stats()
+
+
+@router.get("/accounts", tags=["debug"])
+async def get_accounts():
+    """
+    Debug endpoint showing how sends are spread over the ClickSend accounts.
+    Reports weight, in-flight and total requests, 429s and 401 cooldowns per account.
+    """
+    return ClickSendController.get_account_stats()
+
+
+@router.get("/rate-limits", tags=["debug"])
+async def get_rate_limits():
+    """
+    Debug endpoint showing the adaptive ClickSend rate limits.
+    Reports the current rate, tokens, waiting callers and 429 count per account and bucket.
+    """
+    return ClickSendController.get_rate_limit_stats()
+
+
+@router.get("/circuit", tags=["debug"])
+async def get_circuit():
+    """
+    Debug endpoint showing the ClickSend circuit breaker state.
+    While open, sends fail fast with 503 instead of waiting on a down upstream.
+    """
+    return ClickSendController.get_circuit_stats()
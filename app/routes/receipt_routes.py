@@ -0,0 +1,106 @@
+"""Webhook routes for ClickSend delivery receipts and inbound SMS."""
+import json
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl
+from fastapi import APIRouter, HTTPException, Query, Request
+from app.models.schemas import MessageStatusResponse, ReceiptPage
+from app.controllers.receipt_controller import ReceiptController
+from app.utils.metrics import WEBHOOK_EVENTS
+
+router = APIRouter()
+
+
+@router.post("/webhooks/delivery", tags=["webhooks"])
+async def delivery_receipt(request: Request) -> Dict[str, Any]:
+    """
+    Receive ClickSend delivery receipts.
+    
+    Configure this URL as the delivery report URL in the ClickSend
+    dashboard. Accepts JSON (one receipt or a list) or form-encoded
+    posts; events are buffered and acknowledged without waiting for storage.
+    """
+    return await _ingest("delivery", request)
+
+
+@router.post("/webhooks/inbound", tags=["webhooks"])
+async def inbound_sms(request: Request) -> Dict[str, Any]:
+    """
+    Receive inbound SMS replies from ClickSend.
+    
+    Accepts the same payload formats as the delivery receipt webhook.
+    """
+    return await _ingest("inbound", request)
+
+
+@router.get("/receipts", response_model=ReceiptPage, tags=["webhooks"])
+async def list_receipts(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[int] = Query(None, description="next_cursor from the previous page"),
+    kind: Optional[str] = Query(None, pattern="^(delivery|inbound)$"),
+    status: Optional[str] = None,
+    recipient: Optional[str] = None
+) -> ReceiptPage:
+    """
+    Page through stored receipts and inbound messages, newest first.
+    
+    Uses keyset pagination on the event sequence number, so deep pages
+    cost the same as the first and new events never shift a page.
+    """
+    try:
+        page = await ReceiptController.list_events(limit, cursor, kind, status, recipient)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return ReceiptPage(**page)
+
+
+@router.get("/receipts/{message_id}", response_model=MessageStatusResponse, tags=["webhooks"])
+async def get_message_status(message_id: str) -> MessageStatusResponse:
+    """
+    Get the delivery state of a sent message.
+    
+    Args:
+        message_id: ClickSend message ID returned by a send
+        
+    Returns:
+        MessageStatusResponse with the latest status and all events
+    """
+    try:
+        state = await ReceiptController.get_message(message_id)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    if state is None:
+        raise HTTPException(status_code=404, detail="No receipts for this message")
+    return MessageStatusResponse(**state)
+
+
+async def _ingest(kind: str, request: Request) -> Dict[str, Any]:
+    """Parse a webhook body and buffer its events."""
+    events = _parse_events(await request.body(), request.headers.get("content-type", ""))
+    try:
+        accepted = await ReceiptController.ingest(kind, events)
+    except RuntimeError as e:
+        # 503 rather than 500, so ClickSend retries the webhook later
+        raise HTTPException(status_code=503, detail=str(e))
+    WEBHOOK_EVENTS.labels(kind).inc(accepted)
+    return {"success": True, "accepted": accepted}
+
+
+def _parse_events(body: bytes, content_type: str) -> List[Dict[str, Any]]:
+    """
+    Decode a webhook body into a list of event dicts.
+    
+    Form bodies are decoded with the standard library, so no multipart
+    parser is needed for ClickSend's form-encoded receipts.
+    """
+    if "application/x-www-form-urlencoded" in content_type:
+        return [dict(parse_qsl(body.decode("utf-8", "replace"), keep_blank_values=True))]
+    
+    try:
+        data = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Webhook body must be JSON or form-encoded")
+    
+    events = data if isinstance(data, list) else [data]
+    if not all(isinstance(event, dict) for event in events):
+        raise HTTPException(status_code=400, detail="Webhook events must be JSON objects")
+    return events
@@ -1,14 +1,23 @@
 """Web routes for HTML pages."""
+from typing import Optional, Tuple
 from fastapi import APIRouter, Request
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
+from app.utils.http_cache import conditional_response, make_etag
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
 
+# Rendered index page and its ETag; the template has no per-request content
+_index_page: Optional[Tuple[bytes, str]] = None
+
 
 @router.get("/", response_class=HTMLResponse, tags=["web"])
 async def index(request: Request):
-    """Home page with email and SMS test forms."""
-    return templates.TemplateResponse("index.html", {"request": request})
-
+    """Home page with email and SMS test forms (rendered once, then served with ETag revalidation)."""
+    global _index_page
+    if _index_page is None:
+        body = templates.TemplateResponse("index.html", {"request": request}).body
+        _index_page = (body, make_etag(body))
+    body, etag = _index_page
+    return conditional_response(request, body, etag, "text/html; charset=utf-8")
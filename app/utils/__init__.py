@@ -0,0 +1,6 @@
+"""Shared utilities and helpers."""
+from app.utils.cache import TTLCache
+from app.utils.http_client import create_http_client, get_pool_stats
+from app.utils.templating import render_placeholders
+
+__all__ = ["TTLCache", "create_http_client", "get_pool_stats", "render_placeholders"]
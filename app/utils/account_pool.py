@@ -0,0 +1,170 @@
+"""ClickSend accounts and load balancing between them."""
+import time
+from typing import Any, Dict, Iterable, List, Optional
+import httpx
+from app.utils.cache import TTLCache
+from app.utils.http_client import create_http_client
+from app.utils.rate_limiter import RateLimiter
+
+
+class ClickSendAccount:
+    """
+    One set of ClickSend credentials and the per-account state that goes with it.
+    
+    Each account has its own pooled HTTP client, rate limit buckets and
+    sender-ID cache, since ClickSend throttles and registers sender
+    addresses per account.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        username: str,
+        api_key: str,
+        limiters: Dict[str, RateLimiter],
+        email_id_cache: TTLCache,
+        weight: float = 1.0,
+        sender_email: str = "",
+        email_address_id: Optional[int] = None
+    ):
+        """
+        Args:
+            name: Label used in stats, metrics and the `account` query parameter
+            username: API username; the sender email, then the API key, are used when empty
+            api_key: API key
+            limiters: Rate limiter per bucket ("sms", "email", "account")
+            email_id_cache: Cache of sender email_address_id lookups
+            weight: Relative share of traffic
+            sender_email: Verified sender address on this account
+            email_address_id: Known sender ID, skipping the lookup
+        """
+        self.name = name
+        # ClickSend uses Basic Auth with username:api_key; resolve the fallback once
+        self.auth = (username or sender_email or api_key, api_key)
+        self.limiters = limiters
+        self.email_id_cache = email_id_cache
+        self.weight = max(weight, 0.001)
+        self.sender_email = sender_email
+        self.email_address_id = email_address_id
+        self.client: Optional[httpx.AsyncClient] = None
+        self.in_flight = 0
+        self.requests = 0
+        self.throttled = 0
+        self.auth_failures = 0
+        self.disabled_until = 0.0
+        self._current_weight = 0.0
+
+    def get_client(self) -> httpx.AsyncClient:
+        """Return this account's pooled client, creating it if needed."""
+        if self.client is None or self.client.is_closed:
+            self.client = create_http_client()
+        return self.client
+
+    async def close(self) -> None:
+        """Close this account's HTTP client."""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    def is_disabled(self, now: Optional[float] = None) -> bool:
+        """Whether the account is cooling down after an authentication failure."""
+        return (now if now is not None else time.monotonic()) < self.disabled_until
+
+    def is_blocked(self, bucket: str) -> bool:
+        """Whether ClickSend asked this account to back off (Retry-After) for a bucket."""
+        limiter = self.limiters.get(bucket)
+        return limiter is not None and limiter.blocked_for() > 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return load and health counters, without credentials."""
+        return {
+            "weight": self.weight,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "auth_failures": self.auth_failures,
+            "disabled_for": round(max(0.0, self.disabled_until - time.monotonic()), 1),
+            "sender_email": self.sender_email
+        }
+
+
+class AccountPool:
+    """
+    Chooses which account serves each request.
+    
+    "least_in_flight" picks the account with the fewest requests in flight
+    relative to its weight; "weighted" uses smooth weighted round-robin.
+    Accounts cooling down after a 401, or blocked by a Retry-After for the
+    bucket, are only used when nothing else is left.
+    """
+
+    def __init__(self, accounts: List[ClickSendAccount], strategy: str = "least_in_flight"):
+        if not accounts:
+            raise ValueError("At least one ClickSend account is required")
+        if strategy not in ("least_in_flight", "weighted"):
+            raise ValueError(f"Unknown account strategy: {strategy}")
+        self.accounts = accounts
+        self.strategy = strategy
+        self._by_name = {account.name: account for account in accounts}
+
+    @property
+    def primary(self) -> ClickSendAccount:
+        """The first configured account, used for account-specific calls without an explicit account."""
+        return self.accounts[0]
+
+    def get(self, name: str) -> Optional[ClickSendAccount]:
+        """Return an account by name."""
+        return self._by_name.get(name)
+
+    def choose(self, bucket: str, exclude: Iterable[ClickSendAccount] = ()) -> Optional[ClickSendAccount]:
+        """
+        Pick an account for a request.
+        
+        Args:
+            bucket: Rate limit bucket of the request
+            exclude: Accounts already tried for this request
+            
+        Returns:
+            The chosen account, or None if every account is excluded
+        """
+        excluded = set(id(account) for account in exclude)
+        candidates = [account for account in self.accounts if id(account) not in excluded]
+        if not candidates:
+            return None
+        
+        now = time.monotonic()
+        healthy = [account for account in candidates if not account.is_disabled(now)] or candidates
+        candidates = [account for account in healthy if not account.is_blocked(bucket)] or healthy
+        
+        if len(candidates) == 1:
+            return candidates[0]
+        if self.strategy == "weighted":
+            return self._weighted(candidates)
+        return min(candidates, key=lambda account: account.in_flight / account.weight)
+
+    def disable(self, account: ClickSendAccount, seconds: float) -> None:
+        """Skip an account for `seconds` after an authentication failure."""
+        account.auth_failures += 1
+        account.disabled_until = time.monotonic() + seconds
+
+    async def close(self) -> None:
+        """Close every account's HTTP client."""
+        for account in self.accounts:
+            await account.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the strategy and per-account counters."""
+        return {
+            "strategy": self.strategy,
+            "accounts": {account.name: account.stats() for account in self.accounts}
+        }
+
+    @staticmethod
+    def _weighted(candidates: List[ClickSendAccount]) -> ClickSendAccount:
+        """Smooth weighted round-robin, spreading picks evenly within each cycle."""
+        total = sum(account.weight for account in candidates)
+        for account in candidates:
+            account._current_weight += account.weight
+        chosen = max(candidates, key=lambda account: account._current_weight)
+        chosen._current_weight -= total
+        return chosen
@@ -0,0 +1,97 @@
+"""Streamed JSON request bodies carrying base64-encoded attachments."""
+import base64
+import json
+from typing import Any, AsyncIterator, Dict, List
+
+
+class Attachment:
+    """A file to attach, read from a seekable async file such as an UploadFile."""
+
+    def __init__(self, filename: str, content_type: str, size: int, file: Any):
+        self.filename = filename
+        self.content_type = content_type
+        self.size = size
+        self.file = file
+
+
+def encoded_length(size: int) -> int:
+    """Length of the padded base64 encoding of `size` bytes."""
+    return 4 * ((size + 2) // 3)
+
+
+async def iter_base64(file: Any, chunk_size: int) -> AsyncIterator[bytes]:
+    """
+    Base64-encode a file incrementally.
+    
+    Reads in multiples of 3 bytes so each encoded chunk ends on a group
+    boundary and the concatenated chunks equal a single encode of the file.
+    
+    Args:
+        file: Async file positioned at the start of the data
+        chunk_size: Approximate raw bytes to read per step
+        
+    Yields:
+        Base64 chunks (ASCII, no newlines)
+    """
+    chunk_size = max(3, chunk_size - chunk_size % 3)
+    pending = b""
+    while True:
+        data = await file.read(chunk_size - len(pending))
+        if not data:
+            break
+        pending += data
+        usable = len(pending) - len(pending) % 3
+        if usable:
+            yield base64.b64encode(pending[:usable])
+            pending = pending[usable:]
+    if pending:
+        yield base64.b64encode(pending)
+
+
+class StreamedJSONBody:
+    """
+    A JSON object whose `attachments` array is streamed rather than built in memory.
+    
+    Holds the small fields as a dict and the attachments as files; each
+    `open()` yields the serialized JSON in pieces, base64-encoding the files
+    as they are read, so neither the encoded files nor the full document
+    ever exist in memory. The exact Content-Length is known up front, and
+    the body can be re-opened for retries.
+    """
+
+    def __init__(self, payload: Dict[str, Any], attachments: List[Attachment], chunk_size: int):
+        """
+        Args:
+            payload: JSON fields other than attachments
+            attachments: Files to include under "attachments"
+            chunk_size: Raw bytes encoded per step
+        """
+        self.payload = payload
+        self.attachments = attachments
+        self.chunk_size = chunk_size
+        fields = json.dumps(payload, separators=(",", ":"))
+        self._head = (fields[:-1] + ("," if payload else "") + '"attachments":[').encode()
+        self._parts = []
+        for index, attachment in enumerate(attachments):
+            meta = json.dumps({
+                "filename": attachment.filename,
+                "type": attachment.content_type,
+                "disposition": "attachment"
+            }, separators=(",", ":"))
+            self._parts.append(((("," if index else "") + meta[:-1] + ',"content":"').encode(), b'"}'))
+        self._tail = b"]}"
+        self.length = len(self._head) + len(self._tail) + sum(
+            len(opening) + encoded_length(attachment.size) + len(closing)
+            for (opening, closing), attachment in zip(self._parts, attachments)
+        )
+
+    async def open(self) -> AsyncIterator[bytes]:
+        """Yield the serialized body, reading each attachment from the start."""
+        yield self._head
+        for (opening, closing), attachment in zip(self._parts, self.attachments):
+            await attachment.file.seek(0)
+            yield opening
+            async for chunk in iter_base64(attachment.file, self.chunk_size):
+                yield chunk
+            yield closing
+        yield self._tail
@@ -0,0 +1,126 @@
+"""Buffered writer that persists items in batches off the request path."""
+import asyncio
+import logging
+from typing import Any, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BatchWriter:
+    """
+    In-memory buffer drained by a single background flusher.
+    
+    Producers append and return immediately; the flusher hands up to
+    `batch_size` items at a time to `write` (a blocking function run via
+    `asyncio.to_thread`, typically one SQLite transaction) once a batch is
+    full or `interval` seconds have passed.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[List[Any]], Any],
+        batch_size: int,
+        interval: float,
+        max_buffer: int,
+        name: str = "batch"
+    ):
+        """
+        Args:
+            write: Blocking function persisting a list of items
+            batch_size: Items per `write` call
+            interval: Max seconds an item waits in the buffer
+            max_buffer: Buffered items before `put` waits and `put_nowait` drops
+            name: Label used in log messages
+        """
+        self.write = write
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_buffer = max_buffer
+        self.name = name
+        self.buffer: List[Any] = []
+        self.dropped = 0
+        self.lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._flushed = asyncio.Event()
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the background flusher."""
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stop the flusher and write whatever is still buffered.
+        
+        The flusher is signalled and joined rather than cancelled: a write
+        cancelled mid-flight still commits in its thread while the batch
+        stays buffered, and the final flush would write it a second time.
+        """
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def put(self, items: List[Any]) -> None:
+        """Buffer items, waiting for a flush only while the buffer is full."""
+        while len(self.buffer) >= self.max_buffer:
+            self._flushed.clear()
+            self._wakeup.set()
+            await self._flushed.wait()
+        self._append(items)
+
+    def put_nowait(self, items: List[Any]) -> bool:
+        """
+        Buffer items without waiting.
+        
+        Returns:
+            False (and counts the items as dropped) if the buffer is full
+        """
+        if len(self.buffer) >= self.max_buffer:
+            self.dropped += len(items)
+            self._wakeup.set()
+            return False
+        self._append(items)
+        return True
+
+    async def flush(self) -> None:
+        """
+        Write everything buffered so far.
+        
+        Holds `lock` while writing; readers that merge the buffer with
+        stored rows take the same lock so a batch is never seen twice.
+        """
+        try:
+            async with self.lock:
+                while self.buffer:
+                    batch = self.buffer[:self.batch_size]
+                    await asyncio.to_thread(self.write, batch)
+                    # Items appended while writing stay at the tail
+                    del self.buffer[:len(batch)]
+        finally:
+            self._flushed.set()
+
+    def _append(self, items: List[Any]) -> None:
+        self.buffer.extend(items)
+        if len(self.buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        """Flush on size or interval until stopped."""
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._stopping:
+                # stop() writes the rest itself once this task has returned
+                return
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Failed to flush %d buffered %s items", len(self.buffer), self.name)
@@ -0,0 +1,139 @@
+"""In-process TTL cache with single-flight loading."""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Small async-aware TTL cache.
+    
+    Bounded to `maxsize` entries with least-recently-used eviction.
+    Values expire after `ttl` seconds; `None` results are cached for the
+    (usually shorter) `negative_ttl`. Concurrent `get_or_load` calls for the
+    same key share one in-flight load, so a burst of callers triggers a
+    single upstream lookup.
+    """
+
+    def __init__(self, ttl: float, negative_ttl: Optional[float] = None, maxsize: int = 1024):
+        self.ttl = ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._generation = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a fresh cached value, or `default` if missing or expired."""
+        value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, using the negative TTL for `None`."""
+        ttl = self.negative_ttl if value is None else self.ttl
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """
+        Drop one key, or every key when `key` is None.
+        
+        Loads already in flight will not store their (possibly stale) result.
+        """
+        self._generation += 1
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    async def get_async(self, key: Hashable, default: Any = None) -> Any:
+        """Awaitable `get`; subclasses backed by storage keep its I/O off the event loop."""
+        return self.get(key, default)
+
+    async def set_async(self, key: Hashable, value: Any) -> None:
+        """Awaitable `set`; subclasses backed by storage keep its I/O off the event loop."""
+        self.set(key, value)
+
+    async def invalidate_async(self, key: Optional[Hashable] = None) -> None:
+        """Awaitable `invalidate`; subclasses backed by storage keep its I/O off the event loop."""
+        self.invalidate(key)
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the cached value for `key`, loading it once if needed.
+        
+        Args:
+            key: Cache key
+            loader: Coroutine factory producing the value on a miss
+            
+        Returns:
+            Cached or freshly loaded value
+        """
+        value, generation = await self._fetch(key)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+        
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            # The load runs in its own task shared by every caller, so one caller being
+            # cancelled neither cancels it nor fails the others, and a failure anywhere
+            # in it (loader or store) reaches all of them
+            task = asyncio.create_task(self._load(key, loader, generation))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._load_done(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return size and hit/miss counters (callers that joined an in-flight load count as coalesced)."""
+        total = self.hits + self.misses + self.coalesced
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]], generation: int) -> Any:
+        value = await loader()
+        await self._store(key, value, generation)
+        return value
+
+    def _load_done(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark a failure retrieved, so it is not logged when every caller has gone away
+        if not task.cancelled():
+            task.exception()
+
+    async def _fetch(self, key: Hashable) -> Tuple[Any, int]:
+        """Return the fresh value (or _MISSING) and the generation it was read at."""
+        return self._lookup(key), self._generation
+
+    async def _store(self, key: Hashable, value: Any, generation: int) -> None:
+        """Store a loaded value unless the cache was invalidated while loading."""
+        if generation == self._generation:
+            self.set(key, value)
+
+    def _lookup(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return _MISSING
+        self._entries.move_to_end(key)
+        return value
@@ -0,0 +1,129 @@
+"""gzip / brotli response compression middleware."""
+import zlib
+from typing import Optional, Tuple
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip only
+    brotli = None
+
+# Content types that are already compressed (or tiny) and not worth re-encoding
+_SKIP_TYPES = ("image/", "video/", "audio/", "application/zip", "application/gzip", "font/woff")
+
+
+def _accepted_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick "br" or "gzip" from an Accept-Encoding header, honouring q=0."""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in ("br", "gzip") if brotli else ("gzip",):
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+class _Compressor:
+    """Incremental gzip or brotli encoder with a common interface."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._gz = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)  # wbits 31: gzip container
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        """Encode a chunk; non-final chunks are flushed so streamed rows arrive promptly."""
+        if self.encoding == "br":
+            out = self._br.process(data)
+            return out + (self._br.finish() if final else self._br.flush())
+        out = self._gz.compress(data)
+        return out + self._gz.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    """
+    Pure ASGI middleware compressing responses with brotli or gzip.
+    
+    Brotli is preferred when the client accepts it and the optional
+    `brotli` package is installed. Responses smaller than `minimum_size`,
+    already encoded, bodiless (204/304) or of an already-compressed media
+    type pass through untouched. Streaming responses are compressed chunk
+    by chunk. A strong ETag is weakened, since the encoded bytes differ
+    from the representation it was computed on.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = _accepted_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        
+        start: Optional[dict] = None
+        compressor: Optional[_Compressor] = None
+
+        async def send_wrapper(message) -> None:
+            nonlocal start, compressor
+            if message["type"] == "http.response.start":
+                # Held back until the first body chunk shows whether to compress
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                initial, start = start, None
+                skip, headers = self._should_skip(initial, body, more_body)
+                if not skip:
+                    compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+                    headers["Content-Encoding"] = encoding
+                    etag = headers.get("etag")
+                    if etag and not etag.startswith("W/"):
+                        headers["ETag"] = f"W/{etag}"
+                    del headers["Content-Length"]
+                    if not more_body:
+                        body = compressor.compress(body, final=True)
+                        headers["Content-Length"] = str(len(body))
+                        await send(initial)
+                        await send({**message, "body": body})
+                        return
+                await send(initial)
+            if compressor is not None:
+                message = {**message, "body": compressor.compress(body, final=not more_body)}
+            await send(message)
+        
+        await self.app(scope, receive, send_wrapper)
+
+    def _should_skip(self, start: dict, body: bytes, more_body: bool) -> Tuple[bool, MutableHeaders]:
+        """Return (pass through unchanged, mutable response headers)."""
+        headers = MutableHeaders(scope=start)
+        headers.add_vary_header("Accept-Encoding")
+        content_type = headers.get("content-type", "")
+        skip = (
+            start["status"] in (204, 304)
+            or "content-encoding" in headers
+            or content_type.startswith(_SKIP_TYPES)
+            or (not more_body and len(body) < self.minimum_size)
+        )
+        return skip, headers
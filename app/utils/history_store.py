@@ -0,0 +1,131 @@
+"""SQLite store for the history of outbound sends."""
+import json
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from app.database import open_sqlite
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sends (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    recipient TEXT NOT NULL,
+    message_id TEXT,
+    status TEXT,
+    success INTEGER NOT NULL,
+    status_code INTEGER,
+    cost REAL,
+    latency_ms REAL,
+    error TEXT,
+    request TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sends_created_at ON sends (created_at);
+CREATE INDEX IF NOT EXISTS idx_sends_recipient ON sends (recipient, created_at);
+CREATE INDEX IF NOT EXISTS idx_sends_status ON sends (status, created_at);
+CREATE INDEX IF NOT EXISTS idx_sends_message_id ON sends (message_id);
+"""
+
+_COLUMNS = (
+    "kind", "recipient", "message_id", "status", "success", "status_code",
+    "cost", "latency_ms", "error", "request", "created_at"
+)
+
+_INSERT = f"INSERT INTO sends ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})"
+
+
+class HistoryStore:
+    """
+    Append-only log of sends.
+    
+    Methods are synchronous and thread-safe; async callers should run them
+    via `asyncio.to_thread`. Pages are ordered by (created_at, id) and the
+    indexes lead with each filter column followed by created_at (SQLite
+    appends the rowid), so filtered keyset pages are index range scans
+    with no sort, however large the table grows.
+    """
+
+    def __init__(self, path: str):
+        self._conn = open_sqlite(path)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.executescript(_SCHEMA)
+
+    def insert_many(self, sends: List[Dict[str, Any]]) -> int:
+        """
+        Write sends in a single transaction.
+        
+        Returns:
+            Number of rows written
+        """
+        rows = [
+            tuple(json.dumps(send["request"]) if column == "request" else send.get(column) for column in _COLUMNS)
+            for send in sends
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(_INSERT, rows)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def page(
+        self,
+        limit: int,
+        before: Optional[Tuple[float, int]] = None,
+        kind: Optional[str] = None,
+        recipient: Optional[str] = None,
+        status: Optional[str] = None,
+        message_id: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Return the newest sends matching the filters, older than a cursor.
+        
+        Args:
+            limit: Maximum rows to return
+            before: (created_at, id) of the last row of the previous page
+            kind, recipient, status, message_id: Exact-match filters
+            since, until: Unix time bounds on created_at (inclusive, exclusive)
+            
+        Returns:
+            Sends ordered newest first
+        """
+        clauses, params = [], []
+        filters = (("kind", kind), ("recipient", recipient), ("status", status), ("message_id", message_id))
+        for column, value in filters:
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(until)
+        if before is not None:
+            clauses.append("(created_at, id) < (?, ?)")
+            params.extend(before)
+        
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM sends {where}ORDER BY created_at DESC, id DESC LIMIT ?",
+                (*params, limit)
+            ).fetchall()
+        return [_row_to_send(row) for row in rows]
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def _row_to_send(row) -> Dict[str, Any]:
+    send = dict(row)
+    send["success"] = bool(send["success"])
+    send["request"] = json.loads(send["request"])
+    return send
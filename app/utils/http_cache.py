@@ -0,0 +1,81 @@
+"""ETag and Cache-Control helpers for cacheable GET responses."""
+import hashlib
+from fastapi import Request
+from fastapi.responses import Response
+from fastapi.staticfiles import StaticFiles
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag for a response body."""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def is_not_modified(if_none_match: str, etag: str) -> bool:
+    """
+    Check an If-None-Match header against the current ETag.
+    
+    Uses weak comparison, so W/ tags handed out by the compression
+    middleware still match.
+    
+    Args:
+        if_none_match: Request header value (may list several tags or be "*")
+        etag: Current ETag of the resource
+    
+    Returns:
+        True if the client's copy is current and a 304 should be sent
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    current = etag[2:] if etag.startswith("W/") else etag
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if (tag[2:] if tag.startswith("W/") else tag) == current:
+            return True
+    return False
+
+
+def conditional_response(
+    request: Request,
+    body: bytes,
+    etag: str,
+    media_type: str,
+    cache_control: str = "no-cache"
+) -> Response:
+    """
+    Return `body`, or an empty 304 when the client already has it.
+    
+    Args:
+        request: Incoming request (its If-None-Match is checked)
+        body: Encoded response body
+        etag: ETag of `body` (see make_etag)
+        media_type: Content-Type of `body`
+        cache_control: Cache-Control sent with both the 200 and the 304
+    
+    Returns:
+        Response
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if is_not_modified(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    StaticFiles that lets browsers keep assets for `max_age` seconds.
+    
+    Starlette already answers If-None-Match / If-Modified-Since with 304;
+    this adds a Cache-Control header so unchanged assets are not even
+    revalidated until they go stale.
+    """
+
+    def __init__(self, *args, max_age: int = 86400, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_control = f"public, max-age={max_age}"
+
+    def file_response(self, *args, **kwargs) -> Response:
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = self.cache_control
+        return response
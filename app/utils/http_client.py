@@ -0,0 +1,92 @@
+"""Shared, pooled HTTP client for ClickSend API calls."""
+import logging
+import httpx
+from typing import Dict, Any
+from app.config import (
+    CLICKSEND_TRANSPORT, CLICKSEND_EMAIL, MOCK_LATENCY_MS,
+    HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE_CONNECTIONS, HTTP_KEEPALIVE_EXPIRY,
+    HTTP_HTTP2, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_WRITE_TIMEOUT,
+    HTTP_POOL_TIMEOUT
+)
+
+logger = logging.getLogger(__name__)
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """
+    Create the long-lived HTTP client used for every ClickSend request.
+    
+    The client keeps a pool of keep-alive connections so requests reuse
+    existing TCP+TLS sessions instead of paying a new handshake each time.
+    With CLICKSEND_TRANSPORT=mock it answers in-process instead.
+    
+    Returns:
+        Configured httpx.AsyncClient
+    """
+    http2 = HTTP_HTTP2
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("HTTP_HTTP2 is enabled but the 'h2' package is not installed; using HTTP/1.1")
+            http2 = False
+    
+    limits = httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+    )
+    timeout = httpx.Timeout(
+        connect=HTTP_CONNECT_TIMEOUT,
+        read=HTTP_READ_TIMEOUT,
+        write=HTTP_WRITE_TIMEOUT,
+        pool=HTTP_POOL_TIMEOUT
+    )
+    if CLICKSEND_TRANSPORT == "mock":
+        from app.utils.mock_transport import MockClickSend
+        mock = MockClickSend(sender_email=CLICKSEND_EMAIL, latency=MOCK_LATENCY_MS / 1000)
+        return httpx.AsyncClient(transport=mock.transport(), timeout=timeout)
+    
+    return httpx.AsyncClient(
+        limits=limits,
+        timeout=timeout,
+        http2=http2
+    )
+
+
+def get_pool_stats(client: httpx.AsyncClient) -> Dict[str, Any]:
+    """
+    Summarize connection pool usage for sizing the pool limits.
+    
+    Args:
+        client: The shared HTTP client
+        
+    Returns:
+        Dictionary with configured limits and current connection counts
+    """
+    stats = {
+        "max_connections": HTTP_MAX_CONNECTIONS,
+        "max_keepalive_connections": HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        "keepalive_expiry": HTTP_KEEPALIVE_EXPIRY,
+        "http2": HTTP_HTTP2,
+        "closed": client.is_closed,
+        "connections": 0,
+        "active": 0,
+        "idle": 0,
+        "queued_requests": 0
+    }
+    
+    # httpx does not expose pool internals publicly; read them defensively
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    if pool is None:
+        return stats
+    
+    connections = list(getattr(pool, "connections", []))
+    idle = sum(1 for conn in connections if conn.is_idle())
+    stats["connections"] = len(connections)
+    stats["idle"] = idle
+    stats["active"] = len(connections) - idle
+    stats["queued_requests"] = sum(
+        1 for request in getattr(pool, "_requests", []) if request.is_queued()
+    )
+    return stats
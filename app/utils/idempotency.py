@@ -0,0 +1,158 @@
+"""Idempotency-Key result store for send endpoints."""
+import asyncio
+import json
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from app.database import open_sqlite
+from app.utils.cache import TTLCache
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    key TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    response TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_idempotency_created ON idempotency_keys (created_at);
+"""
+
+
+class IdempotencyConflict(Exception):
+    """Raised when an Idempotency-Key cannot be honoured for this request."""
+
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class IdempotencyStore:
+    """
+    Remember the response produced for each Idempotency-Key.
+    
+    Results live in a bounded in-memory LRU with TTL. Concurrent requests
+    with the same key share one execution. When `path` is given, results
+    are also kept in SQLite so several worker processes see the same keys;
+    a pending row claims the key while the first process is still sending.
+    Only successful responses are stored, so failed sends can be retried
+    with the same key.
+    """
+
+    def __init__(self, ttl: float, maxsize: int, path: Optional[str] = None, wait_timeout: float = 30.0):
+        self.ttl = ttl
+        self.path = path
+        self.wait_timeout = wait_timeout
+        self._cache = TTLCache(ttl=ttl, maxsize=maxsize)
+        self._conn = None
+        self._lock = threading.Lock()
+
+    async def run(
+        self,
+        key: str,
+        fingerprint: str,
+        producer: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Return the stored response for `key`, producing it at most once.
+        
+        Args:
+            key: Client-supplied Idempotency-Key
+            fingerprint: Hash identifying the request the key was first used with
+            producer: Coroutine factory performing the request
+            
+        Returns:
+            Tuple of (replayed, response)
+            
+        Raises:
+            IdempotencyConflict: Key reused for a different request, or still
+                being processed by another worker
+        """
+        is_replayed = True
+        
+        async def load() -> Dict[str, Any]:
+            nonlocal is_replayed
+            if self.path:
+                stored = await self._claim_persistent(key, fingerprint)
+                if stored is not None:
+                    return stored
+            
+            is_replayed = False
+            try:
+                record = {"fingerprint": fingerprint, "response": await producer()}
+            except BaseException:
+                if self.path:
+                    await asyncio.to_thread(self._release, key)
+                raise
+            
+            if self.path:
+                await asyncio.to_thread(self._store, key, record)
+            return record
+        
+        record = await self._cache.get_or_load(key, load)
+        if record["fingerprint"] != fingerprint:
+            raise IdempotencyConflict("Idempotency-Key was already used with a different request", 422)
+        return is_replayed, record["response"]
+
+    async def _claim_persistent(self, key: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Return a stored record, or claim the key for this process (None)."""
+        deadline = time.monotonic() + self.wait_timeout
+        delay = 0.05
+        while True:
+            record = await asyncio.to_thread(self._claim, key, fingerprint)
+            if record is None or record["response"] is not None:
+                return record
+            # Another process holds the key and has not finished yet
+            if record["fingerprint"] != fingerprint:
+                raise IdempotencyConflict("Idempotency-Key was already used with a different request", 422)
+            if time.monotonic() >= deadline:
+                raise IdempotencyConflict("A request with this Idempotency-Key is still in progress", 409)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 1.0)
+
+    def _connect(self):
+        if self._conn is None:
+            self._conn = open_sqlite(self.path)
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def _claim(self, key: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Expire old keys (cheap: range delete on the created_at index)
+                conn.execute(
+                    "DELETE FROM idempotency_keys WHERE created_at < ?", (now - self.ttl,)
+                )
+                row = conn.execute(
+                    "SELECT fingerprint, response FROM idempotency_keys WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    conn.execute(
+                        "INSERT INTO idempotency_keys (key, fingerprint, response, created_at) VALUES (?, ?, NULL, ?)",
+                        (key, fingerprint, now)
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        return {
+            "fingerprint": row["fingerprint"],
+            "response": json.loads(row["response"]) if row["response"] else None
+        }
+
+    def _store(self, key: str, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self._connect().execute(
+                "UPDATE idempotency_keys SET response = ? WHERE key = ?",
+                (json.dumps(record["response"]), key)
+            )
+
+    def _release(self, key: str) -> None:
+        with self._lock:
+            self._connect().execute(
+                "DELETE FROM idempotency_keys WHERE key = ? AND response IS NULL", (key,)
+            )
@@ -0,0 +1,182 @@
+"""Durable SQLite-backed job queue for outbound sends."""
+import json
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional
+from app.database import add_missing_columns, open_sqlite
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    run_after REAL NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_run_after ON jobs (status, run_after);
+"""
+
+# Columns added after the first release, for queues created by older versions
+_LEASE_COLUMNS = {"lease_owner": "TEXT", "lease_expires": "REAL NOT NULL DEFAULT 0"}
+
+
+class JobQueue:
+    """
+    Persistent FIFO of send jobs.
+    
+    Methods are synchronous and thread-safe; async callers should run them
+    via `asyncio.to_thread` so SQLite I/O stays off the event loop.
+    Statuses move queued -> running -> succeeded | failed.
+    
+    Several processes may share one queue file. A claimed job is leased to
+    the claiming queue instance for `lease_timeout` seconds and kept alive
+    with `renew`; `recover` only requeues jobs whose lease has expired, so
+    a starting worker never takes over jobs a live sibling is running.
+    """
+
+    def __init__(self, path: str, lease_timeout: float = 60.0):
+        self.owner = uuid.uuid4().hex
+        self.lease_timeout = lease_timeout
+        self._conn = open_sqlite(path)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.executescript(_SCHEMA)
+            add_missing_columns(self._conn, "jobs", _LEASE_COLUMNS)
+
+    def enqueue(self, kind: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Persist a new queued job and return it."""
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, payload, status, run_after, created_at, updated_at) "
+                "VALUES (?, ?, ?, 'queued', ?, ?, ?)",
+                (job_id, kind, json.dumps(payload), now, now, now)
+            )
+        return self.get(job_id)
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """Atomically take the oldest due queued job, mark it running and lease it to this instance."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id FROM jobs WHERE status = 'queued' AND run_after <= ? "
+                    "ORDER BY run_after LIMIT 1",
+                    (time.time(),)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                now = time.time()
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, updated_at = ?, "
+                    "lease_owner = ?, lease_expires = ? WHERE id = ?",
+                    (now, self.owner, now + self.lease_timeout, row["id"])
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self.get(row["id"])
+
+    def complete(self, job_id: str, result: Dict[str, Any]) -> None:
+        """Mark a job succeeded and store its result."""
+        self._finish(job_id, "succeeded", result, None)
+
+    def fail(self, job_id: str, error: str, result: Optional[Dict[str, Any]] = None) -> None:
+        """Mark a job permanently failed."""
+        self._finish(job_id, "failed", result, error)
+
+    def retry(self, job_id: str, error: str, delay: float) -> None:
+        """Put a running job back on the queue to run again after `delay` seconds."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'queued', error = ?, run_after = ?, updated_at = ?, "
+                "lease_owner = NULL, lease_expires = 0 WHERE id = ?",
+                (error, now + delay, now, job_id)
+            )
+
+    def renew(self) -> int:
+        """
+        Extend the lease of every job this instance is running.
+        
+        Returns:
+            Number of leases renewed
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE status = 'running' AND lease_owner = ?",
+                (time.time() + self.lease_timeout, self.owner)
+            )
+        return cursor.rowcount
+
+    def recover(self) -> int:
+        """
+        Requeue running jobs whose lease expired (their process stopped or crashed).
+        
+        Returns:
+            Number of jobs requeued
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'queued', updated_at = ?, lease_owner = NULL, lease_expires = 0 "
+                "WHERE status = 'running' AND lease_expires < ?",
+                (now, now)
+            )
+        return cursor.rowcount
+
+    def release(self) -> int:
+        """
+        Requeue the jobs this instance is running, e.g. when shutting down.
+        
+        Returns:
+            Number of jobs requeued
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'queued', updated_at = ?, lease_owner = NULL, lease_expires = 0 "
+                "WHERE status = 'running' AND lease_owner = ?",
+                (time.time(), self.owner)
+            )
+        return cursor.rowcount
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a job by ID, or None if it does not exist."""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def depth(self) -> int:
+        """Return the number of queued jobs."""
+        with self._lock:
+            row = self._conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()
+        return row[0]
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _finish(self, job_id: str, status: str, result: Optional[Dict[str, Any]], error: Optional[str]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ?, "
+                "lease_owner = NULL, lease_expires = 0 WHERE id = ?",
+                (status, json.dumps(result) if result is not None else None, error, time.time(), job_id)
+            )
@@ -0,0 +1,283 @@
+"""Lightweight Prometheus metrics: counters, gauges, histograms and text exposition."""
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Base class for labelled metrics; children are cached per label tuple."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    def labels(self, *values: str):
+        """Return the child metric for a label value tuple."""
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in list(self._children.items()):
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    def _render_child(self, values, child) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"]
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _Value()
+
+
+class _HistogramValue:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observed values."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def _render_child(self, values, child) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, values, f'le="{_format_value(bound)}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {child.sum!r}")
+        lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics plus callbacks that refresh gauges at scrape time."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Register a callback run before each scrape (e.g. to copy pool stats into gauges)."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        for collector in self._collectors:
+            collector()
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+UPSTREAM_LATENCY = REGISTRY.register(Histogram(
+    "clicksend_upstream_request_duration_seconds",
+    "ClickSend call latency by phase: queue (rate limit wait), connect, response (time to headers) and total.",
+    ("endpoint", "phase")
+))
+UPSTREAM_REQUESTS = REGISTRY.register(Counter(
+    "clicksend_upstream_requests_total",
+    "ClickSend call attempts by ClickSend status code ('error' for transport failures, 'circuit_open' when refused).",
+    ("endpoint", "status")
+))
+UPSTREAM_IN_FLIGHT = REGISTRY.register(Gauge(
+    "clicksend_upstream_in_flight",
+    "ClickSend calls currently in progress, including rate limit waits and retries.",
+    ("endpoint",)
+))
+HTTP_IN_FLIGHT = REGISTRY.register(Gauge(
+    "app_http_requests_in_flight",
+    "Requests to this service currently being handled."
+))
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "app_http_requests_total",
+    "Requests to this service by method and response status.",
+    ("method", "status")
+))
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "clicksend_cache_requests_total",
+    "Cache lookups by cache and result (hit or miss).",
+    ("cache", "result")
+))
+POOL_CONNECTIONS = REGISTRY.register(Gauge(
+    "clicksend_http_pool_connections",
+    "HTTP client connections per account by state (active, idle) and queued requests.",
+    ("account", "state")
+))
+RATE_LIMIT_RATE = REGISTRY.register(Gauge(
+    "clicksend_rate_limit_requests_per_second",
+    "Current adaptive rate limit per account and bucket.",
+    ("account", "bucket")
+))
+RATE_LIMIT_WAITING = REGISTRY.register(Gauge(
+    "clicksend_rate_limit_waiting",
+    "Callers waiting for a rate limit token per account and bucket.",
+    ("account", "bucket")
+))
+ACCOUNT_IN_FLIGHT = REGISTRY.register(Gauge(
+    "clicksend_account_in_flight",
+    "Requests in flight (including rate limit waits) per ClickSend account.",
+    ("account",)
+))
+ACCOUNT_AVAILABLE = REGISTRY.register(Gauge(
+    "clicksend_account_available",
+    "0 while an account is skipped after an authentication failure, otherwise 1.",
+    ("account",)
+))
+WEBHOOK_EVENTS = REGISTRY.register(Counter(
+    "app_webhook_events_total",
+    "Webhook events accepted from ClickSend by kind (delivery, inbound).",
+    ("kind",)
+))
+HISTORY_DROPPED = REGISTRY.register(Counter(
+    "app_history_dropped_total",
+    "Send history rows dropped because the write buffer was full."
+))
+CIRCUIT_OPEN = REGISTRY.register(Gauge(
+    "clicksend_circuit_open",
+    "1 while the ClickSend circuit breaker is open or half-open, otherwise 0."
+))
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware counting in-flight and completed HTTP requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        status = {"code": 500}
+        
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+        
+        in_flight = HTTP_IN_FLIGHT.labels()
+        in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            HTTP_REQUESTS.labels(scope["method"], str(status["code"])).inc()
+
+
+class PhaseTimer:
+    """
+    Collect connect/response timings from httpcore trace events.
+    
+    Pass `timer.trace` as the request's `trace` extension; it only stores
+    monotonic timestamps, so the per-request overhead is a few dict writes.
+    """
+
+    __slots__ = ("marks",)
+
+    def __init__(self):
+        self.marks: Dict[str, float] = {}
+
+    async def trace(self, event_name: str, info: dict) -> None:
+        self.marks[event_name] = time.monotonic()
+
+    def connect_time(self) -> Optional[float]:
+        """Seconds spent opening TCP and TLS, or None if a pooled connection was reused."""
+        start = self.marks.get("connection.connect_tcp.started")
+        end = self.marks.get("connection.start_tls.complete") or self.marks.get("connection.connect_tcp.complete")
+        return end - start if start and end else None
+
+    def response_time(self) -> Optional[float]:
+        """Seconds from sending the request to receiving response headers."""
+        for prefix in ("http11", "http2"):
+            start = self.marks.get(f"{prefix}.send_request_headers.started")
+            end = self.marks.get(f"{prefix}.receive_response_headers.complete")
+            if start and end:
+                return end - start
+        return None
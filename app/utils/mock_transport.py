@@ -0,0 +1,139 @@
+"""In-process ClickSend stand-in for dry-run and load-test deployments."""
+import asyncio
+import itertools
+import json
+import re
+import time
+import uuid
+from typing import Any, Dict
+import httpx
+from app.utils.sms_encoding import estimate
+
+SMS_PART_PRICE = 0.077
+EMAIL_PRICE = 0.01
+
+_VERIFY_SEND = re.compile(r"/email/address-verify/(\d+)/send$")
+_VERIFY_TOKEN = re.compile(r"/email/address-verify/(\d+)/verify/[^/]+$")
+_PRICING = re.compile(r"/pricing/([A-Za-z]{2})$")
+
+
+def envelope(data: Any, message: str = "Success", http_code: int = 200, response_code: str = "SUCCESS") -> Dict[str, Any]:
+    """Wrap data in ClickSend's standard response envelope."""
+    return {"http_code": http_code, "response_code": response_code, "response_msg": message, "data": data}
+
+
+def _decoded_size(content: str) -> int:
+    """Byte size of base64 content without decoding it."""
+    return len(content) * 3 // 4 - content[-2:].count("=")
+
+
+class MockClickSend:
+    """
+    Deterministic ClickSend API served through `httpx.MockTransport`.
+    
+    Responses follow the real API's shapes; message IDs come from a counter
+    so runs are reproducible, and no sockets are opened.
+    """
+
+    def __init__(self, sender_email: str = "", latency: float = 0.0):
+        self.latency = latency
+        self._ids = itertools.count(1)
+        self.email_addresses: Dict[int, Dict[str, Any]] = {}
+        if sender_email:
+            self.add_address(sender_email, verified=True)
+
+    def transport(self) -> httpx.MockTransport:
+        """Return an httpx transport routing requests to this mock."""
+        return httpx.MockTransport(self.handle)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        """Answer one ClickSend API request."""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        
+        path = request.url.path
+        method = request.method
+        content = await request.aread()
+        body = json.loads(content) if content else {}
+        
+        if method == "POST" and path.endswith("/sms/send"):
+            return httpx.Response(200, json=self.sms_send(body))
+        if method == "POST" and path.endswith("/email/send"):
+            return httpx.Response(200, json=self.email_send(body))
+        if path.endswith("/email/addresses"):
+            if method == "GET":
+                return httpx.Response(200, json=envelope({
+                    "total": len(self.email_addresses),
+                    "data": list(self.email_addresses.values())
+                }))
+            return httpx.Response(200, json=envelope(self.add_address(body.get("email_address", ""))))
+        
+        match = _PRICING.search(path)
+        if method == "GET" and match:
+            return httpx.Response(200, json=envelope({
+                "country": match.group(1).upper(),
+                "currency_name_short": request.url.params.get("currency", "AUD"),
+                "sms": {"price_rate_0": f"{SMS_PART_PRICE:.4f}", "price_rate_1": f"{SMS_PART_PRICE * 0.9:.4f}"}
+            }))
+        
+        match = _VERIFY_SEND.search(path) or _VERIFY_TOKEN.search(path)
+        if method == "PUT" and match:
+            address = self.email_addresses.get(int(match.group(1)))
+            if address is None:
+                return httpx.Response(404, json=envelope(None, "Email address not found", 404, "NOT_FOUND"))
+            if _VERIFY_TOKEN.search(path):
+                address["verified"] = 1
+            return httpx.Response(200, json=envelope(address))
+        
+        return httpx.Response(404, json=envelope(None, "Resource not found", 404, "NOT_FOUND"))
+
+    def sms_send(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a /sms/send response for a messages payload."""
+        now = int(time.time())
+        messages = []
+        for message in body.get("messages", []):
+            parts = estimate(message.get("body", ""))["segments"]
+            messages.append({
+                **message,
+                "message_id": self._next_id(),
+                "message_parts": parts,
+                "message_price": f"{parts * SMS_PART_PRICE:.4f}",
+                "date": now,
+                "status": "SUCCESS"
+            })
+        return envelope({
+            "total_price": round(sum(float(m["message_price"]) for m in messages), 4),
+            "total_count": len(messages),
+            "queued_count": len(messages),
+            "messages": messages
+        }, "Messages queued for delivery.")
+
+    def email_send(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Build an /email/send response."""
+        return envelope({
+            "message_id": self._next_id(),
+            "to": body.get("to"),
+            "from": body.get("from"),
+            "subject": body.get("subject"),
+            "_attachments": [
+                {"file_name": attachment.get("filename"), "size": _decoded_size(attachment.get("content", ""))}
+                for attachment in body.get("attachments", [])
+            ],
+            "status": "Queued",
+            "price": f"{EMAIL_PRICE:.4f}",
+            "date_added": int(time.time())
+        })
+
+    def add_address(self, email: str, verified: bool = False) -> Dict[str, Any]:
+        """Register an email address and return its record."""
+        address_id = len(self.email_addresses) + 1
+        self.email_addresses[address_id] = {
+            "email_address_id": address_id,
+            "email_address": email,
+            "verified": int(verified),
+            "date_added": int(time.time())
+        }
+        return self.email_addresses[address_id]
+
+    def _next_id(self) -> str:
+        return str(uuid.UUID(int=next(self._ids))).upper()
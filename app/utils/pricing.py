@@ -0,0 +1,142 @@
+"""Country lookup by dialling prefix and a cached per-country SMS rate table."""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+from app.utils.recipients import CALLING_CODES
+
+logger = logging.getLogger(__name__)
+
+class PrefixTrie:
+    """
+    Longest-prefix lookup over digit strings.
+    
+    Each node is a dict keyed by digit, with the value of a prefix ending
+    there stored under None. A lookup walks at most as many digits as the
+    longest prefix (`depth`), so mapping a number to its country costs a
+    handful of dict hits regardless of how many prefixes are loaded.
+    """
+
+    def __init__(self, prefixes: Iterable[Tuple[str, Any]] = ()):
+        self._root: Dict[Optional[str], Any] = {}
+        self.depth = 0
+        for prefix, value in prefixes:
+            self.insert(prefix, value)
+
+    def insert(self, prefix: str, value: Any) -> None:
+        self.depth = max(self.depth, len(prefix))
+        node = self._root
+        for digit in prefix:
+            node = node.setdefault(digit, {})
+        node[None] = value
+
+    def longest_match(self, digits: str) -> Any:
+        """Value of the longest prefix of `digits`, or None if no prefix matches."""
+        node = self._root
+        found = None
+        for digit in digits:
+            node = node.get(digit)
+            if node is None:
+                break
+            found = node.get(None, found)
+        return found
+
+
+def country_trie() -> PrefixTrie:
+    """Trie mapping E.164 digits (without +) to ISO country codes."""
+    return PrefixTrie(CALLING_CODES.items())
+
+
+class RateTable:
+    """
+    Per-country SMS rates cached for `ttl` seconds.
+    
+    A country is fetched once on first use (concurrent callers share the
+    request). After `ttl` the stale rate keeps being served while one
+    background task refreshes it, so quotes never wait on ClickSend for a
+    country that was priced before. Failed refreshes keep the old rate; a
+    country that has never been priced and fails is not retried for
+    `negative_ttl` seconds, so repeated quotes do not refetch it every time.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], Awaitable[Optional[Dict[str, Any]]]],
+        ttl: float,
+        negative_ttl: float = 60.0
+    ):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self._loader = loader
+        self._rates: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._failed: Dict[str, float] = {}
+        self._loading: Dict[str, asyncio.Task] = {}
+
+    async def get_many(self, countries: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Return the rate of each country (None if it could not be priced).
+        
+        Args:
+            countries: ISO country codes
+        
+        Returns:
+            Mapping of country to its rate dict (`rate`, `currency`)
+        """
+        countries = list(countries)
+        now = time.monotonic()
+        missing = []
+        for country in countries:
+            entry = self._rates.get(country)
+            if entry is None:
+                if self._failed.get(country, 0.0) > now:
+                    # Failed recently: answer "no rate" without asking ClickSend again
+                    self.hits += 1
+                    continue
+                missing.append(country)
+                self.misses += 1
+                continue
+            self.hits += 1
+            if now - entry[0] >= self.ttl and country not in self._loading:
+                self.refreshes += 1
+                self._load(country)
+        if missing:
+            await asyncio.gather(*(asyncio.shield(self._load(country)) for country in missing))
+        rates = {}
+        for country in countries:
+            entry = self._rates.get(country)
+            rates[country] = entry[1] if entry else None
+        return rates
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cached countries and hit/miss/refresh counters."""
+        now = time.monotonic()
+        return {
+            "countries": sorted(self._rates),
+            "failed": sorted(country for country, until in self._failed.items() if until > now),
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes
+        }
+
+    def _load(self, country: str) -> asyncio.Task:
+        task = self._loading.get(country)
+        if task is None:
+            task = self._loading[country] = asyncio.create_task(self._fetch(country))
+        return task
+
+    async def _fetch(self, country: str) -> None:
+        rate = None
+        try:
+            rate = await self._loader(country)
+        except Exception as e:
+            logger.warning("Failed to load SMS pricing for %s: %s", country, e)
+        finally:
+            self._loading.pop(country, None)
+        if rate is not None:
+            self._rates[country] = (time.monotonic(), rate)
+            self._failed.pop(country, None)
+        elif country not in self._rates:
+            self._failed[country] = time.monotonic() + self.negative_ttl
@@ -0,0 +1,115 @@
+"""Adaptive token-bucket rate limiting for upstream calls."""
+import asyncio
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header into seconds.
+    
+    Args:
+        value: Header value, either delta-seconds or an HTTP date
+        
+    Returns:
+        Seconds to wait, or None if missing or unparseable
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class RateLimiter:
+    """
+    Token bucket whose rate adapts to upstream throttling.
+    
+    The rate is halved on every 429 (down to `min_rate`) and grows back by
+    `increase` requests/second per success (up to `max_rate`), so callers
+    converge on the highest rate ClickSend will sustain. A Retry-After
+    blocks all acquirers until it has passed. Waiters are served in FIFO
+    order.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None, min_rate: float = 0.5, increase: float = 0.1):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.increase = increase
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.waiting = 0
+        self.throttled = 0
+        self._tokens = self.burst
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent."""
+        self.waiting += 1
+        try:
+            async with self._lock:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if now < self._blocked_until:
+                        await asyncio.sleep(self._blocked_until - now)
+                        continue
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    await asyncio.sleep((1 - self._tokens) / self.rate)
+        finally:
+            self.waiting -= 1
+
+    def on_success(self) -> None:
+        """Record an accepted request, nudging the rate back up."""
+        if self.rate < self.max_rate:
+            self._refill(time.monotonic())
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> None:
+        """
+        Record a 429 response.
+        
+        Args:
+            retry_after: Seconds the upstream asked us to wait, if given
+        """
+        now = time.monotonic()
+        self._refill(now)
+        self.throttled += 1
+        self.rate = max(self.min_rate, self.rate / 2)
+        self._tokens = min(self._tokens, 0.0)
+        if retry_after:
+            self._blocked_until = max(self._blocked_until, now + retry_after)
+
+    def blocked_for(self) -> float:
+        """Seconds left before a Retry-After block lifts (0 when not blocked)."""
+        return max(0.0, self._blocked_until - time.monotonic())
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the current rate, configured ceiling and queue depth."""
+        return {
+            "rate": round(self.rate, 3),
+            "max_rate": self.max_rate,
+            "tokens": round(self._tokens, 3),
+            "waiting": self.waiting,
+            "throttled": self.throttled,
+            "blocked_for": round(self.blocked_for(), 3)
+        }
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
@@ -0,0 +1,130 @@
+"""SQLite store for ClickSend delivery receipts and inbound messages."""
+import json
+import threading
+from typing import Any, Dict, List, Optional
+from app.database import open_sqlite
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS receipts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    message_id TEXT,
+    recipient TEXT,
+    sender TEXT,
+    status TEXT,
+    status_code TEXT,
+    error_text TEXT,
+    event_at REAL,
+    received_at REAL NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_receipts_message_id ON receipts (message_id, id);
+CREATE INDEX IF NOT EXISTS idx_receipts_recipient ON receipts (recipient, id);
+CREATE INDEX IF NOT EXISTS idx_receipts_status ON receipts (status, id);
+CREATE INDEX IF NOT EXISTS idx_receipts_received_at ON receipts (received_at);
+"""
+
+_COLUMNS = (
+    "kind", "message_id", "recipient", "sender", "status", "status_code",
+    "error_text", "event_at", "received_at", "payload"
+)
+
+_INSERT = f"INSERT INTO receipts ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})"
+
+
+class ReceiptStore:
+    """
+    Append-only log of webhook events.
+    
+    Methods are synchronous and thread-safe; async callers should run them
+    via `asyncio.to_thread`. Rows are ordered by their autoincrement id,
+    which doubles as the keyset pagination cursor.
+    """
+
+    def __init__(self, path: str):
+        self._conn = open_sqlite(path)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.executescript(_SCHEMA)
+
+    def insert_many(self, events: List[Dict[str, Any]]) -> int:
+        """
+        Write events in a single transaction.
+        
+        Args:
+            events: Normalised events (see ReceiptController.normalise)
+            
+        Returns:
+            Number of rows written
+        """
+        rows = [
+            tuple(json.dumps(event["payload"]) if column == "payload" else event.get(column) for column in _COLUMNS)
+            for event in events
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(_INSERT, rows)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def for_message(self, message_id: str) -> List[Dict[str, Any]]:
+        """Return every event recorded for a message, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM receipts WHERE message_id = ? ORDER BY id",
+                (message_id,)
+            ).fetchall()
+        return [_row_to_event(row) for row in rows]
+
+    def page(
+        self,
+        limit: int,
+        before: Optional[int] = None,
+        kind: Optional[str] = None,
+        status: Optional[str] = None,
+        recipient: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Return the newest events, optionally filtered, older than a cursor.
+        
+        Args:
+            limit: Maximum rows to return
+            before: Only return rows with an id below this cursor
+            kind: Filter by event kind (delivery or inbound)
+            status: Filter by delivery status
+            recipient: Filter by recipient number or address
+            
+        Returns:
+            Events ordered newest first
+        """
+        clauses, params = [], []
+        for column, value in (("kind", kind), ("status", status), ("recipient", recipient)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if before is not None:
+            clauses.append("id < ?")
+            params.append(before)
+        
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM receipts {where}ORDER BY id DESC LIMIT ?",
+                (*params, limit)
+            ).fetchall()
+        return [_row_to_event(row) for row in rows]
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def _row_to_event(row) -> Dict[str, Any]:
+    event = dict(row)
+    event["payload"] = json.loads(event["payload"])
+    return event
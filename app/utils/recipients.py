@@ -0,0 +1,166 @@
+"""Recipient normalization and de-duplication for single, batch and bulk sends."""
+from functools import lru_cache
+from operator import itemgetter
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from app.config import DEFAULT_COUNTRY, RECIPIENT_CACHE_SIZE
+
+# ITU-T E.164 dialling prefixes (without +) to ISO 3166 country, the one table
+# behind both national-number normalization and the pricing country lookup.
+# Shared codes map to their main country unless a longer prefix says otherwise;
+# non-geographic codes (800, 870, 881-883, 979, ...) are left out.
+CALLING_CODES = {
+    # Zone 1 (NANP): US unless the area code belongs to Canada or a territory below
+    "1": "US",
+    "1242": "BS", "1246": "BB", "1264": "AI", "1268": "AG", "1284": "VG", "1340": "VI", "1345": "KY",
+    "1441": "BM", "1473": "GD", "1649": "TC", "1658": "JM", "1664": "MS", "1670": "MP", "1671": "GU",
+    "1684": "AS", "1721": "SX", "1758": "LC", "1767": "DM", "1784": "VC", "1787": "PR", "1809": "DO",
+    "1829": "DO", "1849": "DO", "1868": "TT", "1869": "KN", "1876": "JM", "1939": "PR",
+    # Zone 2: Africa and North Atlantic
+    "20": "EG", "211": "SS", "212": "MA", "213": "DZ", "216": "TN", "218": "LY", "220": "GM", "221": "SN",
+    "222": "MR", "223": "ML", "224": "GN", "225": "CI", "226": "BF", "227": "NE", "228": "TG", "229": "BJ",
+    "230": "MU", "231": "LR", "232": "SL", "233": "GH", "234": "NG", "235": "TD", "236": "CF", "237": "CM",
+    "238": "CV", "239": "ST", "240": "GQ", "241": "GA", "242": "CG", "243": "CD", "244": "AO", "245": "GW",
+    "246": "IO", "247": "AC", "248": "SC", "249": "SD", "250": "RW", "251": "ET", "252": "SO", "253": "DJ",
+    "254": "KE", "255": "TZ", "256": "UG", "257": "BI", "258": "MZ", "260": "ZM", "261": "MG", "262": "RE",
+    "263": "ZW", "264": "NA", "265": "MW", "266": "LS", "267": "BW", "268": "SZ", "269": "KM", "27": "ZA",
+    "290": "SH", "291": "ER", "297": "AW", "298": "FO", "299": "GL",
+    # Zones 3 and 4: Europe
+    "30": "GR", "31": "NL", "32": "BE", "33": "FR", "34": "ES", "350": "GI", "351": "PT", "352": "LU",
+    "353": "IE", "354": "IS", "355": "AL", "356": "MT", "357": "CY", "358": "FI", "359": "BG", "36": "HU",
+    "370": "LT", "371": "LV", "372": "EE", "373": "MD", "374": "AM", "375": "BY", "376": "AD", "377": "MC",
+    "378": "SM", "379": "VA", "380": "UA", "381": "RS", "382": "ME", "383": "XK", "385": "HR", "386": "SI",
+    "387": "BA", "389": "MK", "39": "IT", "40": "RO", "41": "CH", "420": "CZ", "421": "SK", "423": "LI",
+    "43": "AT", "44": "GB", "45": "DK", "46": "SE", "47": "NO", "48": "PL", "49": "DE",
+    # Zone 5: Central and South America
+    "500": "FK", "501": "BZ", "502": "GT", "503": "SV", "504": "HN", "505": "NI", "506": "CR", "507": "PA",
+    "508": "PM", "509": "HT", "51": "PE", "52": "MX", "53": "CU", "54": "AR", "55": "BR", "56": "CL",
+    "57": "CO", "58": "VE", "590": "GP", "591": "BO", "592": "GY", "593": "EC", "594": "GF", "595": "PY",
+    "596": "MQ", "597": "SR", "598": "UY", "599": "CW", "5997": "BQ",
+    # Zone 6: Southeast Asia and Oceania
+    "60": "MY", "61": "AU", "62": "ID", "63": "PH", "64": "NZ", "65": "SG", "66": "TH", "670": "TL",
+    "672": "NF", "673": "BN", "674": "NR", "675": "PG", "676": "TO", "677": "SB", "678": "VU", "679": "FJ",
+    "680": "PW", "681": "WF", "682": "CK", "683": "NU", "685": "WS", "686": "KI", "687": "NC", "688": "TV",
+    "689": "PF", "690": "TK", "691": "FM", "692": "MH",
+    # Zone 7: Russia and Kazakhstan
+    "7": "RU", "76": "KZ", "77": "KZ",
+    # Zone 8: East Asia
+    "81": "JP", "82": "KR", "84": "VN", "850": "KP", "852": "HK", "853": "MO", "855": "KH", "856": "LA",
+    "86": "CN", "880": "BD", "886": "TW",
+    # Zone 9: West, Central and South Asia
+    "90": "TR", "91": "IN", "92": "PK", "93": "AF", "94": "LK", "95": "MM", "960": "MV", "961": "LB",
+    "962": "JO", "963": "SY", "964": "IQ", "965": "KW", "966": "SA", "967": "YE", "968": "OM", "970": "PS",
+    "971": "AE", "972": "IL", "973": "BH", "974": "QA", "975": "BT", "976": "MN", "977": "NP", "98": "IR",
+    "992": "TJ", "993": "TM", "994": "AZ", "995": "GE", "996": "KG", "998": "UZ"
+}
+
+# Canadian area codes inside the shared +1 (NANP) zone
+_CANADA_AREA_CODES = (
+    "204", "226", "236", "249", "250", "263", "289", "306", "343", "354", "365", "367", "368", "382",
+    "403", "416", "418", "428", "431", "437", "438", "450", "468", "474", "506", "514", "519", "548",
+    "579", "581", "584", "587", "604", "613", "639", "647", "672", "683", "705", "709", "742", "753",
+    "778", "780", "782", "807", "819", "825", "867", "873", "879", "902", "905"
+)
+CALLING_CODES.update(("1" + area_code, "CA") for area_code in _CANADA_AREA_CODES)
+
+
+def _country_codes(prefixes: Dict[str, str]) -> Dict[str, str]:
+    """Country -> international calling code, derived from the dialling prefixes."""
+    codes: Dict[str, str] = {}
+    for prefix, country in prefixes.items():
+        # Zones 1 and 7 have one-digit codes; longer prefixes only split a code between countries
+        codes.setdefault(country, prefix[0] if prefix[0] in "17" else prefix[:3])
+    return codes
+
+
+# Country calling codes for numbers written without an international prefix
+COUNTRY_CALLING_CODES = _country_codes(CALLING_CODES)
+
+_SEPARATORS = str.maketrans("", "", " -.()/\t")
+
+
+def normalize_phone(value: str, default_country: Optional[str] = None) -> Optional[str]:
+    """
+    Convert a phone number to E.164.
+    
+    Accepts "+61 412 345 678", "0061412345678", "0412 345 678" and
+    "61412345678" alike. Numbers without an international prefix are read
+    as national numbers of `default_country` (a leading trunk 0 is dropped).
+    Results are memoized, so repeated numbers in a large list cost a dict
+    lookup.
+    
+    Args:
+        value: Number as entered
+        default_country: ISO 3166 alpha-2 code (DEFAULT_COUNTRY by default)
+    
+    Returns:
+        E.164 number, or None if it cannot be normalized
+    """
+    return _normalize_phone(value, (default_country or DEFAULT_COUNTRY).upper())
+
+
+@lru_cache(maxsize=RECIPIENT_CACHE_SIZE)
+def _normalize_phone(value: str, country: str) -> Optional[str]:
+    raw = value.strip().translate(_SEPARATORS)
+    if raw.startswith("+"):
+        digits = raw[1:]
+    elif raw.startswith("00"):
+        digits = raw[2:]
+    else:
+        code = COUNTRY_CALLING_CODES.get(country)
+        if code is None:
+            return None
+        if raw.startswith("0"):
+            digits = code + raw[1:]
+        elif raw.startswith(code) and len(raw) >= 11:
+            # Already international, just missing the +
+            digits = raw
+        else:
+            digits = code + raw
+    if 10 <= len(digits) <= 15 and digits.isascii() and digits.isdigit():
+        return "+" + digits
+    return None
+
+
+@lru_cache(maxsize=RECIPIENT_CACHE_SIZE)
+def normalize_email(value: str) -> str:
+    """Trim and lowercase an email address so case variants dedupe to one recipient."""
+    return value.strip().lower()
+
+
+def recipient_key(values: Iterable[Any]) -> Tuple[Any, ...]:
+    """Tuple identifying a normalized recipient/content combination."""
+    return tuple(values)
+
+
+def split_duplicates(
+    items: List[Dict[str, Any]],
+    fields: Tuple[str, ...],
+    seen: Optional[Set[Any]] = None
+) -> Tuple[List[int], List[int]]:
+    """
+    Separate first occurrences from repeats.
+    
+    Two items are duplicates when all `fields` match (after normalization
+    by the request models), so the same message to the same recipient is
+    only sent and billed once.
+    
+    Args:
+        items: Recipients with already-normalized values
+        fields: Keys compared to detect repeats, e.g. ("to", "message")
+        seen: Keys from earlier chunks of the same list, updated in place
+    
+    Returns:
+        Tuple of (indexes to send, indexes of duplicates)
+    """
+    seen = set() if seen is None else seen
+    unique: List[int] = []
+    duplicates: List[int] = []
+    values = itemgetter(*fields)
+    for index, item in enumerate(items):
+        key = values(item)
+        if key in seen:
+            duplicates.append(index)
+        else:
+            seen.add(key)
+            unique.append(index)
+    return unique, duplicates
@@ -0,0 +1,105 @@
+"""Incremental CSV/NDJSON parsing of streamed request bodies."""
+import codecs
+import csv
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+CSV_TYPES = {"text/csv", "application/csv"}
+NDJSON_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines"}
+
+
+def record_format(content_type: Optional[str]) -> Optional[str]:
+    """
+    Map a Content-Type header to "csv" or "ndjson".
+    
+    Returns:
+        Format name, or None if the type is not supported
+    """
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in CSV_TYPES:
+        return "csv"
+    if media_type in NDJSON_TYPES:
+        return "ndjson"
+    return None
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Split a stream of byte chunks into text lines without buffering the whole body.
+    
+    Args:
+        chunks: Async iterator of raw body chunks (UTF-8)
+        
+    Yields:
+        Lines with trailing newline characters removed
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        lines = pending.split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def iter_records(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Parse a streamed CSV (with header row) or NDJSON body into records.
+    
+    Each yielded record has a 1-based "_row" number. Rows that cannot be
+    parsed are yielded as {"_row": n, "_error": message} so the caller can
+    report them and continue.
+    
+    Args:
+        chunks: Async iterator of raw body chunks
+        fmt: "csv" or "ndjson"
+        
+    Yields:
+        Record dictionaries
+    """
+    row = 0
+    if fmt == "ndjson":
+        async for line in iter_lines(chunks):
+            if not line.strip():
+                continue
+            row += 1
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield {"_row": row, "_error": f"Invalid JSON: {e}"}
+                continue
+            if not isinstance(record, dict):
+                yield {"_row": row, "_error": "Each line must be a JSON object"}
+                continue
+            record["_row"] = row
+            yield record
+        return
+    
+    header: Optional[List[str]] = None
+    pending: List[str] = []
+    async for line in iter_lines(chunks):
+        pending.append(line)
+        # A quoted field may contain newlines; wait until the quotes balance
+        if sum(part.count('"') for part in pending) % 2:
+            continue
+        fields = next(csv.reader(["\n".join(pending)]), [])
+        pending = []
+        if not any(field.strip() for field in fields):
+            continue
+        if header is None:
+            header = [field.strip().lower() for field in fields]
+            continue
+        row += 1
+        if len(fields) != len(header):
+            yield {"_row": row, "_error": f"Expected {len(header)} columns, got {len(fields)}"}
+            continue
+        record = dict(zip(header, fields))
+        record["_row"] = row
+        yield record
+    
+    if pending:
+        yield {"_row": row + 1, "_error": "Unterminated quoted field"}
@@ -0,0 +1,126 @@
+"""Per-request phase timings exposed as Server-Timing, with sampled slow-request logs."""
+import json
+import logging
+import random
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class RequestTiming:
+    """Accumulated seconds per phase for one HTTP request."""
+
+    __slots__ = ("started", "phases")
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.phases: Dict[str, float] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        """Add time to a phase (retries and repeated lookups are summed)."""
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def header(self, total: float) -> str:
+        """Format phases and the total as a Server-Timing header value."""
+        parts = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.phases.items()]
+        parts.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_current: ContextVar[Optional[RequestTiming]] = ContextVar("request_timing", default=None)
+
+
+def record_phase(name: str, seconds: float) -> None:
+    """Add `seconds` to a phase of the current request; a no-op outside timed requests."""
+    timing = _current.get()
+    if timing is not None:
+        timing.add(name, seconds)
+
+
+class _Phase:
+    __slots__ = ("timing", "name", "started")
+
+    def __init__(self, timing: RequestTiming, name: str):
+        self.timing = timing
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.started = time.monotonic()
+
+    def __exit__(self, *exc_info) -> None:
+        self.timing.add(self.name, time.monotonic() - self.started)
+
+
+class _NoPhase:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+_NO_PHASE = _NoPhase()
+
+
+def timed(name: str):
+    """
+    Context manager timing a block as phase `name` of the current request.
+    
+    Outside a timed request it returns a shared no-op object, so hooks in
+    controller code cost one context variable lookup when timing is off.
+    """
+    timing = _current.get()
+    return _NO_PHASE if timing is None else _Phase(timing, name)
+
+
+class ServerTimingMiddleware:
+    """
+    Pure ASGI middleware timing requests whose path starts with one of `paths`.
+    
+    Controller hooks (`record_phase` / `timed`) add phases such as the rate
+    limit queue, sender lookup, connect and ClickSend response time; they are
+    returned in a Server-Timing header together with the total. Requests
+    slower than `slow_ms` are logged as one JSON record, for a random
+    `sample_rate` fraction of them.
+    """
+
+    def __init__(self, app, paths: Tuple[str, ...], slow_ms: float = 1000.0, sample_rate: float = 0.1):
+        self.app = app
+        self.paths = tuple(paths)
+        self.slow_ms = slow_ms
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.paths):
+            await self.app(scope, receive, send)
+            return
+        
+        timing = RequestTiming()
+        token = _current.set(timing)
+        status = {"code": 500}
+
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timing.header(time.monotonic() - timing.started).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            duration_ms = (time.monotonic() - timing.started) * 1000
+            if duration_ms >= self.slow_ms and random.random() < self.sample_rate:
+                logger.warning("Slow request %s", json.dumps({
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status["code"],
+                    "duration_ms": round(duration_ms, 1),
+                    "phases_ms": {name: round(seconds * 1000, 1) for name, seconds in timing.phases.items()}
+                }))
@@ -0,0 +1,84 @@
+"""Retry policy with jittered exponential backoff and a deadline budget."""
+import random
+import time
+from typing import Optional
+import httpx
+
+# Errors raised before the request reached ClickSend, so resending cannot duplicate it
+_UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+# Statuses where ClickSend rejected the request without processing it
+_UNPROCESSED_STATUSES = {429, 503}
+
+_RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+_IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+def is_unsent(status_code: Optional[int], error: Optional[Exception]) -> bool:
+    """Return True if ClickSend cannot have processed the request, so resending cannot duplicate it."""
+    if error is not None:
+        return isinstance(error, _UNSENT_ERRORS)
+    return status_code in _UNPROCESSED_STATUSES
+
+
+class RetryPolicy:
+    """
+    Decide whether and when to retry a failed ClickSend request.
+    
+    Idempotent methods are retried on any transient failure. POST (sends)
+    is only retried when the request cannot have been processed upstream,
+    unless `retry_unsafe` is set. All attempts share one deadline budget.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 5.0,
+        deadline: float = 20.0,
+        retry_unsafe: bool = False
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.retry_unsafe = retry_unsafe
+
+    def is_retryable(self, method: str, status_code: Optional[int], error: Optional[Exception]) -> bool:
+        """Return True if a failure is transient and safe to resend."""
+        if is_unsent(status_code, error):
+            return True
+        is_idempotent = self.retry_unsafe or method.upper() in _IDEMPOTENT_METHODS
+        if error is not None:
+            return is_idempotent and isinstance(error, httpx.TransportError)
+        return is_idempotent and status_code in _RETRYABLE_STATUSES
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given (1-based) attempt."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def next_delay(
+        self,
+        attempt: int,
+        method: str,
+        status_code: Optional[int],
+        error: Optional[Exception],
+        deadline: float
+    ) -> Optional[float]:
+        """
+        Seconds to wait before the next attempt, or None to stop retrying.
+        
+        Args:
+            attempt: Number of attempts made so far
+            method: HTTP method of the request
+            status_code: Response status, if any
+            error: Transport exception, if any
+            deadline: time.monotonic() value by which all attempts must finish
+        """
+        if attempt >= self.max_attempts or not self.is_retryable(method, status_code, error):
+            return None
+        delay = self.backoff(attempt)
+        if time.monotonic() + delay >= deadline:
+            return None
+        return delay
@@ -0,0 +1,195 @@
+"""SQLite store for sends scheduled for a future time."""
+import json
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+from app.database import add_missing_columns, open_sqlite
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scheduled (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    send_at REAL NOT NULL,
+    status TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_scheduled_status_send_at ON scheduled (status, send_at);
+"""
+
+# Columns added after the first release, for stores created by older versions
+_LEASE_COLUMNS = {"lease_owner": "TEXT", "lease_expires": "REAL NOT NULL DEFAULT 0"}
+
+
+class ScheduleStore:
+    """
+    Durable record of scheduled sends.
+    
+    Methods are synchronous and thread-safe; async callers should run them
+    via `asyncio.to_thread`. Statuses move pending -> sending -> sent | failed,
+    or pending -> cancelled.
+    
+    Sends being released are leased to the claiming store instance for
+    `lease_timeout` seconds and kept alive with `renew`; `recover` only
+    returns sends with an expired lease to pending, so processes sharing
+    the file never requeue each other's in-progress releases.
+    """
+
+    def __init__(self, path: str, lease_timeout: float = 60.0):
+        self.owner = uuid.uuid4().hex
+        self.lease_timeout = lease_timeout
+        self._conn = open_sqlite(path)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.executescript(_SCHEMA)
+            add_missing_columns(self._conn, "scheduled", _LEASE_COLUMNS)
+
+    def add(self, kind: str, payload: Dict[str, Any], send_at: float) -> Dict[str, Any]:
+        """Persist a pending send and return it."""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO scheduled (kind, payload, send_at, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, 'pending', ?, ?)",
+                (kind, json.dumps(payload), send_at, now, now)
+            )
+        return self.get(cursor.lastrowid)
+
+    def pending(self) -> List[Tuple[float, int]]:
+        """Return (send_at, id) of every pending send, earliest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT send_at, id FROM scheduled WHERE status = 'pending' ORDER BY send_at"
+            ).fetchall()
+        return [(row[0], row[1]) for row in rows]
+
+    def claim(self, ids: List[int]) -> List[Dict[str, Any]]:
+        """
+        Atomically mark pending sends as sending, leased to this instance.
+        
+        Sends already claimed by another process or cancelled are skipped.
+        
+        Returns:
+            The claimed sends
+        """
+        if not ids:
+            return []
+        placeholders = ", ".join("?" * len(ids))
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                f"UPDATE scheduled SET status = 'sending', updated_at = ?, lease_owner = ?, lease_expires = ? "
+                f"WHERE status = 'pending' AND id IN ({placeholders}) RETURNING *",
+                (now, self.owner, now + self.lease_timeout, *ids)
+            ).fetchall()
+        return [_row_to_send(row) for row in rows]
+
+    def finish_many(self, outcomes: List[Tuple[int, bool, Optional[Dict[str, Any]], Optional[str]]]) -> None:
+        """
+        Record the outcome of released sends in one transaction.
+        
+        Args:
+            outcomes: (id, success, result, error) per send
+        """
+        now = time.time()
+        rows = [
+            ("sent" if success else "failed", json.dumps(result) if result is not None else None, error, now, send_id)
+            for send_id, success, result, error in outcomes
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "UPDATE scheduled SET status = ?, result = ?, error = ?, updated_at = ?, "
+                    "lease_owner = NULL, lease_expires = 0 WHERE id = ?",
+                    rows
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def cancel(self, send_id: int) -> bool:
+        """Cancel a pending send; returns False if it is no longer pending."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE scheduled SET status = 'cancelled', updated_at = ? WHERE id = ? AND status = 'pending'",
+                (time.time(), send_id)
+            )
+        return cursor.rowcount > 0
+
+    def renew(self) -> int:
+        """
+        Extend the lease of every send this instance is releasing.
+        
+        Returns:
+            Number of leases renewed
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE scheduled SET lease_expires = ? WHERE status = 'sending' AND lease_owner = ?",
+                (time.time() + self.lease_timeout, self.owner)
+            )
+        return cursor.rowcount
+
+    def recover(self) -> List[Tuple[float, int]]:
+        """
+        Return sends whose lease expired (their process stopped or crashed) to pending.
+        
+        Returns:
+            (send_at, id) of each requeued send
+        """
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "UPDATE scheduled SET status = 'pending', updated_at = ?, lease_owner = NULL, lease_expires = 0 "
+                "WHERE status = 'sending' AND lease_expires < ? RETURNING send_at, id",
+                (now, now)
+            ).fetchall()
+        return [(row[0], row[1]) for row in rows]
+
+    def release(self, ids: Optional[List[int]] = None) -> int:
+        """
+        Return sends this instance claimed but never dispatched to pending.
+        
+        Args:
+            ids: Sends to return (every send this instance is releasing when omitted)
+        
+        Returns:
+            Number of sends requeued
+        """
+        query = (
+            "UPDATE scheduled SET status = 'pending', updated_at = ?, lease_owner = NULL, lease_expires = 0 "
+            "WHERE status = 'sending' AND lease_owner = ?"
+        )
+        params: List[Any] = [time.time(), self.owner]
+        if ids is not None:
+            query += f" AND id IN ({', '.join('?' * len(ids))})"
+            params += ids
+        with self._lock:
+            cursor = self._conn.execute(query, params)
+        return cursor.rowcount
+
+    def get(self, send_id: int) -> Optional[Dict[str, Any]]:
+        """Return a scheduled send by ID, or None if it does not exist."""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM scheduled WHERE id = ?", (send_id,)).fetchone()
+        return _row_to_send(row) if row is not None else None
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def _row_to_send(row) -> Dict[str, Any]:
+    send = dict(row)
+    send["payload"] = json.loads(send["payload"])
+    send["result"] = json.loads(send["result"]) if send["result"] else None
+    return send
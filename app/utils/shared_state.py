@@ -0,0 +1,345 @@
+"""SQLite-backed state shared by worker processes on one host."""
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Tuple
+from app.database import open_sqlite
+from app.utils.cache import TTLCache, _MISSING
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_buckets (
+    name TEXT PRIMARY KEY,
+    rate REAL NOT NULL,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    blocked_until REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS cache_entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE TABLE IF NOT EXISTS cache_generations (
+    namespace TEXT PRIMARY KEY,
+    generation INTEGER NOT NULL
+);
+"""
+
+
+class SharedState:
+    """
+    Token buckets and cache entries kept in one SQLite file.
+    
+    Every worker process opens the same file (WAL mode), so rate limits and
+    cached lookups apply to the whole deployment rather than per process.
+    Timestamps use wall-clock time because monotonic clocks are not
+    comparable across processes. Methods are synchronous and thread-safe;
+    async callers should run them via `asyncio.to_thread`.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def take_token(self, name: str, max_rate: float, burst: float) -> Tuple[float, float, float, float]:
+        """
+        Refill bucket `name` and take one token if available.
+        
+        Args:
+            name: Bucket name (unique across the deployment)
+            max_rate: Configured ceiling, also the rate of a new bucket
+            burst: Bucket capacity
+            
+        Returns:
+            Tuple of (seconds to wait, 0 when a token was taken; rate; tokens; blocked_until)
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO rate_buckets (name, rate, tokens, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (name) DO NOTHING",
+                (name, max_rate, burst, now)
+            )
+            row = conn.execute(
+                "SELECT rate, tokens, updated_at, blocked_until FROM rate_buckets WHERE name = ?", (name,)
+            ).fetchone()
+            rate = min(row["rate"], max_rate)
+            tokens = min(burst, row["tokens"] + max(0.0, now - row["updated_at"]) * rate)
+            blocked_until = row["blocked_until"]
+            if now < blocked_until:
+                wait = blocked_until - now
+            elif tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / rate
+            conn.execute(
+                "UPDATE rate_buckets SET rate = ?, tokens = ?, updated_at = ? WHERE name = ?",
+                (rate, tokens, now, name)
+            )
+        return wait, rate, tokens, blocked_until
+
+    def adjust_rate(
+        self,
+        name: str,
+        max_rate: float,
+        min_rate: float,
+        burst: float,
+        increase: Optional[float] = None,
+        retry_after: Optional[float] = None
+    ) -> None:
+        """
+        Raise the bucket's rate by `increase`, or halve it when `increase` is None.
+        
+        A halving also empties the bucket and honours `retry_after`.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT rate, tokens, updated_at, blocked_until FROM rate_buckets WHERE name = ?", (name,)
+            ).fetchone()
+            if row is None:
+                return
+            rate = min(row["rate"], max_rate)
+            tokens = min(burst, row["tokens"] + max(0.0, now - row["updated_at"]) * rate)
+            blocked_until = row["blocked_until"]
+            if increase is not None:
+                rate = min(max_rate, rate + increase)
+            else:
+                rate = max(min_rate, rate / 2)
+                tokens = min(tokens, 0.0)
+                if retry_after:
+                    blocked_until = max(blocked_until, now + retry_after)
+            conn.execute(
+                "UPDATE rate_buckets SET rate = ?, tokens = ?, updated_at = ?, blocked_until = ? WHERE name = ?",
+                (rate, tokens, now, blocked_until, name)
+            )
+
+    def cache_get(self, namespace: str, key: str) -> Tuple[Any, int]:
+        """Return the fresh value (or _MISSING) and the namespace generation."""
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (namespace, key)
+            ).fetchone()
+            generation = self._generation(conn, namespace)
+        if row is None or row["expires_at"] <= time.time():
+            return _MISSING, generation
+        return json.loads(row["value"]), generation
+
+    def cache_set(self, namespace: str, key: str, value: Any, ttl: float, generation: Optional[int] = None) -> None:
+        """Store a value, skipping the write if the namespace was invalidated since `generation`."""
+        with self._transaction() as conn:
+            if generation is not None and generation != self._generation(conn, namespace):
+                return
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, json.dumps(value), time.time() + ttl)
+            )
+
+    def cache_invalidate(self, namespace: str, key: Optional[str] = None) -> None:
+        """Drop one key, or the whole namespace when `key` is None."""
+        with self._transaction() as conn:
+            if key is None:
+                conn.execute("DELETE FROM cache_entries WHERE namespace = ?", (namespace,))
+            else:
+                conn.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key)
+                )
+            conn.execute(
+                "INSERT INTO cache_generations (namespace, generation) VALUES (?, 1) "
+                "ON CONFLICT (namespace) DO UPDATE SET generation = generation + 1",
+                (namespace,)
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            self._conn = open_sqlite(self.path)
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _generation(conn, namespace: str) -> int:
+        row = conn.execute(
+            "SELECT generation FROM cache_generations WHERE namespace = ?", (namespace,)
+        ).fetchone()
+        return row["generation"] if row else 0
+
+
+class SharedRateLimiter:
+    """
+    RateLimiter whose bucket lives in SharedState.
+    
+    Drop-in for `RateLimiter`: the token count, adaptive rate and any
+    Retry-After block are shared by every process using the same bucket
+    name, so N workers together stay within one upstream limit. Each
+    `acquire` is one short SQLite transaction; waiters within a process are
+    still served in FIFO order.
+    """
+
+    def __init__(
+        self,
+        state: SharedState,
+        name: str,
+        rate: float,
+        burst: Optional[float] = None,
+        min_rate: float = 0.5,
+        increase: float = 0.1
+    ):
+        self.name = name
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.increase = increase
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.waiting = 0
+        self.throttled = 0
+        self._state = state
+        self._tokens = self.burst
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent."""
+        self.waiting += 1
+        try:
+            async with self._lock:
+                while True:
+                    wait, self.rate, self._tokens, self._blocked_until = await asyncio.to_thread(
+                        self._state.take_token, self.name, self.max_rate, self.burst
+                    )
+                    if wait <= 0:
+                        return
+                    await asyncio.sleep(wait)
+        finally:
+            self.waiting -= 1
+
+    def on_success(self) -> None:
+        """Record an accepted request, nudging the shared rate back up."""
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+            self._update(lambda: self._state.adjust_rate(
+                self.name, self.max_rate, self.min_rate, self.burst, increase=self.increase
+            ))
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> None:
+        """
+        Record a 429 response.
+        
+        Args:
+            retry_after: Seconds the upstream asked us to wait, if given
+        """
+        self.throttled += 1
+        self.rate = max(self.min_rate, self.rate / 2)
+        self._tokens = min(self._tokens, 0.0)
+        if retry_after:
+            self._blocked_until = max(self._blocked_until, time.time() + retry_after)
+        self._update(lambda: self._state.adjust_rate(
+            self.name, self.max_rate, self.min_rate, self.burst, retry_after=retry_after
+        ))
+
+    def blocked_for(self) -> float:
+        """Seconds left before a Retry-After block lifts, as last seen by this process."""
+        return max(0.0, self._blocked_until - time.time())
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the last observed shared rate and tokens, plus this process's queue depth."""
+        return {
+            "rate": round(self.rate, 3),
+            "max_rate": self.max_rate,
+            "tokens": round(self._tokens, 3),
+            "waiting": self.waiting,
+            "throttled": self.throttled,
+            "blocked_for": round(self.blocked_for(), 3)
+        }
+
+    def _update(self, write: Callable[[], None]) -> None:
+        """Apply a rate change off the event loop; callers do not wait for it."""
+        future = asyncio.get_running_loop().run_in_executor(None, write)
+        future.add_done_callback(_log_failure)
+
+
+class SharedTTLCache(TTLCache):
+    """
+    TTLCache whose entries live in SharedState.
+    
+    Keys are stored as strings under `namespace`. Single-flight loading is
+    per process; an invalidation in any process bumps the namespace
+    generation, so loads already in flight elsewhere will not store a
+    stale value. The plain get/set/invalidate block on SQLite; async code
+    uses get_or_load and the *_async variants, which run in a thread.
+    """
+
+    def __init__(self, state: SharedState, namespace: str, ttl: float, negative_ttl: Optional[float] = None):
+        super().__init__(ttl, negative_ttl)
+        self.namespace = namespace
+        self._state = state
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        value, _ = self._state.cache_get(self.namespace, str(key))
+        return default if value is _MISSING else value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        ttl = self.negative_ttl if value is None else self.ttl
+        self._state.cache_set(self.namespace, str(key), value, ttl)
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        self._state.cache_invalidate(self.namespace, None if key is None else str(key))
+
+    async def get_async(self, key: Hashable, default: Any = None) -> Any:
+        return await asyncio.to_thread(self.get, key, default)
+
+    async def set_async(self, key: Hashable, value: Any) -> None:
+        await asyncio.to_thread(self.set, key, value)
+
+    async def invalidate_async(self, key: Optional[Hashable] = None) -> None:
+        await asyncio.to_thread(self.invalidate, key)
+
+    async def _fetch(self, key: Hashable) -> Tuple[Any, int]:
+        try:
+            return await asyncio.to_thread(self._state.cache_get, self.namespace, str(key))
+        except sqlite3.Error as e:
+            # Load without the cache; the unknown generation keeps the value from being stored
+            logger.warning("Shared cache read failed for %s: %s", self.namespace, e)
+            return _MISSING, -1
+
+    async def _store(self, key: Hashable, value: Any, generation: int) -> None:
+        # The value was loaded fine; failing to cache it must not fail the callers
+        ttl = self.negative_ttl if value is None else self.ttl
+        try:
+            await asyncio.to_thread(self._state.cache_set, self.namespace, str(key), value, ttl, generation)
+        except sqlite3.Error as e:
+            logger.warning("Shared cache write failed for %s: %s", self.namespace, e)
+
+
+def _log_failure(future: asyncio.Future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        logger.warning("Shared rate limit update failed: %s", future.exception())
@@ -0,0 +1,24 @@
+"""Placeholder substitution for per-recipient message text."""
+import re
+from typing import Dict, Optional
+
+_PLACEHOLDER = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+def render_placeholders(text: str, variables: Optional[Dict[str, str]]) -> str:
+    """
+    Replace `{{ name }}` placeholders with values from `variables`.
+    
+    Unknown placeholders are left untouched so a missing value is visible
+    rather than silently blanked.
+    
+    Args:
+        text: Template text
+        variables: Placeholder values
+        
+    Returns:
+        Rendered text
+    """
+    if not variables:
+        return text
+    return _PLACEHOLDER.sub(lambda match: str(variables.get(match.group(1), match.group(0))), text)
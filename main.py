@@ -1,16 +1,33 @@
 """FastAPI application entry point."""
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
 from app.routes import router as api_router
-from app.routes import web_routes
+from app.routes import web_routes, metrics_routes
+from app.controllers import ClickSendController, HistoryController, JobController, ReceiptController, ScheduleController
+from app.config import (
+    COMPRESSION_MIN_SIZE, COMPRESSION_GZIP_LEVEL, COMPRESSION_BROTLI_QUALITY, STATIC_CACHE_MAX_AGE,
+    SERVER_TIMING_ENABLED, SERVER_TIMING_PATHS, SLOW_REQUEST_MS, SLOW_REQUEST_SAMPLE_RATE
+)
+from app.utils.compression import CompressionMiddleware
+from app.utils.http_cache import CachedStaticFiles
+from app.utils.metrics import MetricsMiddleware
+from app.utils.request_timing import ServerTimingMiddleware
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage application lifespan."""
     # Startup
+    await HistoryController.start()
+    await JobController.start()
+    await ScheduleController.start()
+    await ReceiptController.start()
     yield
     # Shutdown
+    await ReceiptController.stop()
+    await ScheduleController.stop()
+    await JobController.stop()
+    await HistoryController.stop()
+    await ClickSendController.close_clients()
 
 app = FastAPI(
     title="ClickSend Tester",
@@ -19,13 +36,29 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+if SERVER_TIMING_ENABLED:
+    app.add_middleware(
+        ServerTimingMiddleware,
+        paths=SERVER_TIMING_PATHS,
+        slow_ms=SLOW_REQUEST_MS,
+        sample_rate=SLOW_REQUEST_SAMPLE_RATE
+    )
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=COMPRESSION_MIN_SIZE,
+    gzip_level=COMPRESSION_GZIP_LEVEL,
+    brotli_quality=COMPRESSION_BROTLI_QUALITY
+)
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(api_router)
 app.include_router(web_routes.router)
+app.include_router(metrics_routes.router)
 
 # Mount static files
 try:
-    app.mount("/static", StaticFiles(directory="app/static"), name="static")
+    app.mount("/static", CachedStaticFiles(directory="app/static", max_age=STATIC_CACHE_MAX_AGE), name="static")
 except:
     pass  # Static directory may not exist yet
 
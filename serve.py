@@ -0,0 +1,35 @@
+"""
+Run the app with several worker processes sharing one state file.
+
+    python serve.py --workers 4 --port 8000
+
+Each worker is a separate uvicorn process. Rate limit buckets, the sender
+email-ID cache and Idempotency-Key records are kept in the SQLite file
+given by --shared-state (exported as SHARED_STATE_PATH), so the workers
+together respect one set of ClickSend limits and replay each other's
+idempotent responses.
+"""
+import argparse
+import os
+import uvicorn
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (default: CPU count)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--shared-state",
+        default=os.getenv("SHARED_STATE_PATH") or "data/shared.db",
+        help="SQLite file for cross-worker state (default: data/shared.db)"
+    )
+    args = parser.parse_args()
+
+    # Workers inherit the environment, so app.config picks the path up in each process
+    os.environ["SHARED_STATE_PATH"] = args.shared_state
+    uvicorn.run("main:app", host=args.host, port=args.port, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+"""Shared test setup: every test talks to the in-process ClickSend mock."""
+import os
+import tempfile
+
+# Settings are read at import time, so they must be in place before `app` is imported
+_DATA_DIR = tempfile.mkdtemp(prefix="clicksend-tests-")
+os.environ.update({
+    "CLICKSEND_TRANSPORT": "mock",
+    "CLICKSEND_API_USERNAME": "tester",
+    "CLICKSEND_API_KEY": "test-key",
+    "CLICKSEND_EMAIL": "sender@example.com",
+    "DEFAULT_COUNTRY": "AU",
+    "RATE_LIMIT_ENABLED": "false",
+    "JOB_QUEUE_PATH": os.path.join(_DATA_DIR, "jobs.db"),
+    "HISTORY_DB_PATH": os.path.join(_DATA_DIR, "history.db"),
+    "SCHEDULE_DB_PATH": os.path.join(_DATA_DIR, "schedule.db"),
+    "RECEIPT_DB_PATH": os.path.join(_DATA_DIR, "receipts.db"),
+    "IDEMPOTENCY_DB_PATH": "",
+    "SHARED_STATE_PATH": ""
+})
@@ -0,0 +1,89 @@
+"""Tests for TTLCache load coalescing."""
+import asyncio
+import pytest
+from app.utils.cache import TTLCache
+
+
+def test_concurrent_misses_share_one_load():
+    async def scenario():
+        cache = TTLCache(ttl=60)
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "value"
+
+        values = await asyncio.gather(*(cache.get_or_load("key", loader) for _ in range(5)))
+        return values, calls, cache.stats(), await cache.get_or_load("key", loader)
+
+    values, calls, stats, cached = asyncio.run(scenario())
+    assert values == ["value"] * 5
+    assert calls == 1
+    assert (stats["misses"], stats["coalesced"], stats["hits"]) == (1, 4, 0)
+    assert cached == "value"
+
+
+def test_cancelled_loading_caller_does_not_cancel_waiters():
+    async def scenario():
+        cache = TTLCache(ttl=60)
+        release = asyncio.Event()
+
+        async def loader():
+            await release.wait()
+            return 42
+
+        first = asyncio.create_task(cache.get_or_load("key", loader))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(cache.get_or_load("key", loader))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        return first, await second, cache.get("key")
+
+    first, value, cached = asyncio.run(scenario())
+    assert first.cancelled()
+    assert value == 42
+    assert cached == 42
+
+
+def test_store_failure_reaches_every_waiter():
+    class BrokenCache(TTLCache):
+        async def _store(self, key, value, generation):
+            raise OSError("disk full")
+
+    async def scenario():
+        cache = BrokenCache(ttl=60)
+
+        async def loader():
+            await asyncio.sleep(0.01)
+            return "value"
+
+        results = await asyncio.wait_for(
+            asyncio.gather(*(cache.get_or_load("key", loader) for _ in range(3)), return_exceptions=True),
+            timeout=1
+        )
+        return results, cache._inflight
+
+    results, inflight = asyncio.run(scenario())
+    assert all(isinstance(result, OSError) for result in results)
+    assert inflight == {}
+
+
+def test_failed_load_is_not_cached():
+    async def scenario():
+        cache = TTLCache(ttl=60)
+
+        async def failing():
+            raise ValueError("upstream down")
+
+        async def working():
+            return "value"
+
+        with pytest.raises(ValueError):
+            await cache.get_or_load("key", failing)
+        return await cache.get_or_load("key", working)
+
+    assert asyncio.run(scenario()) == "value"
@@ -0,0 +1,107 @@
+"""Tests for Idempotency-Key replay on send endpoints."""
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from app.utils.idempotency import IdempotencyConflict, IdempotencyStore
+from main import app
+
+SMS = {"to": "+61411111111", "message": "Hi"}
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+def test_repeat_with_same_key_replays_first_response(client):
+    headers = {"Idempotency-Key": "replay-1"}
+    first = client.post("/api/sms/send", json=SMS, headers=headers)
+    second = client.post("/api/sms/send", json=SMS, headers=headers)
+
+    assert first.status_code == second.status_code == 200
+    assert first.headers["Idempotent-Replayed"] == "false"
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert second.json() == first.json()
+
+
+def test_without_key_every_request_is_sent(client):
+    first = client.post("/api/sms/send", json=SMS)
+    second = client.post("/api/sms/send", json=SMS)
+
+    assert first.status_code == second.status_code == 200
+    assert "Idempotent-Replayed" not in second.headers
+    assert second.json() != first.json()
+
+
+def test_key_reused_for_different_request_is_rejected(client):
+    headers = {"Idempotency-Key": "replay-2"}
+    client.post("/api/sms/send", json=SMS, headers=headers)
+    response = client.post("/api/sms/send", json={**SMS, "message": "Other"}, headers=headers)
+
+    assert response.status_code == 422
+
+
+def test_concurrent_requests_share_one_execution():
+    async def scenario():
+        store = IdempotencyStore(ttl=60, maxsize=10)
+        calls = 0
+
+        async def produce():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"sent": calls}
+
+        results = await asyncio.gather(*(store.run("key", "fp", produce) for _ in range(3)))
+        return results, calls
+
+    results, calls = asyncio.run(scenario())
+    assert calls == 1
+    assert [response for _, response in results] == [{"sent": 1}] * 3
+    assert sorted(replayed for replayed, _ in results) == [False, True, True]
+
+
+def test_persisted_key_replays_across_stores(tmp_path):
+    path = str(tmp_path / "idempotency.db")
+
+    async def scenario():
+        calls = 0
+
+        async def produce():
+            nonlocal calls
+            calls += 1
+            return {"sent": calls}
+
+        first = await IdempotencyStore(ttl=60, maxsize=10, path=path).run("key", "fp", produce)
+        # A second worker process has its own memory cache but shares the file
+        other = IdempotencyStore(ttl=60, maxsize=10, path=path)
+        second = await other.run("key", "fp", produce)
+        with pytest.raises(IdempotencyConflict) as conflict:
+            await other.run("key", "other-fp", produce)
+        return first, second, calls, conflict.value.status_code
+
+    first, second, calls, status = asyncio.run(scenario())
+    assert first == (False, {"sent": 1})
+    assert second == (True, {"sent": 1})
+    assert calls == 1
+    assert status == 422
+
+
+def test_failed_send_is_not_stored(tmp_path):
+    path = str(tmp_path / "idempotency.db")
+
+    async def scenario():
+        store = IdempotencyStore(ttl=60, maxsize=10, path=path)
+
+        async def failing():
+            raise RuntimeError("upstream down")
+
+        async def working():
+            return {"sent": True}
+
+        with pytest.raises(RuntimeError):
+            await store.run("key", "fp", failing)
+        return await store.run("key", "fp", working)
+
+    assert asyncio.run(scenario()) == (False, {"sent": True})
@@ -0,0 +1,139 @@
+"""Tests for job queue leases and the job controller's shutdown drain."""
+import asyncio
+import pytest
+from app.controllers import job_controller
+from app.controllers.job_controller import JobController
+from app.utils.job_queue import JobQueue
+
+
+@pytest.fixture
+def queue_path(tmp_path):
+    return str(tmp_path / "jobs.db")
+
+
+def test_claim_leases_job_to_claiming_instance(queue_path):
+    queue = JobQueue(queue_path, lease_timeout=60)
+    job = queue.enqueue("sms", {"to": "+61411111111", "message": "Hi"})
+
+    claimed = queue.claim()
+    assert claimed["id"] == job["id"]
+    assert claimed["status"] == "running"
+    assert claimed["attempts"] == 1
+    assert claimed["lease_owner"] == queue.owner
+    assert queue.claim() is None
+
+
+def test_recover_leaves_live_leases_alone(queue_path):
+    owner = JobQueue(queue_path, lease_timeout=60)
+    sibling = JobQueue(queue_path, lease_timeout=60)
+    job = owner.enqueue("sms", {"to": "+61411111111", "message": "Hi"})
+    owner.claim()
+
+    assert sibling.recover() == 0
+    assert sibling.release() == 0
+    assert sibling.get(job["id"])["status"] == "running"
+
+
+def test_recover_requeues_expired_leases(queue_path):
+    crashed = JobQueue(queue_path, lease_timeout=-1)
+    job = crashed.enqueue("sms", {"to": "+61411111111", "message": "Hi"})
+    crashed.claim()
+
+    survivor = JobQueue(queue_path, lease_timeout=60)
+    assert survivor.recover() == 1
+    assert survivor.get(job["id"])["status"] == "queued"
+    assert survivor.claim()["lease_owner"] == survivor.owner
+
+
+def test_renew_extends_only_own_leases(queue_path):
+    owner = JobQueue(queue_path, lease_timeout=60)
+    sibling = JobQueue(queue_path, lease_timeout=60)
+    owner.enqueue("sms", {"to": "+61411111111", "message": "Hi"})
+    owner.claim()
+
+    assert owner.renew() == 1
+    assert sibling.renew() == 0
+
+
+def test_release_requeues_own_running_jobs(queue_path):
+    queue = JobQueue(queue_path, lease_timeout=60)
+    job = queue.enqueue("sms", {"to": "+61411111111", "message": "Hi"})
+    queue.claim()
+
+    assert queue.release() == 1
+    released = queue.get(job["id"])
+    assert released["status"] == "queued"
+    assert released["lease_owner"] is None
+
+
+def _run_with_slow_handler(monkeypatch, path, send_time, shutdown_timeout):
+    """Queue two jobs for one worker, stop while the first is sending and return both."""
+    async def slow_send(**payload):
+        await asyncio.sleep(send_time)
+        return {"success": True, "status_code": 200, "data": payload, "error": None}
+
+    monkeypatch.setitem(job_controller.JOB_HANDLERS, "slow", slow_send)
+    monkeypatch.setattr(job_controller, "JOB_SHUTDOWN_TIMEOUT", shutdown_timeout)
+
+    async def scenario():
+        await JobController.start(path=path, workers=1)
+        first = await JobController.enqueue("slow", {"n": 1})
+        second = await JobController.enqueue("slow", {"n": 2})
+        await asyncio.sleep(send_time / 2)
+        await JobController.stop()
+        return first["id"], second["id"]
+
+    first_id, second_id = asyncio.run(scenario())
+    queue = JobQueue(path)
+    return queue.get(first_id), queue.get(second_id)
+
+
+def test_stop_drains_in_flight_job(monkeypatch, queue_path):
+    first, second = _run_with_slow_handler(monkeypatch, queue_path, send_time=0.2, shutdown_timeout=5)
+
+    assert first["status"] == "succeeded"
+    assert first["result"]["data"] == {"n": 1}
+    # The worker stopped claiming, so the second job was never started
+    assert second["status"] == "queued"
+    assert second["attempts"] == 0
+
+
+def test_stop_fails_job_cancelled_mid_send_instead_of_requeueing(monkeypatch, queue_path):
+    first, second = _run_with_slow_handler(monkeypatch, queue_path, send_time=1.0, shutdown_timeout=0.05)
+
+    assert first["status"] == "failed"
+    assert "not resent" in first["error"]
+    assert second["status"] == "queued"
+
+
+def test_worker_survives_outcome_recording_failure(monkeypatch, queue_path):
+    async def send(**payload):
+        return {"success": True, "status_code": 200, "data": payload, "error": None}
+
+    monkeypatch.setitem(job_controller.JOB_HANDLERS, "ok", send)
+    original_complete = JobQueue.complete
+
+    def complete(self, job_id, result):
+        if result["data"] == {"n": 1}:
+            raise RuntimeError("database is locked")
+        original_complete(self, job_id, result)
+
+    monkeypatch.setattr(JobQueue, "complete", complete)
+
+    async def scenario():
+        await JobController.start(path=queue_path, workers=1)
+        first = await JobController.enqueue("ok", {"n": 1})
+        second = await JobController.enqueue("ok", {"n": 2})
+        for _ in range(100):
+            job = await JobController.get_job(second["id"])
+            if job["status"] == "succeeded":
+                break
+            await asyncio.sleep(0.01)
+        first = await JobController.get_job(first["id"])
+        await JobController.stop()
+        return first, job
+
+    first, second = asyncio.run(scenario())
+    assert first["status"] == "failed"
+    assert first["error"] == "Outcome could not be recorded"
+    assert second["status"] == "succeeded"
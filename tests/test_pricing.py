@@ -0,0 +1,92 @@
+"""Tests for SMS quote classification."""
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from app.controllers.clicksend_controller import ClickSendController
+from app.controllers.pricing_controller import PricingController
+from app.utils.mock_transport import SMS_PART_PRICE
+from app.utils.pricing import RateTable
+from main import app
+
+
+def _quote(recipients, message="Hi", country=None):
+    async def scenario():
+        try:
+            return await PricingController.quote(message, recipients, country)
+        finally:
+            await ClickSendController.close_clients()
+
+    return asyncio.run(scenario())
+
+
+def _line(quote, country):
+    return next(line for line in quote["countries"] if line["country"] == country)
+
+
+def test_recipients_are_counted_per_country():
+    quote = _quote(["+61411111111", "0412222222", "+447700900123", "+12045550123", "+12125550123"])
+
+    assert quote["recipients"] == 5
+    assert _line(quote, "AU")["recipients"] == 2
+    assert _line(quote, "GB")["recipients"] == 1
+    # +1 numbers are told apart by area code
+    assert _line(quote, "CA")["recipients"] == 1
+    assert _line(quote, "US")["recipients"] == 1
+    assert quote["unpriced"] == 0
+    assert quote["total_cost"] == pytest.approx(5 * SMS_PART_PRICE)
+
+
+def test_invalid_and_duplicate_numbers_are_not_priced():
+    quote = _quote(["+61411111111", "0411111111", "+61 411 111 111", "not a number"])
+
+    assert quote["recipients"] == 1
+    assert quote["duplicates"] == 2
+    assert quote["invalid"] == 1
+    assert quote["total_segments"] == 1
+
+
+def test_unknown_calling_code_is_reported_by_prefix():
+    quote = _quote(["+999123456789", "+999123456780", "+61411111111"])
+
+    unknown = [line for line in quote["countries"] if line["country"] is None]
+    assert unknown == [{
+        "country": None,
+        "prefix": "+999",
+        "recipients": 2,
+        "segments": 2,
+        "rate": None,
+        "cost": None,
+        "error": "Unknown country calling code for numbers starting +999"
+    }]
+    assert quote["unpriced"] == 2
+
+
+def test_country_without_rate_is_unpriced(monkeypatch):
+    async def load_rate(country):
+        return None if country == "GB" else {"rate": 0.1, "currency": "AUD"}
+
+    monkeypatch.setattr(PricingController, "_rates", RateTable(load_rate, ttl=60))
+    quote = _quote(["+61411111111", "+447700900123"], message="x" * 200)
+
+    assert quote["message_segments"] == 2
+    assert _line(quote, "AU")["cost"] == pytest.approx(0.2)
+    assert _line(quote, "GB")["cost"] is None
+    assert _line(quote, "GB")["error"] == "No ClickSend SMS rate available for GB"
+    assert quote["unpriced"] == 1
+    assert quote["total_cost"] == pytest.approx(0.2)
+
+
+def test_national_numbers_use_given_country():
+    quote = _quote(["0401234567"], country="FI")
+
+    assert _line(quote, "FI")["recipients"] == 1
+
+
+def test_unknown_country_is_rejected():
+    with TestClient(app) as client:
+        accepted = client.post("/api/sms/quote", json={"message": "Hi", "recipients": ["0401234567"], "country": "fi"})
+        rejected = client.post("/api/sms/quote", json={"message": "Hi", "recipients": ["0401234567"], "country": "ZZ"})
+
+    assert accepted.status_code == 200
+    assert accepted.json()["countries"][0]["country"] == "FI"
+    assert rejected.status_code == 422
@@ -0,0 +1,105 @@
+"""Tests for scheduled send leases and the scheduler's release and shutdown."""
+import asyncio
+import time
+import pytest
+from app.controllers import schedule_controller
+from app.controllers.clicksend_controller import ClickSendController
+from app.controllers.schedule_controller import ScheduleController
+from app.utils.schedule_store import ScheduleStore
+
+SMS = {"to": "+61411111111", "message": "Hi"}
+EMAIL = {"to": "someone@example.com", "subject": "Hi", "body": "Hello"}
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    return str(tmp_path / "schedule.db")
+
+
+def test_claim_skips_sends_already_claimed(store_path):
+    owner = ScheduleStore(store_path, lease_timeout=60)
+    sibling = ScheduleStore(store_path, lease_timeout=60)
+    send = owner.add("sms", SMS, time.time())
+
+    assert [claimed["id"] for claimed in owner.claim([send["id"]])] == [send["id"]]
+    assert sibling.claim([send["id"]]) == []
+    assert owner.get(send["id"])["lease_owner"] == owner.owner
+
+
+def test_recover_returns_only_expired_leases_to_pending(store_path):
+    crashed = ScheduleStore(store_path, lease_timeout=-1)
+    live = ScheduleStore(store_path, lease_timeout=60)
+    lost = crashed.add("sms", SMS, 1.0)
+    running = live.add("sms", SMS, 2.0)
+    crashed.claim([lost["id"]])
+    live.claim([running["id"]])
+
+    assert live.recover() == [(1.0, lost["id"])]
+    assert live.get(lost["id"])["status"] == "pending"
+    assert live.get(running["id"])["status"] == "sending"
+
+
+def test_release_returns_only_given_own_sends(store_path):
+    owner = ScheduleStore(store_path, lease_timeout=60)
+    sibling = ScheduleStore(store_path, lease_timeout=60)
+    first = owner.add("sms", SMS, time.time())
+    second = owner.add("sms", SMS, time.time())
+    owner.claim([first["id"], second["id"]])
+
+    assert sibling.release() == 0
+    assert owner.release([first["id"]]) == 1
+    assert owner.get(first["id"])["status"] == "pending"
+    assert owner.get(second["id"])["status"] == "sending"
+    assert owner.release() == 1
+
+
+def test_due_sends_are_released_through_batch_path(store_path):
+    async def scenario():
+        await ScheduleController.start(path=store_path)
+        sms = await ScheduleController.schedule("sms", SMS, time.time())
+        email = await ScheduleController.schedule("email", EMAIL, time.time())
+        for _ in range(100):
+            sms = await ScheduleController.get(sms["id"])
+            email = await ScheduleController.get(email["id"])
+            if sms["status"] != "pending" and email["status"] != "pending" and not ScheduleController._releases:
+                break
+            await asyncio.sleep(0.01)
+        await ScheduleController.stop()
+        await ClickSendController.close_clients()
+        return sms, email
+
+    sms, email = asyncio.run(scenario())
+    assert sms["status"] == "sent"
+    assert sms["lease_owner"] is None
+    assert email["status"] == "sent"
+
+
+def test_stop_fails_dispatched_and_returns_undispatched_sends(monkeypatch, store_path):
+    async def slow_sms_batch(messages):
+        await asyncio.sleep(1.0)
+        return [{"success": True, "message_id": "late", "error": None} for _ in messages]
+
+    async def unexpected_email_batch(messages):
+        raise AssertionError("emails must not be dispatched after shutdown")
+
+    monkeypatch.setattr(ClickSendController, "send_sms_batch", slow_sms_batch)
+    monkeypatch.setattr(ClickSendController, "send_email_batch", unexpected_email_batch)
+    monkeypatch.setattr(schedule_controller, "SCHEDULE_SHUTDOWN_TIMEOUT", 0.05)
+
+    async def scenario():
+        await ScheduleController.start(path=store_path)
+        # Due together, so both land in one batch and the SMS part is sent first
+        send_at = time.time() + 0.05
+        sms = await ScheduleController.schedule("sms", SMS, send_at)
+        email = await ScheduleController.schedule("email", EMAIL, send_at)
+        await asyncio.sleep(0.2)
+        await ScheduleController.stop()
+        return sms["id"], email["id"]
+
+    sms_id, email_id = asyncio.run(scenario())
+    store = ScheduleStore(store_path)
+    sms, email = store.get(sms_id), store.get(email_id)
+    assert sms["status"] == "failed"
+    assert "not resent" in sms["error"]
+    assert email["status"] == "pending"
+    assert email["lease_owner"] is None
@@ -0,0 +1 @@
+"""Development tools: fake ClickSend server and load benchmark."""
@@ -0,0 +1,119 @@
+"""
+Load benchmark for the send endpoints.
+
+Start the fake ClickSend server and the app pointed at it, then run:
+
+    python -m tools.benchmark --endpoint sms --requests 5000 --concurrency 100
+
+Reports throughput, latency percentiles, status codes and (when the fake
+server is reachable) upstream ClickSend calls per request.
+"""
+import argparse
+import asyncio
+import json
+import math
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+import httpx
+
+PAYLOADS = {
+    "sms": ("/api/sms/send", lambda i: {"to": f"+614{i % 100000000:08d}", "message": f"Benchmark message {i}"}),
+    "email": ("/api/email/send", lambda i: {"to": f"bench{i}@example.com", "subject": "Benchmark", "body": f"Message {i}"}),
+    "sms-batch": ("/api/sms/send-batch", lambda i: {
+        "messages": [{"to": f"+614{(i * 100 + j) % 100000000:08d}", "message": f"Batch {i}"} for j in range(100)]
+    })
+}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a sorted list."""
+    if not values:
+        return 0.0
+    index = max(0, math.ceil(pct / 100 * len(values)) - 1)
+    return values[index]
+
+
+async def fetch_upstream_calls(client: httpx.AsyncClient, fake_url: Optional[str]) -> Optional[int]:
+    """Total calls seen by the fake ClickSend server, or None if unavailable."""
+    if not fake_url:
+        return None
+    try:
+        response = await client.get(f"{fake_url}/_stats")
+        return response.json().get("total", 0)
+    except Exception:
+        return None
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Drive the app at fixed concurrency and collect latency and status data."""
+    path, make_payload = PAYLOADS[args.endpoint]
+    url = f"{args.url}{path}"
+    if args.background:
+        url += "?background=true"
+    
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=args.timeout) as client:
+        upstream_before = await fetch_upstream_calls(client, args.fake_url)
+        
+        latencies: List[float] = []
+        statuses: Counter = Counter()
+        counter = iter(range(args.requests))
+        
+        async def worker() -> None:
+            for i in counter:
+                started = time.perf_counter()
+                try:
+                    response = await client.post(url, json=make_payload(i))
+                    statuses[response.status_code] += 1
+                except httpx.HTTPError as e:
+                    statuses[type(e).__name__] += 1
+                latencies.append(time.perf_counter() - started)
+        
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+        
+        upstream_after = await fetch_upstream_calls(client, args.fake_url)
+    
+    latencies.sort()
+    report = {
+        "endpoint": path,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "requests_per_s": round(args.requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        "statuses": {str(status): count for status, count in statuses.items()}
+    }
+    if upstream_before is not None and upstream_after is not None:
+        report["upstream_calls"] = upstream_after - upstream_before
+        report["upstream_calls_per_request"] = round((upstream_after - upstream_before) / args.requests, 3)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the ClickSend tester send endpoints")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base URL of the app")
+    parser.add_argument("--fake-url", default="http://127.0.0.1:9000", help="Base URL of the fake ClickSend server ('' to skip)")
+    parser.add_argument("--endpoint", choices=sorted(PAYLOADS), default="sms")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--background", action="store_true", help="Use ?background=true (queued sends)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+    
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report))
+        return
+    for key, value in report.items():
+        print(f"{key:>28}: {value}")
+
+
+if __name__ == "__main__":
+    main()
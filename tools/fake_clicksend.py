@@ -0,0 +1,76 @@
+"""
+Local stand-in for the ClickSend REST API, for load testing without spending credits.
+
+Run it and point the app at it:
+
+    uvicorn tools.fake_clicksend:app --port 9000
+    CLICKSEND_API_URL=http://127.0.0.1:9000/v3 uvicorn main:app
+
+Behaviour is controlled by environment variables:
+
+    FAKE_LATENCY_MS     mean added latency per request (default 50)
+    FAKE_JITTER_MS      +/- uniform jitter around the mean (default 20)
+    FAKE_ERROR_RATE     fraction of requests answered with 500 (default 0)
+    FAKE_THROTTLE_RATE  fraction of requests answered with 429 (default 0)
+    FAKE_RETRY_AFTER    Retry-After seconds sent with 429s (default 1)
+
+GET /_stats returns per-endpoint call counts; POST /_reset clears them.
+"""
+import asyncio
+import os
+import random
+from collections import Counter
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+import httpx
+from app.config import CLICKSEND_EMAIL
+from app.utils.mock_transport import MockClickSend, envelope
+
+LATENCY_MS = float(os.getenv("FAKE_LATENCY_MS", "50"))
+JITTER_MS = float(os.getenv("FAKE_JITTER_MS", "20"))
+ERROR_RATE = float(os.getenv("FAKE_ERROR_RATE", "0"))
+THROTTLE_RATE = float(os.getenv("FAKE_THROTTLE_RATE", "0"))
+RETRY_AFTER = os.getenv("FAKE_RETRY_AFTER", "1")
+
+app = FastAPI(title="Fake ClickSend", description="Local ClickSend API stand-in for load testing")
+
+calls: Counter = Counter()
+
+# Response shapes are shared with the in-process mock transport; the configured sender is pre-verified
+mock = MockClickSend(sender_email=CLICKSEND_EMAIL or "sender@example.com")
+
+
+@app.api_route("/v3/{path:path}", methods=["GET", "POST", "PUT"])
+async def clicksend(path: str, request: Request):
+    """Apply configured latency, 429s and 500s, then answer like ClickSend."""
+    calls[f"{request.method} /v3/{path}"] += 1
+    calls["total"] += 1
+    delay = max(0.0, LATENCY_MS + random.uniform(-JITTER_MS, JITTER_MS)) / 1000
+    if delay:
+        await asyncio.sleep(delay)
+    
+    roll = random.random()
+    if roll < THROTTLE_RATE:
+        calls["throttled"] += 1
+        return JSONResponse(
+            status_code=429,
+            content=envelope(None, "Rate limit exceeded", 429, "TOO_MANY_REQUESTS"),
+            headers={"Retry-After": RETRY_AFTER}
+        )
+    if roll < THROTTLE_RATE + ERROR_RATE:
+        calls["errors"] += 1
+        return JSONResponse(status_code=500, content=envelope(None, "Simulated failure", 500, "INTERNAL_ERROR"))
+    
+    upstream = await mock.handle(httpx.Request(request.method, str(request.url), content=await request.body()))
+    return Response(content=upstream.content, status_code=upstream.status_code, media_type="application/json")
+
+
+@app.get("/_stats")
+async def stats():
+    return dict(calls)
+
+
+@app.post("/_reset")
+async def reset():
+    calls.clear()
+    return {"reset": True}